@@ -3,6 +3,7 @@ from PyInstaller.utils.hooks import collect_submodules
 
 hiddenimports = ['supplychain_app.blueprints.assistant.routes']
 hiddenimports += collect_submodules('supplychain_app.blueprints.assistant')
+hiddenimports += collect_submodules('waitress')
 
 
 a = Analysis(
@@ -8,5 +8,6 @@ py -m PyInstaller --clean --noconfirm --onefile --name $ExeName `
   --paths "src" `
   --add-data "web;web" `
   --collect-submodules "supplychain_app.blueprints.assistant" `
+  --collect-submodules "waitress" `
   --hidden-import "supplychain_app.blueprints.assistant.routes" `
   src\run_exe.py
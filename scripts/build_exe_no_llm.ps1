@@ -25,6 +25,7 @@ uv run python -m PyInstaller --clean --noconfirm --onefile --noconsole --name $E
   --collect-submodules "supplychain_app.blueprints.assistant" `
   --hidden-import "supplychain_app.blueprints.assistant.routes" `
   --hidden-import "fastexcel" `
+  --collect-submodules "waitress" `
   --exclude-module "chromadb" `
   --exclude-module "chroma_hnswlib" `
   --exclude-module "sentence_transformers" `
@@ -12,14 +12,16 @@ from .blueprints.assistant import bp as assistant_bp
 from .blueprints.consommables import bp as consommables_bp
 from .blueprints.treatments import bp as treatments_bp
 import importlib.metadata
-import threading
 import time
 import os
 import sys
 import re
-from supplychain_app.data.pudo_etl import update_data, get_last_update_summary
-from supplychain_app.services.pudo_service import reload_data as reload_services_data
-from supplychain_app.data.pudo_service import reload_data as reload_data_data
+from supplychain_app.data.pudo_etl import get_last_update_summary
+from supplychain_app.data.data_store import get_data_store
+from supplychain_app.data.etl_scheduler import get_etl_scheduler
+from supplychain_app.data.file_watcher import get_data_watcher, start_data_watcher
+from supplychain_app.core.http_cache import init_compression
+from supplychain_app.core.result_cache import get_result_cache
 
 
 def create_app(config_object: type[Config] = Config) -> Flask:
@@ -38,6 +40,8 @@ def create_app(config_object: type[Config] = Config) -> Flask:
         resources={r"/api/*": {"origins": origins}},
         supports_credentials=True,
     )
+    if app.config.get("API_COMPRESS", True):
+        init_compression(app, min_size=int(app.config.get("API_COMPRESS_MIN_SIZE", 1024)))
 
     # Blueprints
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
@@ -57,7 +61,23 @@ def create_app(config_object: type[Config] = Config) -> Flask:
 
     @app.get("/api/updates/status")
     def updates_status():
-        return get_last_update_summary()
+        summary = dict(get_last_update_summary())
+        try:
+            summary["reload"] = get_data_store().reload_report()
+        except Exception:
+            summary["reload"] = None
+        return summary
+
+    @app.get("/api/updates/scheduler")
+    def updates_scheduler():
+        status = get_etl_scheduler().status()
+        watcher = get_data_watcher()
+        status["watcher"] = watcher.status() if watcher is not None else None
+        return status
+
+    @app.get("/api/updates/cache")
+    def updates_cache():
+        return get_result_cache().stats()
 
     @app.get("/api/app/info")
     def app_info():
@@ -106,25 +126,28 @@ def create_app(config_object: type[Config] = Config) -> Flask:
                 pass
         return {"ok": True}
 
-    def _background_update_loop():
-        while True:
+    # Cache des résultats (clé : paramètres + version du snapshot)
+    get_result_cache().configure(
+        max_bytes=int(app.config.get("RESULT_CACHE_MAX_MB", 128)) * 1024 * 1024,
+        ttl_s=app.config.get("RESULT_CACHE_TTL_S", 3600),
+    )
+
+    # Mise à jour périodique des données (ETL + recharge incrémentale si changements)
+    scheduler = get_etl_scheduler()
+    scheduler.configure(
+        interval_s=app.config.get("ETL_INTERVAL_S", 1800),
+        jitter_s=app.config.get("ETL_JITTER_S", 120),
+    )
+    if not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        scheduler.start()
+        if app.config.get("WATCH_DATA", True):
             try:
-                update_data()
-                try:
-                    reload_services_data(force=True)
-                except Exception:
-                    pass
-                try:
-                    reload_data_data(force=True)
-                except Exception:
-                    pass
+                start_data_watcher(
+                    poll_s=app.config.get("WATCH_POLL_S", 15),
+                    debounce_s=app.config.get("WATCH_DEBOUNCE_S", 3),
+                )
             except Exception:
                 pass
-            time.sleep(1800)
-
-    if not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
-        t = threading.Thread(target=_background_update_loop, daemon=True)
-        t.start()
 
     return app
 
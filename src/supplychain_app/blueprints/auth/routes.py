@@ -6,6 +6,7 @@ from flask import request, jsonify, session, send_from_directory
 from urllib.parse import quote
 from . import bp
 from supplychain_app.data.pudo_etl import get_stock_summary, get_stock_details, get_stock_final_details
+from supplychain_app.core.json_response import frame_response
 from supplychain_app.constants import path_photos_local, path_photos_network
 
 @bp.post("/login")
@@ -132,11 +133,7 @@ def stock_summary(code_article):
     except FileNotFoundError:
         return jsonify({"error": "stock parquet not found"}), 500
 
-    if df.height == 0:
-        return jsonify({"code_article": code_article, "rows": []}), 200
-
-    rows = df.to_dicts()
-    return jsonify({"code_article": code_article, "rows": rows}), 200
+    return frame_response(df, {"code_article": code_article})
 
 
 @bp.get("/stock/<code_article>/ultra-details")
@@ -148,11 +145,7 @@ def stock_ultra_details(code_article):
     except FileNotFoundError:
         return jsonify({"error": "stock_final parquet not found"}), 500
 
-    if df.height == 0:
-        return jsonify({"code_article": code_article, "rows": []}), 200
-
-    rows = df.to_dicts()
-    return jsonify({"code_article": code_article, "rows": rows}), 200
+    return frame_response(df, {"code_article": code_article})
 
 
 @bp.get("/stock/<code_article>/details")
@@ -163,9 +156,5 @@ def stock_details(code_article):
     except FileNotFoundError:
         return jsonify({"error": "stock parquet not found"}), 500
 
-    if df.height == 0:
-        return jsonify({"code_article": code_article, "rows": []}), 200
-
-    rows = df.to_dicts()
-    return jsonify({"code_article": code_article, "rows": rows}), 200
+    return frame_response(df, {"code_article": code_article})
 
@@ -1,12 +1,17 @@
 import os
 from datetime import datetime
 
-from flask import jsonify
+from flask import jsonify, request
 
 from . import bp
 from supplychain_app.constants import CONSO_OFFER_DIR
 from supplychain_app.constants import CONSO_OFFER_SRC_DIR
 from supplychain_app.constants import path_datan, folder_name_app
+from supplychain_app.core.json_response import frame_response
+from supplychain_app.core.pagination import PageError, data_version, page_request, paginate
+from supplychain_app.core.result_cache import get_result_cache
+from supplychain_app.core.text_norm import norm_text_expr
+from supplychain_app.data.data_store import current_snapshot
 from supplychain_app.excel_csv_to_dataframe import read_excel
 
 
@@ -38,62 +43,18 @@ def _latest_excel_in_dir(directory: str) -> str | None:
         return None
 
 
-@bp.get("/offer")
-def consommables_offer():
-    offer_parquet_dir = (CONSO_OFFER_DIR or "").strip()
-    offer_src_dir = (CONSO_OFFER_SRC_DIR or "").strip()
-
-    latest_path = None
-    offer_mode = None
-    parquet_path = None
-
-    if offer_parquet_dir and os.path.isdir(offer_parquet_dir):
-        parquet_path = os.path.join(offer_parquet_dir, "offre_consommables.parquet")
-        if os.path.exists(parquet_path):
-            offer_mode = "parquet"
-            latest_path = parquet_path
-
-    if offer_mode is None:
-        if not offer_src_dir:
-            return jsonify({
-                "available": False,
-                "error": "offer_src_dir_not_configured",
-                "rows": [],
-            }), 200
-
-        if not os.path.isdir(offer_src_dir):
-            return jsonify({
-                "available": False,
-                "error": "offer_src_dir_not_found",
-                "dir": offer_src_dir,
-                "rows": [],
-            }), 200
-
-        latest_path = _latest_excel_in_dir(offer_src_dir)
-        if not latest_path:
-            return jsonify({
-                "available": False,
-                "error": "offer_file_not_found",
-                "dir": offer_src_dir,
-                "rows": [],
-            }), 200
-        offer_mode = "excel"
+def _offer_frame(latest_path: str, offer_mode: str):
+    """Offre lue depuis ``latest_path`` (parquet ou Excel), enrichie avec le snapshot
+    courant : stock MPLC, sorties consommation et catégorie sans sortie.
 
-    try:
-        if offer_mode == "parquet":
-            import polars as pl
-            df = pl.read_parquet(latest_path)
-        else:
-            df = read_excel(os.path.dirname(latest_path), os.path.basename(latest_path))
-    except Exception as e:
-        return jsonify({
-            "available": False,
-            "error": f"read_failed: {e.__class__.__name__}",
-            "message": str(e),
-            "file": os.path.basename(latest_path) if latest_path else None,
-            "dir": os.path.dirname(latest_path) if latest_path else None,
-            "rows": [],
-        }), 200
+    Lève une exception si le fichier de l'offre ne peut pas être lu ; les
+    enrichissements en échec sont ignorés.
+    """
+    if offer_mode == "parquet":
+        import polars as pl
+        df = pl.read_parquet(latest_path)
+    else:
+        df = read_excel(os.path.dirname(latest_path), os.path.basename(latest_path))
 
     # Enrichissement stock: magasin MPLC, qualité GOOD, flag_stock_d_m = M
     try:
@@ -101,28 +62,25 @@ def consommables_offer():
         import datetime
 
         if df is not None and "code_article" in df.columns:
-            codes = (
-                df.select(pl.col("code_article").cast(pl.Utf8).str.strip_chars().str.to_uppercase())
-                .to_series()
-                .drop_nulls()
-                .unique()
-                .to_list()
-            )
-
-            stock_parquet = os.path.join(path_datan, folder_name_app, "stock_554.parquet")
-            if codes and os.path.exists(stock_parquet):
-                stock = pl.read_parquet(stock_parquet)
-                required = {"code_article", "code_magasin", "flag_stock_d_m", "code_qualite", "qte_stock"}
-                if required.issubset(stock.columns):
+            df = df.with_columns(norm_text_expr("code_article").alias("code_article"))
+            codes = df.get_column("code_article").drop_nulls().unique().to_list()
+
+            # stock_554 / stats_exit : tables du snapshot et leurs colonnes normalisées
+            # (matérialisées au chargement, voir NORMALIZED_COLUMNS).
+            snap = current_snapshot()
+            stock = snap.stock_554
+            stock_norm = snap.normalized("stock_554")
+            if codes and not stock.is_empty():
+                norm_cols = ["code_article", "code_magasin", "flag_stock_d_m", "code_qualite"]
+                if set(norm_cols).issubset(stock_norm.columns) and "qte_stock" in stock.columns:
                     stock_f = (
-                        stock
-                        .with_columns([
-                            pl.col("code_article").cast(pl.Utf8).str.strip_chars().str.to_uppercase().alias("code_article"),
-                            pl.col("code_magasin").cast(pl.Utf8).str.strip_chars().str.to_uppercase().alias("code_magasin"),
-                            pl.col("flag_stock_d_m").cast(pl.Utf8).str.strip_chars().str.to_uppercase().alias("flag_stock_d_m"),
-                            pl.col("code_qualite").cast(pl.Utf8).str.strip_chars().str.to_uppercase().alias("code_qualite"),
-                            pl.col("qte_stock").cast(pl.Float64, strict=False).fill_null(0.0).alias("qte_stock"),
-                        ])
+                        pl.concat(
+                            [
+                                stock_norm.select(norm_cols),
+                                stock.select(pl.col("qte_stock").cast(pl.Float64, strict=False).fill_null(0.0)),
+                            ],
+                            how="horizontal",
+                        )
                         .filter(pl.col("code_article").is_in(codes))
                         .filter(pl.col("qte_stock") > 0)
                         .filter(pl.col("code_magasin") == "MPLC")
@@ -133,25 +91,23 @@ def consommables_offer():
                     )
 
                     df = (
-                        df.with_columns(
-                            pl.col("code_article").cast(pl.Utf8).str.strip_chars().str.to_uppercase().alias("code_article")
-                        )
-                        .join(stock_f, on="code_article", how="left")
+                        df.join(stock_f, on="code_article", how="left")
                         .with_columns(pl.col("stock_mplc_good_m").fill_null(0.0))
                     )
 
             # Enrichissement sorties (consommation) : stats_exit.parquet, toutes années
             try:
-                stats_parquet = os.path.join(path_datan, folder_name_app, "stats_exit.parquet")
-                if codes and os.path.exists(stats_parquet):
-                    stats = pl.read_parquet(stats_parquet)
-                    required_s = {"code_article", "lib_motif_mvt", "qte_mvt"}
-                    if required_s.issubset(stats.columns):
-                        stats = stats.with_columns([
-                            pl.col("code_article").cast(pl.Utf8).str.strip_chars().str.to_uppercase().alias("code_article"),
-                            pl.col("lib_motif_mvt").cast(pl.Utf8).str.strip_chars().str.to_uppercase().alias("lib_motif_mvt"),
-                            pl.col("qte_mvt").cast(pl.Float64, strict=False).fill_null(0.0).alias("qte_mvt"),
-                        ])
+                stats = snap.stats_exit
+                stats_norm = snap.normalized("stats_exit")
+                if codes and not stats.is_empty():
+                    if {"code_article", "lib_motif_mvt"}.issubset(stats_norm.columns) and "qte_mvt" in stats.columns:
+                        stats = pl.concat(
+                            [
+                                stats_norm.select("code_article", "lib_motif_mvt"),
+                                stats.select(pl.col("qte_mvt").cast(pl.Float64, strict=False).fill_null(0.0)),
+                            ],
+                            how="horizontal",
+                        )
 
                         expr = (
                             pl.col("code_article").is_in(codes)
@@ -184,7 +140,7 @@ def consommables_offer():
                     if {"code_article", "categorie_sans_sortie"}.issubset(cat_df.columns):
                         cat_df = (
                             cat_df.select([
-                                pl.col("code_article").cast(pl.Utf8).str.strip_chars().str.to_uppercase().alias("code_article"),
+                                norm_text_expr("code_article").alias("code_article"),
                                 pl.col("categorie_sans_sortie").cast(pl.Utf8).alias("categorie_sortie"),
                             ])
                             .filter(pl.col("code_article").is_in(codes))
@@ -194,11 +150,69 @@ def consommables_offer():
                 pass
     except Exception:
         pass
+    return df
 
+
+@bp.get("/offer")
+def consommables_offer():
+    offer_parquet_dir = (CONSO_OFFER_DIR or "").strip()
+    offer_src_dir = (CONSO_OFFER_SRC_DIR or "").strip()
+
+    latest_path = None
+    offer_mode = None
+    parquet_path = None
+
+    if offer_parquet_dir and os.path.isdir(offer_parquet_dir):
+        parquet_path = os.path.join(offer_parquet_dir, "offre_consommables.parquet")
+        if os.path.exists(parquet_path):
+            offer_mode = "parquet"
+            latest_path = parquet_path
+
+    if offer_mode is None:
+        if not offer_src_dir:
+            return jsonify({
+                "available": False,
+                "error": "offer_src_dir_not_configured",
+                "rows": [],
+            }), 200
+
+        if not os.path.isdir(offer_src_dir):
+            return jsonify({
+                "available": False,
+                "error": "offer_src_dir_not_found",
+                "dir": offer_src_dir,
+                "rows": [],
+            }), 200
+
+        latest_path = _latest_excel_in_dir(offer_src_dir)
+        if not latest_path:
+            return jsonify({
+                "available": False,
+                "error": "offer_file_not_found",
+                "dir": offer_src_dir,
+                "rows": [],
+            }), 200
+        offer_mode = "excel"
+
+    # Offre (fichier hors snapshot) enrichie avec le snapshot : les deux versions comptent.
+    # Le résultat enrichi est mis en cache pour ces versions (toutes les pages en profitent).
+    version = data_version(current_snapshot().version, latest_path)
     try:
-        rows = [r for r in df.iter_rows(named=True)] if df is not None else []
-    except Exception:
-        rows = []
+        df = get_result_cache().get_or_compute(
+            "consommables.offer",
+            {"file": latest_path, "mode": offer_mode},
+            lambda: _offer_frame(latest_path, offer_mode),
+            version=version,
+        )
+    except Exception as e:
+        return jsonify({
+            "available": False,
+            "error": f"read_failed: {e.__class__.__name__}",
+            "message": str(e),
+            "file": os.path.basename(latest_path) if latest_path else None,
+            "dir": os.path.dirname(latest_path) if latest_path else None,
+            "rows": [],
+        }), 200
 
     try:
         mtime = os.path.getmtime(latest_path)
@@ -209,7 +223,12 @@ def consommables_offer():
 
     cols = list(df.columns) if df is not None else []
 
-    return jsonify({
+    try:
+        df, page = paginate(df, page_request(request.args, version))
+    except PageError as e:
+        return jsonify({"error": e.code}), e.status
+
+    fields = {
         "available": True,
         "mode": offer_mode,
         "dir": os.path.dirname(latest_path) if latest_path else None,
@@ -217,5 +236,7 @@ def consommables_offer():
         "mtime": mtime,
         "mtime_iso": mtime_iso,
         "columns": cols,
-        "rows": rows,
-    }), 200
+    }
+    if page:
+        fields["page"] = page
+    return frame_response(df, fields)
@@ -182,7 +182,7 @@ def download_stock_final_csv_api():
         return jsonify({"error": "not_found"}), 404
 
     try:
-        df = pl.read_parquet(stock_parquet)
+        lf = pl.scan_parquet(stock_parquet)
     except Exception:
         return jsonify({"error": "read_failed"}), 500
 
@@ -191,7 +191,8 @@ def download_stock_final_csv_api():
     tmp.close()
 
     try:
-        df.write_csv(tmp_path, separator=";")
+        # Export en flux, row group par row group : le parquet n'est pas chargé entièrement en mémoire
+        lf.sink_csv(tmp_path, separator=";")
     except Exception:
         return jsonify({"error": "export_failed"}), 500
 
@@ -1,16 +1,47 @@
-from flask import jsonify
+from flask import jsonify, request
 
 from . import bp
+from supplychain_app.core.http_cache import snapshot_etag
+from supplychain_app.core.result_cache import cached_response
 from supplychain_app.data.pudo_service import (
     get_helios_production_summary_for_item,
     get_helios_active_sites_for_item,
     get_coords_for_ig,
     get_helios_active_items_for_site,
     get_helios_parent_child_items_for_site,
+    get_nearby_helios_sites,
 )
 
 
+@bp.get("/nearby")
+@snapshot_etag()
+def helios_nearby():
+    """Sites Helios proches d'un point.
+
+    Query params : lat, lon (obligatoires), radius_km (optionnel), n (optionnel).
+    Sans radius_km, renvoie les n sites les plus proches (10 par défaut).
+    """
+    try:
+        lat = float(request.args.get("lat"))
+        lon = float(request.args.get("lon"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "lat and lon are required"}), 400
+
+    radius_km = request.args.get("radius_km")
+    n = request.args.get("n")
+    try:
+        radius_val = float(radius_km) if radius_km not in (None, "") else None
+        n_val = max(1, min(int(n), 500)) if n not in (None, "") else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "invalid radius_km or n"}), 400
+
+    rows = get_nearby_helios_sites(lat, lon, radius_val, n_val)
+    return jsonify({"rows": rows, "center_lat": lat, "center_lon": lon})
+
+
 @bp.get("/<code>")
+@snapshot_etag()
+@cached_response()
 def helios_for_item(code: str):
     """Return Helios park summary and active sites for a given item code.
 
@@ -37,6 +68,8 @@ def helios_for_item(code: str):
 
 
 @bp.get("/site/<code_ig>")
+@snapshot_etag()
+@cached_response()
 def helios_for_site(code_ig: str):
     code = (code_ig or "").strip().upper()
     if not code:
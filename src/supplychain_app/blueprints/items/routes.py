@@ -1,14 +1,32 @@
+import datetime
 import os
 import polars as pl
-import unicodedata
 
 from flask import request, jsonify
 
 from . import bp
-from ...services.items_service import search_items_df, get_item_full, get_stats_exit, get_stats_exit_monthly
-from supplychain_app.items import Nomenclatures
-from supplychain_app.constants import path_datan, folder_name_app, path_output
-from supplychain_app.data.pudo_service import get_equivalents_for
+from ...services.items_service import (
+    search_items_df,
+    get_item_full,
+    get_stats_exit,
+    get_stats_exit_monthly,
+    get_nomenclatures,
+    get_item_row,
+    get_where_used,
+    get_item_network,
+)
+from supplychain_app.constants import path_datan, folder_name_app
+from supplychain_app.data.data_store import current_snapshot, get_data_store
+from supplychain_app.core.text_norm import norm_text, norm_text_expr
+from supplychain_app.core.json_response import frame_response
+from supplychain_app.core.pagination import PageError, page_request, paginate
+from supplychain_app.core.http_cache import snapshot_etag
+from supplychain_app.core.result_cache import cached_response
+
+# /<code>/network : profondeur maximale (sauts ; sans ``depth``, nomenclature complète) et plafonds par défaut / maximum
+NETWORK_MAX_DEPTH = 10
+NETWORK_DEFAULT_MAX_NODES, NETWORK_MAX_NODES = 500, 5000
+NETWORK_DEFAULT_MAX_EDGES, NETWORK_MAX_EDGES = 2000, 20000
 
 
 @bp.get("/meta/feuilles_du_catalogue")
@@ -63,37 +81,6 @@ def list_fabricants():
         return jsonify({"values": []})
 
 
-def _norm_txt(v: str) -> str:
-    s = (v or "").strip()
-    if not s:
-        return ""
-    try:
-        s = unicodedata.normalize("NFKD", s)
-        s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    except Exception:
-        pass
-    # normaliser les espaces (NBSP, tabulations, multiples)
-    try:
-        s = s.replace("\u00A0", " ")
-        s = " ".join(s.split())
-    except Exception:
-        pass
-    return s.upper()
-
-
-def _norm_expr(col_name: str) -> pl.Expr:
-    """Normalisation côté Polars (alignée avec _norm_txt) pour comparaison robuste."""
-    # Remarque : on réduit les espaces multiples, y compris NBSP.
-    return (
-        pl.col(col_name)
-        .cast(pl.Utf8, strict=False)
-        .str.replace_all("\u00A0", " ")
-        .str.replace_all(r"\s+", " ")
-        .str.strip_chars()
-        .str.to_uppercase()
-    )
-
-
 @bp.get("/pim/check_reference_fabricant")
 def pim_check_reference_fabricant():
     """Vérifie si une référence fabricant existe déjà dans le parquet manufacturers (PIM).
@@ -108,8 +95,8 @@ def pim_check_reference_fabricant():
     debug = str(request.args.get("debug", "")).strip() in {"1", "true", "True", "yes", "YES"}
     strict_fabricant = str(request.args.get("strict_fabricant", "")).strip() in {"1", "true", "True", "yes", "YES"}
 
-    ref = _norm_txt(request.args.get("reference", ""))
-    fabricant = _norm_txt(request.args.get("fabricant", ""))
+    ref = norm_text(request.args.get("reference", ""))
+    fabricant = norm_text(request.args.get("fabricant", ""))
     if not ref:
         payload = {"exists": False, "matches": 0, "samples": []}
         if debug:
@@ -121,9 +108,15 @@ def pim_check_reference_fabricant():
             )
         return jsonify(payload)
 
-    parquet_path = os.path.join(path_datan, folder_name_app, "manufacturer.parquet")
-    if not os.path.exists(parquet_path):
-        parquet_path = os.path.join(path_datan, folder_name_app, "manufacturers.parquet")
+    # Parquet manufacturers du snapshot courant : colonnes normalisées déjà matérialisées.
+    snap = current_snapshot()
+    df = snap.manufacturers
+    norm_df = snap.normalized("manufacturers")
+    parquet_path = get_data_store().parquet_path("manufacturers")
+    if df.is_empty():
+        # Compatibilité : ancien nom de fichier (manufacturer.parquet), normalisé à la volée
+        norm_df = None
+        parquet_path = os.path.join(path_datan, folder_name_app, "manufacturer.parquet")
         if not os.path.exists(parquet_path):
             payload = {"exists": False, "matches": 0, "samples": []}
             if debug:
@@ -139,20 +132,20 @@ def pim_check_reference_fabricant():
                 )
             return jsonify(payload)
 
-    try:
-        df = pl.read_parquet(parquet_path)
-    except Exception as e:
-        payload = {"exists": False, "matches": 0, "samples": []}
-        if debug:
-            payload.update(
-                {
-                    "debug": True,
-                    "reason": "parquet_read_error",
-                    "parquet_path": parquet_path,
-                    "error": str(e),
-                }
-            )
-        return jsonify(payload)
+        try:
+            df = pl.read_parquet(parquet_path)
+        except Exception as e:
+            payload = {"exists": False, "matches": 0, "samples": []}
+            if debug:
+                payload.update(
+                    {
+                        "debug": True,
+                        "reason": "parquet_read_error",
+                        "parquet_path": parquet_path,
+                        "error": str(e),
+                    }
+                )
+            return jsonify(payload)
 
     if df.is_empty():
         payload = {"exists": False, "matches": 0, "samples": []}
@@ -176,6 +169,7 @@ def pim_check_reference_fabricant():
         "reference_fournisseur",
     ]
     fab_candidates = [
+        "nom_fabricant",
         "fabricant",
         "nom_fournisseur",
         "fournisseur",
@@ -210,10 +204,15 @@ def pim_check_reference_fabricant():
         return jsonify(payload)
     fab_cols = [c for c in fab_candidates if c in df.columns]
 
+    def _norm_col(c: str) -> pl.Series:
+        if norm_df is not None and c in norm_df.columns and norm_df.height == df.height:
+            return norm_df.get_column(c)
+        return df.select(norm_text_expr(c)).to_series()
+
     try:
         cond_ref = None
         for c in ref_cols:
-            ccond = _norm_expr(c) == ref
+            ccond = _norm_col(c) == ref
             cond_ref = ccond if cond_ref is None else (cond_ref | ccond)
 
         cond = cond_ref
@@ -222,7 +221,7 @@ def pim_check_reference_fabricant():
         if strict_fabricant and fabricant and fab_cols:
             cond_fab = None
             for c in fab_cols:
-                ccond = _norm_expr(c) == fabricant
+                ccond = _norm_col(c) == fabricant
                 cond_fab = ccond if cond_fab is None else (cond_fab | ccond)
             cond = cond_ref & cond_fab
 
@@ -273,13 +272,21 @@ def items_search():
     filters = body.get("filters") or {}
     limit = int(body.get("limit") or 300)
     df = search_items_df(q, filters, limit)
-    return jsonify({
-        "columns": (df.columns if df is not None else []),
-        "rows": ([r for r in df.iter_rows(named=True)] if df is not None else []),
-    })
+    columns = df.columns if df is not None else []
+    # Pagination (query string) sur les ``limit`` premiers résultats de la recherche
+    try:
+        df, page = paginate(df, page_request(request.args, current_snapshot().version, query=body))
+    except PageError as e:
+        return jsonify({"error": e.code}), e.status
+    fields = {"columns": columns}
+    if page:
+        fields["page"] = page
+    return frame_response(df, fields)
 
 
 @bp.get("/<code>/nomenclature")
+@snapshot_etag()
+@cached_response()
 def item_nomenclature(code: str):
     """Return item BOM tree and ASCII representation for a given article code.
 
@@ -289,37 +296,23 @@ def item_nomenclature(code: str):
     if not code:
         return jsonify({"error": "code is required"}), 400
 
-    # 1) Charger les données items + nomenclatures depuis le dernier dossier d'output
-    try:
-        # même logique que dans package_supply_chain.api.api_tree_nomenclature_items
-        last_folder = os.listdir(os.path.join(path_output))[-1]
-        base = os.path.join(path_output, last_folder)
-        items_path = os.path.join(base, "items.parquet")
-        nom = Nomenclatures(base, "nomenclatures.parquet")
-    except Exception:
-        # fallback: ancien comportement basé sur path_datan
-        try:
-            base = path_datan / folder_name_app
-            items_path = base / "items.parquet"
-            nom = Nomenclatures(str(base), "nomenclatures.parquet")
-        except Exception:
-            return jsonify({"code": code, "tree": {}, "ascii": ""})
-
+    # 1) Nomenclatures du snapshot courant (construites une fois par chargement)
     try:
-        df_items = pl.read_parquet(items_path)
-        dico_items = {row["code_article"]: row for row in df_items.iter_rows(named=True)}
+        nom = get_nomenclatures()
     except Exception:
-        dico_items = {}
+        return jsonify({"code": code, "tree": {}, "ascii": ""})
 
     try:
-        tree = nom.get_item_tree(code)
+        explosion = nom.explode(code)
+        tree = explosion.tree
     except Exception:
+        explosion = None
         tree = {}
 
     # 2) Transformer l'arbre en ASCII avec la même logique que tree_to_ascii
     ascii_lines: list[str] = []
     try:
-        def _tree_to_ascii(node, dico_items_local, depth=0, branch_prefixs=None, is_last=True):
+        def _tree_to_ascii(node, depth=0, branch_prefixs=None, is_last=True):
             if not node or "code_article" not in node:
                 return []
             if branch_prefixs is None:
@@ -332,8 +325,8 @@ def item_nomenclature(code: str):
                 prefix += ("└───" if is_last else "├───")
             code_art = str(node.get("code_article", "")).strip()
             qte = node.get("quantite")
-            if code_art in dico_items_local:
-                row = dico_items_local[code_art]
+            row = get_item_row(code_art) if code_art else None
+            if row is not None:
                 lib_art = row.get("libelle_court_article")
                 type_art = row.get("type_article")
                 statut_art = row.get("statut_abrege_article")
@@ -341,15 +334,17 @@ def item_nomenclature(code: str):
             else:
                 lib_art, type_art, statut_art, criticite = "?", "?", "?", "?"
             items_info = f"{code_art} | {lib_art} | {type_art} | {statut_art} | {criticite} | {qte}"
+            if node.get("cycle"):
+                items_info += " | cycle"
             lines.append(prefix + items_info)
             children = [c for c in (node.get("code_article_fils") or []) if c]
             for i, child in enumerate(children):
                 is_last_child = (i == len(children) - 1)
                 new_branch_prefixs = branch_prefixs + [(not is_last_child)]
-                lines.extend(_tree_to_ascii(child, dico_items_local, depth + 1, new_branch_prefixs, is_last_child))
+                lines.extend(_tree_to_ascii(child, depth + 1, new_branch_prefixs, is_last_child))
             return lines
 
-        ascii_lines = _tree_to_ascii(tree, dico_items)
+        ascii_lines = _tree_to_ascii(tree)
     except Exception:
         ascii_lines = []
 
@@ -357,14 +352,37 @@ def item_nomenclature(code: str):
         "code": code,
         "tree": tree,
         "ascii": "\n".join(ascii_lines) if ascii_lines else "",
+        # Quantités totales tous niveaux (pour 1 article racine), cycles détectés
+        "quantites": [
+            {"code_article": c, "quantite": q}
+            for c, q in sorted((explosion.quantities if explosion else {}).items())
+        ],
+        "cycles": explosion.cycles if explosion else [],
+        "tronque": bool(explosion.truncated) if explosion else False,
     })
 
+@bp.get("/<code>/where-used")
+@snapshot_etag()
+def item_where_used(code: str):
+    """Cas d'emploi (nomenclature inverse) : ascendants de l'article avec quantités
+    cumulées et parc installé Helios de chaque ascendant."""
+    code = (code or "").strip().upper()
+    if not code:
+        return jsonify({"error": "code is required"}), 400
+    try:
+        return jsonify(get_where_used(code))
+    except Exception:
+        return jsonify({"error": "where_used_failed"}), 500
+
 @bp.get("/<code>/details")
+@snapshot_etag()
 def item_details(code: str):
     details = get_item_full(code)
     return jsonify(details)
 
 @bp.get("/<code>/stats-exit")
+@snapshot_etag()
+@cached_response()
 def item_stats_exit(code: str):
     type_exits = request.args.getlist("type_exit")
     if not type_exits:
@@ -375,13 +393,17 @@ def item_stats_exit(code: str):
         type_exits_arg = type_exits
 
     df = get_stats_exit(code, type_exits_arg)
-    return jsonify({
-        "columns": (df.columns if df is not None else []),
-        "rows": ([r for r in df.iter_rows(named=True)] if df is not None else []),
-    })
+    return frame_response(df, {"columns": (df.columns if df is not None else [])})
+
+
+def _current_month() -> str:
+    """Période de calcul des sorties mensuelles (année en cours, mois par mois)."""
+    return datetime.date.today().strftime("%Y-%m")
 
 
 @bp.get("/<code>/stats-exit-monthly")
+@snapshot_etag(vary=_current_month)
+@cached_response(vary=_current_month)
 def item_stats_exit_monthly(code: str):
     type_exits = request.args.getlist("type_exit")
     if not type_exits:
@@ -392,10 +414,7 @@ def item_stats_exit_monthly(code: str):
         type_exits_arg = type_exits
 
     df = get_stats_exit_monthly(code, type_exits_arg)
-    return jsonify({
-        "columns": (df.columns if df is not None else []),
-        "rows": ([r for r in df.iter_rows(named=True)] if df is not None else []),
-    })
+    return frame_response(df, {"columns": (df.columns if df is not None else [])})
 
 @bp.get("/<code>/categorie-sans-sortie")
 def item_categorie_sans_sortie(code: str):
@@ -433,108 +452,56 @@ def item_categorie_sans_sortie(code: str):
 
 
 @bp.get("/<code>/network")
+@snapshot_etag()
 def item_network(code: str):
     """Retourne un graphe réseau de relations entre articles pour un code donné.
 
     - Nœud racine = code demandé
-    - Arêtes de type "bom" issues de l'arbre de nomenclature (parent ↔ fils)
+    - Arêtes de type "bom" issues de la nomenclature (parent → fils)
     - Arêtes de type "equiv" issues des équivalents d'article
+
+    Le graphe des articles est précalculé une fois par snapshot ; la requête ne
+    fait qu'un parcours en largeur limité par ``depth`` (nombre de sauts),
+    ``max_nodes`` et ``max_edges``. Sans ``depth`` (comme avant l'ajout du
+    paramètre) : nomenclature complète de l'article et ses seuls équivalents
+    directs, sans la nomenclature des équivalents.
+    ``parents=1`` suit aussi la nomenclature vers les articles parents.
     """
 
     base_code = (code or "").strip().upper()
     if not base_code:
         return jsonify({"error": "code is required"}), 400
 
-    nodes: dict[str, dict] = {}
-    edges: list[dict] = []
-
-    def add_node(code_art: str, group: str = "item"):
-        c = (code_art or "").strip().upper()
-        if not c:
-            return
-        if c not in nodes:
-            nodes[c] = {"id": c, "label": c, "group": group}
-
-    def add_edge(src: str, dst: str, edge_type: str):
-        s = (src or "").strip().upper()
-        d = (dst or "").strip().upper()
-        if not s or not d or s == d:
-            return
-        edges.append({"from": s, "to": d, "type": edge_type})
-
-    # Nœud racine
-    add_node(base_code, group="root")
-
-    # 1) Arbre de nomenclature (BOM)
-    tree = None
-    try:
-        # Réutiliser la logique de item_nomenclature via Nomenclatures
+    def _int_arg(name: str, default: int, upper: int) -> int:
         try:
-            last_folder = os.listdir(os.path.join(path_output))[-1]
-            base = os.path.join(path_output, last_folder)
-            nom = Nomenclatures(base, "nomenclatures.parquet")
-        except Exception:
-            base = path_datan / folder_name_app
-            nom = Nomenclatures(str(base), "nomenclatures.parquet")
+            value = int(request.args.get(name, default))
+        except (TypeError, ValueError):
+            value = default
+        return max(1, min(value, upper))
+
+    depth = _int_arg("depth", NETWORK_MAX_DEPTH, NETWORK_MAX_DEPTH) if request.args.get("depth") else None
+    max_nodes = _int_arg("max_nodes", NETWORK_DEFAULT_MAX_NODES, NETWORK_MAX_NODES)
+    max_edges = _int_arg("max_edges", NETWORK_DEFAULT_MAX_EDGES, NETWORK_MAX_EDGES)
+    parents = str(request.args.get("parents", "")).strip().lower() in ("1", "true", "yes", "oui")
 
-        tree = nom.get_item_tree(base_code)
-    except Exception:
-        tree = None
-
-    def walk_bom(node, parent_code: str | None = None):
-        if not node or "code_article" not in node:
-            return
-        code_art = str(node.get("code_article", "")).strip().upper()
-        if not code_art:
-            return
-        add_node(code_art, group="item")
-        if parent_code:
-            add_edge(parent_code, code_art, "bom")
-        children = [c for c in (node.get("code_article_fils") or []) if isinstance(c, dict)]
-        for child in children:
-            walk_bom(child, code_art)
-
-    if tree:
-        walk_bom(tree, None)
-
-    # 2) Équivalents d'article
     try:
-        eq_rows = get_equivalents_for(base_code) or []
+        graph = get_item_network(base_code, depth, max_nodes, max_edges, parents=parents)
     except Exception:
-        eq_rows = []
-
-    for row in eq_rows:
-        if not isinstance(row, dict):
-            continue
-        # Chercher un champ contenant un code article différent du code de base
-        eq_code = None
-        for k, v in row.items():
-            if v is None:
-                continue
-            key_l = str(k).lower()
-            if "code" in key_l and "article" in key_l:
-                cand = str(v).strip().upper()
-                if cand and cand != base_code:
-                    eq_code = cand
-                    break
-        if not eq_code:
-            continue
-        add_node(eq_code, group="equiv")
-        add_edge(base_code, eq_code, "equiv")
-
-    # Dédoublonner les arêtes (from, to, type)
-    seen = set()
-    unique_edges: list[dict] = []
-    for e in edges:
-        key = (e["from"], e["to"], e["type"])
-        if key in seen:
-            continue
-        seen.add(key)
-        unique_edges.append(e)
-
+        graph = {"nodes": [{"id": base_code, "hop": 0, "via": None}], "edges": [], "truncated": False}
+
+    nodes = [
+        {
+            "id": n["id"],
+            "label": n["id"],
+            "group": "root" if n["hop"] == 0 else ("equiv" if n["via"] == "equiv" else "item"),
+            "hop": n["hop"],
+        }
+        for n in graph["nodes"]
+    ]
     return jsonify({
         "code": base_code,
-        "nodes": list(nodes.values()),
-        "edges": unique_edges,
+        "depth": depth,
+        "nodes": nodes,
+        "edges": graph["edges"],
+        "truncated": graph["truncated"],
     })
-
@@ -2,11 +2,16 @@ import os
 
 from flask import request, jsonify
 from . import bp
-from supplychain_app.services.pudo_service import get_available_pudo, get_pudo_directory, reload_data as reload_services_data
+from supplychain_app.services.pudo_service import get_available_pudo, get_nearest_pudo, get_pudo_directory
 from supplychain_app.services.geocoding import get_latitude_and_longitude
-from supplychain_app.data.pudo_etl import get_update_status, update_data
-from supplychain_app.data.pudo_service import reload_data as reload_data_data
+from supplychain_app.data.pudo_etl import get_update_status
+from supplychain_app.data.etl_scheduler import get_etl_scheduler
 from supplychain_app.data.pudo_service import get_coords_for_ig
+from supplychain_app.core.json_response import frame_response
+from supplychain_app.core.pagination import PageError, page_request, paginate
+from supplychain_app.core.http_cache import snapshot_etag
+from supplychain_app.core.spatial import proximity_search
+from supplychain_app.data.data_store import current_snapshot
 
 
 @bp.post("/search")
@@ -16,9 +21,12 @@ def pudo_search():
     lon = float(body.get("lon"))
     radius = float(body.get("radius", 10))
     enseignes = body.get("enseignes")
-    df = get_available_pudo(lat, lon, radius, enseignes)
-    rows = [r for r in df.iter_rows(named=True)] if df is not None else []
-    return jsonify({"rows": rows})
+    df = proximity_search(body, lat, lon, radius, get_nearest_pudo, get_available_pudo, enseignes)
+    try:
+        df, page = paginate(df, page_request(request.args, current_snapshot().version, query=body))
+    except PageError as e:
+        return jsonify({"error": e.code}), e.status
+    return frame_response(df, {"page": page} if page else None)
 
 
 @bp.post("/nearby-address")
@@ -46,22 +54,36 @@ def pudo_nearby_address():
     if not geocoded_address:
         geocoded_address = address or code_ig
 
-    df = get_available_pudo(float(lat), float(lon), radius, enseignes)
-    rows = [r for r in df.iter_rows(named=True)] if df is not None else []
-    return jsonify({
-        "rows": rows,
+    df = proximity_search(body, float(lat), float(lon), radius, get_nearest_pudo, get_available_pudo, enseignes)
+    try:
+        df, page = paginate(df, page_request(request.args, current_snapshot().version, query=body))
+    except PageError as e:
+        return jsonify({"error": e.code}), e.status
+    fields = {
         "geocoded_address": geocoded_address,
         "center_lat": float(lat),
         "center_lon": float(lon),
-    }), 200
+    }
+    if page:
+        fields["page"] = page
+    return frame_response(df, fields)
 
 
 @bp.get("/directory")
+@snapshot_etag()
 def pudo_directory_api():
     """
     Retourne l'annuaire des points relais pour l'administration PR.
+
+    Paginé si ``limit`` / ``cursor`` sont fournis (voir ``core.pagination``).
     """
     rows = get_pudo_directory()
+    try:
+        rows, page = paginate(rows, page_request(request.args, current_snapshot().version))
+    except PageError as e:
+        return jsonify({"error": e.code}), e.status
+    if page:
+        return jsonify({"rows": rows, "page": page})
     return jsonify({"rows": rows})
 
 
@@ -98,15 +120,9 @@ def pudo_update_status_api():
 @bp.post("/update")
 def pudo_update_api():
     try:
-        result = update_data()
-        try:
-            reload_services_data(force=True)
-        except Exception:
-            pass
-        try:
-            reload_data_data(force=True)
-        except Exception:
-            pass
+        # Exécution unique : si une mise à jour complète est déjà en cours, on attend
+        # son résultat ; une mise à jour en erreur lève son exception (réponse 500)
+        result = get_etl_scheduler().run_now("manual")
         return jsonify(result), 200
     except Exception as e:
         return jsonify({"error": f"{e.__class__.__name__}: {e}"}), 500
@@ -4,7 +4,7 @@ import tempfile
 import polars as pl
 from flask import request, jsonify, send_file
 from . import bp
-from supplychain_app.services.pudo_service import get_nearby_stores
+from supplychain_app.services.pudo_service import get_nearby_stores, get_nearest_stores
 from supplychain_app.services.geocoding import get_latitude_and_longitude
 from supplychain_app.data.pudo_service import (
     get_stock_map_for_item,
@@ -12,8 +12,15 @@ from supplychain_app.data.pudo_service import (
     get_pudo_coords,
     get_stock_map_for_all_stores_by_type,
 )
+from supplychain_app.data.data_store import current_snapshot, rows_for_keys
+from supplychain_app.core.json_response import frame_response
+from supplychain_app.core.pagination import PageError, page_request, paginate
+from supplychain_app.core.http_cache import snapshot_etag
+from supplychain_app.core.result_cache import cached_response
+from supplychain_app.core.spatial import proximity_search
 from supplychain_app.constants import path_datan, folder_name_app
 
+
 @bp.post("/nearby")
 def stores_nearby():
     body = request.get_json(silent=True) or {}
@@ -21,9 +28,12 @@ def stores_nearby():
     lon = float(body.get("lon"))
     radius = float(body.get("radius", 10))
     types = body.get("store_types")
-    df = get_nearby_stores(lat, lon, radius, types)
-    rows = [r for r in df.iter_rows(named=True)] if df is not None else []
-    return jsonify({"rows": rows})
+    df = proximity_search(body, lat, lon, radius, get_nearest_stores, get_nearby_stores, types)
+    try:
+        df, page = paginate(df, page_request(request.args, current_snapshot().version, query=body))
+    except PageError as e:
+        return jsonify({"error": e.code}), e.status
+    return frame_response(df, {"page": page} if page else None)
 
 
 @bp.post("/nearby-address")
@@ -60,17 +70,24 @@ def stores_nearby_address():
             "center_lon": float(lon),
         }), 200
 
-    df = get_nearby_stores(float(lat), float(lon), radius, types)
-    rows = [r for r in df.iter_rows(named=True)] if df is not None else []
-    return jsonify({
-        "rows": rows,
+    df = proximity_search(body, float(lat), float(lon), radius, get_nearest_stores, get_nearby_stores, types)
+    try:
+        df, page = paginate(df, page_request(request.args, current_snapshot().version, query=body))
+    except PageError as e:
+        return jsonify({"error": e.code}), e.status
+    fields = {
         "geocoded_address": geocoded_address,
         "center_lat": float(lat),
         "center_lon": float(lon),
-    }), 200
+    }
+    if page:
+        fields["page"] = page
+    return frame_response(df, fields)
 
 
 @bp.get("/stock-map/<code_article>")
+@snapshot_etag()
+@cached_response()
 def stores_stock_map(code_article: str):
     code = (code_article or "").strip()
     if not code:
@@ -81,6 +98,7 @@ def stores_stock_map(code_article: str):
 
 
 @bp.post("/stock-map")
+@cached_response()
 def stores_stock_map_with_ref():
     body = request.get_json(silent=True) or {}
     code_article = (body.get("code_article") or "").strip()
@@ -239,13 +257,12 @@ def stores_stock_map_export():
     if not os.path.exists(stock_parquet):
         return jsonify({"error": "not_found"}), 404
 
+    # Filtre sur les codes article (poussé à la lecture du parquet) et les quantités strictement positives
     try:
-        df = pl.read_parquet(stock_parquet)
+        df = rows_for_keys("stock_final", "code_article", codes, stock_parquet)
     except Exception:
         return jsonify({"error": "read_failed"}), 500
 
-    # Filtre sur les codes article et les quantités strictement positives
-    df = df.filter(pl.col("code_article").is_in(codes))
     if "qte_stock" in df.columns:
         df = df.filter(pl.col("qte_stock") > 0)
 
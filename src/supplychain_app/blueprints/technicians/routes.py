@@ -1,8 +1,14 @@
+import json
 import os
 
-from flask import request, jsonify, session
+import polars as pl
+from flask import Response, request, jsonify, session, stream_with_context
 
 from . import bp
+from supplychain_app.constants import CHOIX_PR_TECH_DIR, CHOIX_PR_TECH_FILE
+from supplychain_app.core.json_response import frame_response
+from supplychain_app.core.pagination import PageError, data_version, page_request, paginate
+from supplychain_app.data.data_store import current_snapshot
 from supplychain_app.services.pudo_service import (
     get_store_contacts,
     get_store_types,
@@ -16,8 +22,16 @@ from supplychain_app.services.pudo_service import (
     get_ol_igs,
     get_ol_stores,
     search_ol_igs,
+    get_store_points,
+    get_pudo_points,
+    coordinate_points,
+    iter_distance_matrix,
 )
 
+# Au-delà de ce nombre de distances renvoyées, la matrice est streamée en NDJSON
+_MATRIX_STREAM_CELLS = 1_000_000
+_MATRIX_MAX_CELLS = 50_000_000
+
 
 def _ol_allowed_logins() -> set[str]:
     raw = (os.environ.get("SCAPP_OL_ALLOWED_LOGINS") or "").strip()
@@ -143,11 +157,9 @@ def technician_distances_pr_api(code: str):
     limit = request.args.get("limit")
 
     df = get_distance_tech_pr_for_store(code_magasin=code, code_pr=pr_code, limit=limit)
-    rows = [r for r in df.iter_rows(named=True)] if df is not None else []
-    return jsonify({
+    return frame_response(df, {
         "code_magasin": code,
         "pr": pr_code,
-        "rows": rows,
     })
 
 
@@ -162,6 +174,7 @@ def technician_assignments_api():
       - status: filter on statut (substring, case-insensitive)
       - roles: repeated param to filter on pr_role
       - expand_store_roles: when true, returns all rows (all roles) for stores matching the filters
+      - limit / cursor / sort: optional pagination (see core.pagination)
     """
     rows = list_technician_pudo_assignments() or []
 
@@ -212,6 +225,15 @@ def technician_assignments_api():
                 r for r in rows
                 if str(r.get("code_magasin") or "").strip().lower() in store_codes
             ]
+
+    # Les attributions combinent le snapshot et le fichier des choix PR
+    version = data_version(current_snapshot().version, os.path.join(CHOIX_PR_TECH_DIR, CHOIX_PR_TECH_FILE))
+    try:
+        filtered, page = paginate(filtered, page_request(request.args, version))
+    except PageError as e:
+        return jsonify({"error": e.code}), e.status
+    if page:
+        return jsonify({"rows": filtered, "page": page})
     return jsonify({"rows": filtered})
 
 
@@ -302,5 +324,78 @@ def ol_stores_list():
         return denied
     """Liste des magasins NATIONAL / LOCAL utilisables pour l'expédition OL."""
     rows = get_ol_stores() or []
+    try:
+        rows, page = paginate(rows, page_request(request.args, current_snapshot().version))
+    except PageError as e:
+        return jsonify({"error": e.code}), e.status
+    if page:
+        return jsonify({"stores": rows, "page": page})
     return jsonify({"stores": rows})
 
+
+
+def _matrix_points(body: dict, codes_key: str, coords_key: str, resolver):
+    if body.get(coords_key) is not None:
+        if not isinstance(body.get(coords_key), list):
+            return None, None
+        return coordinate_points(body.get(coords_key))
+    codes = body.get(codes_key)
+    if codes is None or codes == "all":
+        return resolver(None)
+    if not isinstance(codes, list):
+        return None, None
+    return resolver([c for c in codes if c is not None and str(c).strip() != ""])
+
+
+@bp.post("/distance-matrix")
+def technician_distance_matrix_api():
+    """Matrice des distances à vol d'oiseau (km) entre techniciens/magasins et points relais.
+
+    Body JSON:
+      - stores: liste de code_magasin (origines), ou origins: [{id, lat, lon}] / [[lat, lon]]
+      - pudos: liste de code_point_relais (destinations, tous les PR si absent),
+        ou destinations: [{id, lat, lon}] / [[lat, lon]]
+      - top_k: si fourni, seules les k destinations les plus proches par origine
+      - stream: force la réponse NDJSON (automatique au-delà de 1 000 000 distances)
+    """
+    body = request.get_json(silent=True) or {}
+    if body.get("stores") is None and body.get("origins") is None:
+        return jsonify({"error": "stores or origins is required"}), 400
+
+    origins, origins_unresolved = _matrix_points(body, "stores", "origins", get_store_points)
+    destinations, destinations_unresolved = _matrix_points(body, "pudos", "destinations", get_pudo_points)
+    if origins is None or destinations is None:
+        return jsonify({"error": "stores/pudos must be lists of codes, origins/destinations lists of points"}), 400
+
+    top_k = body.get("top_k")
+    if top_k is not None:
+        try:
+            top_k = max(1, int(top_k))
+        except Exception:
+            return jsonify({"error": "top_k must be an integer"}), 400
+
+    per_row = min(top_k, destinations.height) if top_k is not None else destinations.height
+    cells = origins.height * per_row
+    if top_k is None and cells > _MATRIX_MAX_CELLS:
+        return jsonify({"error": "matrix too large", "cells": cells, "max_cells": _MATRIX_MAX_CELLS}), 413
+
+    meta = {
+        "origins": origins.height,
+        "destinations": destinations["id"].to_list() if top_k is None else destinations.height,
+        "top_k": top_k,
+        "unit": "km",
+        "unresolved": {"origins": origins_unresolved, "destinations": destinations_unresolved},
+    }
+    stream = str(body.get("stream") or "").strip().lower() in {"1", "true", "yes", "y", "on"}
+
+    if stream or cells > _MATRIX_STREAM_CELLS:
+        def generate():
+            yield json.dumps({"type": "meta", **meta}, ensure_ascii=False) + "\n"
+            for chunk in iter_distance_matrix(origins, destinations, top_k):
+                # Une ligne NDJSON par origine, écrite par Polars
+                yield chunk.select(pl.lit("row").alias("type"), pl.all()).write_ndjson()
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    chunks = list(iter_distance_matrix(origins, destinations, top_k))
+    return frame_response(pl.concat(chunks) if chunks else None, meta)
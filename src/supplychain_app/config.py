@@ -7,3 +7,23 @@ class Config:
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://127.0.0.1:8000,http://localhost:8000")
     # Point to existing data dir used by current app
     DATA_DIR = os.getenv("DATA_DIR")  # optional override
+    # Mise à jour des données : cadence (s) et gigue aléatoire ajoutée à chaque attente (s)
+    ETL_INTERVAL_S = int(os.getenv("ETL_INTERVAL_S", "1800"))
+    ETL_JITTER_S = int(os.getenv("ETL_JITTER_S", "120"))
+    # Surveillance des dossiers de données (rafraîchissement en quelques secondes) :
+    # balayage des partages réseau toutes les WATCH_POLL_S s, anti-rebond WATCH_DEBOUNCE_S s
+    WATCH_DATA = os.getenv("WATCH_DATA", "1") == "1"
+    WATCH_POLL_S = int(os.getenv("WATCH_POLL_S", "15"))
+    WATCH_DEBOUNCE_S = int(os.getenv("WATCH_DEBOUNCE_S", "3"))
+    # Serveur de l'API (run.py) : "waitress" (pool de threads borné, voir ADR 0010) ou "werkzeug" (développement).
+    # API_KEEPALIVE_S : fermeture des connexions keep-alive inactives
+    API_SERVER = os.getenv("API_SERVER", "waitress")
+    API_THREADS = int(os.getenv("API_THREADS", "8"))
+    API_CONNECTION_LIMIT = int(os.getenv("API_CONNECTION_LIMIT", "100"))
+    API_KEEPALIVE_S = int(os.getenv("API_KEEPALIVE_S", "120"))
+    # Compression gzip des réponses JSON / texte de l'API à partir de API_COMPRESS_MIN_SIZE octets
+    API_COMPRESS = os.getenv("API_COMPRESS", "1") == "1"
+    API_COMPRESS_MIN_SIZE = int(os.getenv("API_COMPRESS_MIN_SIZE", "1024"))
+    # Cache des résultats des lectures coûteuses (vidé à chaque nouveau snapshot) : taille max (Mo), durée de vie (s)
+    RESULT_CACHE_MAX_MB = int(os.getenv("RESULT_CACHE_MAX_MB", "128"))
+    RESULT_CACHE_TTL_S = int(os.getenv("RESULT_CACHE_TTL_S", "3600"))
@@ -0,0 +1,185 @@
+"""Graphe des relations entre articles (nomenclature + équivalences), en mémoire.
+
+Le graphe est stocké au format CSR (compressed sparse row) : les arcs sortants
+du nœud ``i`` sont ``targets[indptr[i]:indptr[i + 1]]`` (type de l'arc dans
+``kinds``). Chaque relation donne des arcs dans les deux sens pour pouvoir
+parcourir le graphe depuis n'importe quel article :
+
+- nomenclature : parent -> fils (``BOM_CHILD``) et fils -> parent (``BOM_PARENT``) ;
+- équivalence : dans les deux sens (``EQUIV``).
+
+Le graphe est immuable ; il est construit une fois par snapshot (index dérivé).
+"""
+from array import array
+from collections import deque
+
+import polars as pl
+
+from supplychain_app.core.text_norm import norm_text, norm_text_expr
+
+BOM_CHILD, BOM_PARENT, EQUIV = 0, 1, 2
+
+
+def _edges(df: pl.DataFrame, src: str, dst: str, keep: pl.Expr | None = None) -> pl.LazyFrame:
+    """Couples (src, dst) normalisés, distincts, sans boucle sur soi-même."""
+    lf = df.lazy()
+    if keep is not None:
+        lf = lf.filter(keep)
+    return (
+        lf.select(norm_text_expr(src).alias("src"), norm_text_expr(dst).alias("dst"))
+        .filter(
+            pl.col("src").is_not_null() & (pl.col("src") != "")
+            & pl.col("dst").is_not_null() & (pl.col("dst") != "")
+            & (pl.col("src") != pl.col("dst"))
+        )
+        .unique()
+    )
+
+
+class ArticleGraph:
+    """Graphe immuable des articles ; les nœuds sont identifiés par leur code normalisé."""
+
+    def __init__(self, codes: list[str], indptr: array, targets: array, kinds: array):
+        self.codes = codes
+        self._ids = {c: i for i, c in enumerate(codes)}
+        self._indptr = indptr
+        self._targets = targets
+        self._kinds = kinds
+
+    @classmethod
+    def from_frames(cls, nomenclatures: pl.DataFrame, equivalents: pl.DataFrame) -> "ArticleGraph":
+        """Construit le graphe depuis nomenclatures.parquet et equivalents.parquet."""
+        parts = []
+        bom_cols = {"article", "article_eqpt_article_fils", "art_et_art_fils_eqpt_quantite"}
+        if bom_cols.issubset(nomenclatures.columns):
+            bom = _edges(
+                nomenclatures, "article", "article_eqpt_article_fils",
+                keep=pl.col("art_et_art_fils_eqpt_quantite") > 0,
+            )
+            parts.append(bom.with_columns(pl.lit(BOM_CHILD, dtype=pl.UInt8).alias("kind")))
+            parts.append(
+                bom.select(
+                    pl.col("dst").alias("src"),
+                    pl.col("src").alias("dst"),
+                    pl.lit(BOM_PARENT, dtype=pl.UInt8).alias("kind"),
+                )
+            )
+        if {"code_article", "code_article_correspondant"}.issubset(equivalents.columns):
+            equiv = _edges(equivalents, "code_article", "code_article_correspondant")
+            parts.append(equiv.with_columns(pl.lit(EQUIV, dtype=pl.UInt8).alias("kind")))
+            parts.append(
+                equiv.select(
+                    pl.col("dst").alias("src"),
+                    pl.col("src").alias("dst"),
+                    pl.lit(EQUIV, dtype=pl.UInt8).alias("kind"),
+                )
+            )
+        if not parts:
+            return cls([], array("I", [0]), array("I"), array("B"))
+
+        arcs = pl.concat(parts).unique().collect()
+        codes = pl.concat([arcs.get_column("src"), arcs.get_column("dst")]).unique().sort()
+        ids = pl.DataFrame({"code": codes}).with_row_index("id")
+        arcs = (
+            arcs.join(ids.rename({"code": "src", "id": "src_id"}), on="src")
+            .join(ids.rename({"code": "dst", "id": "dst_id"}), on="dst")
+            # Dans un même nœud : fils, puis parents, puis équivalents, par code
+            .sort(["src_id", "kind", "dst"])
+        )
+        src_ids = arcs.get_column("src_id")
+        indptr = src_ids.search_sorted(pl.Series(range(len(codes) + 1), dtype=src_ids.dtype), side="left")
+        return cls(
+            codes.to_list(),
+            array("I", indptr.to_list()),
+            array("I", arcs.get_column("dst_id").to_list()),
+            array("B", arcs.get_column("kind").to_list()),
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code) -> bool:
+        return norm_text(code) in self._ids
+
+    def degree(self, code: str) -> int:
+        i = self._ids.get(norm_text(code))
+        return 0 if i is None else self._indptr[i + 1] - self._indptr[i]
+
+    def neighborhood(
+        self,
+        code: str,
+        depth: int | None = 1,
+        max_nodes: int = 500,
+        max_edges: int = 2000,
+        kinds: tuple[int, ...] = (BOM_CHILD, BOM_PARENT, EQUIV),
+        equiv_depth: int | None = None,
+    ) -> dict:
+        """Voisinage de ``code`` jusqu'à ``depth`` sauts (parcours en largeur ;
+        ``depth=None`` : sans limite de sauts, seuls ``max_nodes`` / ``max_edges`` bornent le parcours).
+
+        ``equiv_depth`` : à partir de ce nombre de sauts, les équivalences ne sont
+        plus suivies et les nœuds atteints par une équivalence ne sont plus
+        développés (``1`` : seuls les équivalents de ``code`` lui-même, sans leur
+        nomenclature). ``None`` : pas de restriction propre aux équivalences.
+
+        Retourne ``{"nodes", "edges", "truncated"}`` :
+          - nodes : ``{"id", "hop", "via"}`` (``via`` = type de l'arc qui a atteint le nœud) ;
+          - edges : ``{"from", "to", "type"}``, une seule fois par relation, les
+            arcs de nomenclature orientés parent -> fils (``type`` = "bom" ou "equiv") ;
+          - truncated : ``True`` si ``max_nodes`` ou ``max_edges`` a arrêté le parcours.
+        Seules les arêtes entre nœuds retenus sont renvoyées.
+        """
+        root = norm_text(code)
+        start = self._ids.get(root)
+        if start is None:
+            return {"nodes": [{"id": root, "hop": 0, "via": None}] if root else [], "edges": [], "truncated": False}
+
+        allowed = set(kinds)
+        hops = {start: 0}
+        by_equiv: set[int] = set()
+        nodes = [{"id": root, "hop": 0, "via": None}]
+        edges: list[dict] = []
+        seen_edges: set[tuple[int, int, int]] = set()
+        truncated = False
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            hop = hops[i]
+            equiv_closed = equiv_depth is not None and hop >= equiv_depth
+            if equiv_closed and i in by_equiv:
+                continue
+            for k in range(self._indptr[i], self._indptr[i + 1]):
+                kind = self._kinds[k]
+                if kind not in allowed or (equiv_closed and kind == EQUIV):
+                    continue
+                j = self._targets[k]
+                if j not in hops:
+                    if depth is not None and hop >= depth:
+                        continue
+                    if len(nodes) >= max_nodes:
+                        truncated = True
+                        continue
+                    hops[j] = hop + 1
+                    if kind == EQUIV:
+                        by_equiv.add(j)
+                    nodes.append({"id": self.codes[j], "hop": hop + 1, "via": "equiv" if kind == EQUIV else "bom"})
+                    queue.append(j)
+                # Une relation = une arête (orientée parent -> fils pour la nomenclature)
+                if kind == BOM_CHILD:
+                    key = (i, j, BOM_CHILD)
+                elif kind == BOM_PARENT:
+                    key = (j, i, BOM_CHILD)
+                else:
+                    key = (min(i, j), max(i, j), EQUIV)
+                if key in seen_edges:
+                    continue
+                if len(edges) >= max_edges:
+                    truncated = True
+                    continue
+                seen_edges.add(key)
+                edges.append({
+                    "from": self.codes[key[0]],
+                    "to": self.codes[key[1]],
+                    "type": "equiv" if key[2] == EQUIV else "bom",
+                })
+        return {"nodes": nodes, "edges": edges, "truncated": truncated}
@@ -0,0 +1,220 @@
+"""Calculs de distance à vol d'oiseau (haversine).
+
+Toutes les distances de l'application passent par ce module :
+
+- ``haversine_distance`` pour un couple de points isolé ;
+- ``haversine_expr`` pour une colonne Polars (calcul vectorisé, sans appel Python par ligne) ;
+- ``within_radius`` pour filtrer un DataFrame autour d'un point, avec un pré-filtre
+  par boîte englobante sur latitude/longitude avant le calcul exact ;
+- ``pairwise_distances`` pour une matrice origines × destinations, calculée par blocs.
+"""
+from collections.abc import Iterator
+from math import asin, cos, degrees, radians, sin, sqrt
+
+import polars as pl
+
+EARTH_RADIUS_KM = 6371.0
+# Marge relative de la boîte englobante (arrondis flottants)
+_BOX_MARGIN = 1e-9
+
+
+def haversine_distance(lat1, lon1, lat2, lon2) -> float:
+    """Distance (km) entre deux points GPS exprimés en degrés décimaux."""
+    lat1 = radians(float(lat1))
+    lon1 = radians(float(lon1))
+    lat2 = radians(float(lat2))
+    lon2 = radians(float(lon2))
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(min(1.0, a)))
+
+
+def _as_float_expr(value) -> pl.Expr:
+    if isinstance(value, pl.Expr):
+        return value.cast(pl.Float64, strict=False)
+    if isinstance(value, str):
+        return pl.col(value).cast(pl.Float64, strict=False)
+    return pl.lit(float(value), dtype=pl.Float64)
+
+
+def haversine_expr(lat1, lon1, lat2, lon2) -> pl.Expr:
+    """Expression Polars de distance haversine (km).
+
+    Chaque argument peut être un nom de colonne, une expression ou un nombre :
+    ``haversine_expr(48.85, 2.35, "latitude", "longitude")``.
+    """
+    la1 = _as_float_expr(lat1).radians()
+    lo1 = _as_float_expr(lon1).radians()
+    la2 = _as_float_expr(lat2).radians()
+    lo2 = _as_float_expr(lon2).radians()
+    a = ((la2 - la1) / 2).sin().pow(2) + la1.cos() * la2.cos() * ((lo2 - lo1) / 2).sin().pow(2)
+    return a.clip(0.0, 1.0).sqrt().arcsin() * (2 * EARTH_RADIUS_KM)
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """Boîte englobante (lat_min, lat_max, lon_min, lon_max) d'un cercle de rayon ``radius_km``.
+
+    La boîte contient toujours le cercle : elle ne sert qu'à écarter rapidement
+    les points trop éloignés avant le calcul exact.
+    """
+    lat = float(lat)
+    lon = float(lon)
+    # Angle au centre de la Terre sous-tendu par le rayon (même sphère que haversine_expr)
+    angle = float(radius_km) / EARTH_RADIUS_KM * (1 + _BOX_MARGIN)
+    dlat = degrees(angle)
+    lat_min = max(-90.0, lat - dlat)
+    lat_max = min(90.0, lat + dlat)
+    # Près des pôles (ou pour un très grand rayon), on ne restreint pas la longitude.
+    if lat_min <= -90.0 or lat_max >= 90.0:
+        return lat_min, lat_max, -180.0, 180.0
+    # Écart de longitude maximal sur le cercle : asin(sin(angle) / cos(lat))
+    ratio = sin(angle) / cos(radians(lat))
+    if ratio >= 1.0:
+        return lat_min, lat_max, -180.0, 180.0
+    dlon = degrees(asin(ratio)) * (1 + _BOX_MARGIN)
+    if dlon >= 180.0:
+        return lat_min, lat_max, -180.0, 180.0
+    return lat_min, lat_max, lon - dlon, lon + dlon
+
+
+def bounding_box_expr(lat: float, lon: float, radius_km: float, lat_col: str = "latitude", lon_col: str = "longitude") -> pl.Expr:
+    """Expression booléenne : le point (lat_col, lon_col) est dans la boîte englobante."""
+    lat_min, lat_max, lon_min, lon_max = bounding_box(lat, lon, radius_km)
+    la = pl.col(lat_col).cast(pl.Float64, strict=False)
+    lo = pl.col(lon_col).cast(pl.Float64, strict=False)
+    expr = la.is_between(lat_min, lat_max)
+    if lon_min <= -180.0 and lon_max >= 180.0:
+        return expr
+    if lon_min < -180.0:
+        return expr & (lo.is_between(-180.0, lon_max) | lo.is_between(lon_min + 360.0, 180.0))
+    if lon_max > 180.0:
+        return expr & (lo.is_between(lon_min, 180.0) | lo.is_between(-180.0, lon_max - 360.0))
+    return expr & lo.is_between(lon_min, lon_max)
+
+
+def with_distance(
+    df: pl.DataFrame,
+    lat: float,
+    lon: float,
+    lat_col: str = "latitude",
+    lon_col: str = "longitude",
+    alias: str = "distance",
+    dtype: pl.DataType = pl.Float32,
+) -> pl.DataFrame:
+    """Ajoute une colonne de distance (km) au point (lat, lon) ; nulle si les coordonnées manquent."""
+    return df.with_columns(haversine_expr(lat, lon, lat_col, lon_col).cast(dtype).alias(alias))
+
+
+def within_radius(
+    df: pl.DataFrame,
+    lat: float,
+    lon: float,
+    radius_km: float,
+    lat_col: str = "latitude",
+    lon_col: str = "longitude",
+    alias: str = "distance",
+    dtype: pl.DataType = pl.Float32,
+) -> pl.DataFrame:
+    """Filtre les lignes situées à moins de ``radius_km`` du point et ajoute la distance.
+
+    Les lignes sans coordonnées sont écartées. Un pré-filtre par boîte englobante
+    réduit le nombre de distances exactes à calculer.
+    """
+    if df.is_empty() or lat_col not in df.columns or lon_col not in df.columns:
+        return df.with_columns(pl.lit(None, dtype=dtype).alias(alias)).clear()
+    radius = float(radius_km)
+    return (
+        df.lazy()
+        .filter(
+            pl.col(lat_col).is_not_null()
+            & pl.col(lon_col).is_not_null()
+            & bounding_box_expr(lat, lon, radius, lat_col, lon_col)
+        )
+        .with_columns(haversine_expr(lat, lon, lat_col, lon_col).alias(alias))
+        .filter(pl.col(alias) <= radius)
+        .with_columns(pl.col(alias).cast(dtype))
+        .collect()
+    )
+
+
+# Nombre de couples (origine, destination) calculés par bloc dans ``pairwise_distances`` :
+# un bloc d'environ 2 Mo par colonne reste en cache processeur d'une opération à l'autre
+PAIRWISE_CHUNK_CELLS = 250_000
+
+
+def _unit_vectors(df: pl.DataFrame, prefix: str) -> pl.DataFrame:
+    """Points sur la sphère unité (x, y, z), numérotés dans l'ordre des lignes."""
+    la = pl.col("latitude").cast(pl.Float64, strict=False).radians()
+    lo = pl.col("longitude").cast(pl.Float64, strict=False).radians()
+    return df.select(
+        pl.int_range(pl.len(), dtype=pl.Int32).alias(f"{prefix}idx"),
+        (la.cos() * lo.cos()).alias(f"{prefix}x"),
+        (la.cos() * lo.sin()).alias(f"{prefix}y"),
+        la.sin().alias(f"{prefix}z"),
+    )
+
+
+def pairwise_distances(
+    origins: pl.DataFrame,
+    destinations: pl.DataFrame,
+    top_k: int | None = None,
+    chunk_cells: int = PAIRWISE_CHUNK_CELLS,
+    decimals: int = 3,
+) -> Iterator[pl.DataFrame]:
+    """Distances haversine (km) entre chaque origine et chaque destination, par blocs d'origines.
+
+    ``origins`` et ``destinations`` ont les colonnes ``id``, ``latitude``, ``longitude``
+    (coordonnées valides). Chaque bloc produit un DataFrame d'une ligne par origine :
+
+    - sans ``top_k`` : ``id`` et ``distances`` (liste alignée sur l'ordre des destinations) ;
+    - avec ``top_k`` : ``id``, ``neighbors`` (ids des destinations) et ``distances``,
+      limités aux ``top_k`` destinations les plus proches, triées par distance croissante.
+
+    Chaque point est converti une seule fois en vecteur unitaire ; sur le produit
+    cartésien, seule la corde entre deux points est calculée, puis convertie en
+    arc (même résultat que ``haversine_expr`` : a = corde² / 4). Le calcul se fait
+    par blocs de ``chunk_cells`` couples, pour borner la mémoire et rester en cache.
+    """
+    n_dst = destinations.height
+    if origins.is_empty() or n_dst == 0:
+        return
+    src = _unit_vectors(origins, "__o_")
+    dst = _unit_vectors(destinations, "__d_").lazy()
+    dst_ids = destinations.get_column("id")
+    rows_per_chunk = max(1, int(chunk_cells) // n_dst)
+
+    chord2 = sum((pl.col(f"__d_{c}") - pl.col(f"__o_{c}")) ** 2 for c in "xyz")
+    dist = ((chord2.sqrt() / 2).clip(0.0, 1.0).arcsin() * (2 * EARTH_RADIUS_KM)).round(decimals).alias("__dist")
+
+    origin_ids = origins.get_column("id")
+    for start in range(0, origins.height, rows_per_chunk):
+        block = src.slice(start, rows_per_chunk)
+        pairs = block.lazy().join(dst, how="cross", maintain_order="left_right").select("__o_idx", "__d_idx", dist)
+        if top_k is None:
+            # Reshape ligne par origine : la jointure (maintain_order="left_right") sort
+            # les couples dans l'ordre (origine, destination), sans tri.
+            flat = pairs.select("__dist").collect().get_column("__dist")
+            yield pl.DataFrame({
+                "id": origin_ids.slice(start, block.height),
+                "distances": flat.reshape((block.height, n_dst)).arr.to_list(),
+            })
+            continue
+        k = max(1, min(int(top_k), n_dst))
+        best = (
+            pairs.group_by("__o_idx")
+            .agg(
+                pl.col("__d_idx").bottom_k_by("__dist", k),
+                pl.col("__dist").bottom_k_by("__dist", k),
+            )
+            .explode("__d_idx", "__dist")
+            .sort("__o_idx", "__dist")
+            .collect()
+        )
+        yield (
+            best.with_columns(
+                origin_ids.gather(best.get_column("__o_idx")).alias("id"),
+                dst_ids.gather(best.get_column("__d_idx")).alias("neighbors"),
+            )
+            .group_by("__o_idx", maintain_order=True)
+            .agg(pl.col("id").first(), pl.col("neighbors"), pl.col("__dist").alias("distances"))
+            .drop("__o_idx")
+        )
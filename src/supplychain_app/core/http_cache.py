@@ -0,0 +1,99 @@
+"""Cache HTTP des réponses de l'API : ETag par version des données et compression gzip.
+
+- ``snapshot_etag`` (décorateur de route) : ETag faible calculé à partir de la
+  version du snapshot du ``DataStore`` (et, si besoin, de fichiers lus hors
+  snapshot) et de l'URL complète (chemin + query string). Si le navigateur
+  renvoie cet ETag (``If-None-Match``), la route répond ``304 Not Modified``
+  sans être exécutée : aucun calcul, aucun corps.
+- ``init_compression`` : compresse en gzip les réponses JSON / texte d'au moins
+  ``COMPRESS_MIN_SIZE`` octets quand le client l'accepte (``Accept-Encoding``).
+
+L'ETag ne dépend que de données immuables pour une version donnée : il n'est
+posé que sur les routes dont la réponse est entièrement déterminée par le
+snapshot (+ fichiers déclarés) et la requête.
+"""
+import functools
+import gzip
+import hashlib
+
+from flask import Response, make_response, request
+
+from supplychain_app.core.pagination import data_version
+from supplychain_app.data.data_store import current_snapshot
+
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_LEVEL = 6
+_COMPRESSIBLE = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def request_etag(*paths: str | None, extra: str = "") -> str:
+    """ETag de la requête courante : version des données + URL (chemin et paramètres)."""
+    version = data_version(current_snapshot().version, *paths)
+    raw = f"{version}|{extra}|{request.method}|{request.full_path}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def snapshot_etag(*paths, vary=None):
+    """Décorateur : ETag + 304 pour une route dérivée du snapshot.
+
+    ``paths`` : fichiers lus en dehors du snapshot (chemins ou fonctions sans
+    argument retournant un chemin), pris en compte par leur taille et leur date.
+    ``vary`` : fonction sans argument dont la valeur entre aussi dans l'ETag
+    (ex. le mois en cours pour une réponse calculée sur l'année en cours).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+            try:
+                extra = vary() if vary is not None else ""
+                tag = request_etag(*(p() if callable(p) else p for p in paths), extra=extra)
+            except Exception:
+                return view(*args, **kwargs)
+            if request.if_none_match.contains_weak(tag):
+                not_modified = Response(status=304)
+                not_modified.set_etag(tag, weak=True)
+                not_modified.headers["Cache-Control"] = "no-cache"
+                return not_modified
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(tag, weak=True)
+                response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _compressible(response: Response) -> bool:
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if "Content-Encoding" in response.headers:
+        return False
+    mimetype = response.mimetype or ""
+    return any(mimetype.startswith(t) for t in _COMPRESSIBLE)
+
+
+def init_compression(app, min_size: int = COMPRESS_MIN_SIZE, level: int = COMPRESS_LEVEL) -> None:
+    """Compresse en gzip les réponses de l'application (hors fichiers et flux)."""
+
+    @app.after_request
+    def _gzip_response(response: Response) -> Response:
+        try:
+            if not _compressible(response):
+                return response
+            response.vary.add("Accept-Encoding")
+            if not request.accept_encodings["gzip"]:
+                return response
+            body = response.get_data()
+            if len(body) < min_size:
+                return response
+            response.set_data(gzip.compress(body, compresslevel=level))
+            response.headers["Content-Encoding"] = "gzip"
+        except Exception:
+            pass
+        return response
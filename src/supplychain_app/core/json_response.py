@@ -0,0 +1,114 @@
+"""Réponses JSON construites directement depuis des DataFrames Polars.
+
+``jsonify(df.to_dicts())`` crée un dict Python par ligne avant de le
+resérialiser ; ici le JSON des lignes est écrit par Polars (``write_json``) et
+seule l'enveloppe (quelques champs) passe par le module ``json``.
+
+Deux formats :
+- lignes (défaut) : ``{..., "rows": [{"colonne": valeur, ...}, ...]}`` ;
+- colonnes (``?format=columnar``) : ``{..., "format": "columnar", "columns": [...],
+  "data": {"colonne": [valeurs de la colonne], ...}}`` : les noms de colonnes ne
+  sont pas répétés à chaque ligne.
+
+Les colonnes Date / Datetime sont écrites au format de date HTTP (RFC 822,
+``Wed, 31 Jan 2024 08:00:00 GMT``), comme le faisait ``jsonify`` : le frontend
+reçoit les mêmes valeurs qu'avant. Les Datetime avec fuseau sont ramenés en UTC.
+"""
+import json
+
+import polars as pl
+from flask import Response, current_app, request
+
+COLUMNAR = "columnar"
+# Format de date de ``jsonify`` (``werkzeug.http.http_date``)
+HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
+
+
+def wants_columnar() -> bool:
+    """True si l'appelant demande le format colonnes (``?format=columnar``)."""
+    try:
+        return (request.args.get("format") or "").strip().lower() == COLUMNAR
+    except RuntimeError:
+        return False
+
+
+def _http_dates(df: pl.DataFrame) -> pl.DataFrame:
+    """Colonnes Date / Datetime converties en texte au format de date HTTP (voir ``HTTP_DATE_FORMAT``)."""
+    exprs = []
+    for name, dtype in df.schema.items():
+        if dtype == pl.Date:
+            exprs.append(pl.col(name).cast(pl.Datetime("us")).dt.strftime(HTTP_DATE_FORMAT))
+        elif isinstance(dtype, pl.Datetime):
+            col = pl.col(name)
+            if dtype.time_zone is not None:
+                col = col.dt.convert_time_zone("UTC")
+            exprs.append(col.dt.strftime(HTTP_DATE_FORMAT))
+    return df.with_columns(exprs) if exprs else df
+
+
+def frame_rows_json(df: pl.DataFrame | None) -> str:
+    """``[{"colonne": valeur, ...}, ...]``"""
+    if df is None or df.width == 0:
+        return "[]"
+    return _http_dates(df).write_json()
+
+
+def frame_columns_json(df: pl.DataFrame | None) -> str:
+    """``{"colonne": [valeurs de la colonne], ...}`` dans l'ordre de ``df.columns``."""
+    if df is None or df.width == 0:
+        return "{}"
+    # Une seule ligne dont chaque cellule contient toute la colonne : [{...}] -> {...}
+    one = _http_dates(df).select(pl.all().implode()).write_json()
+    if not (one.startswith("[{") and one.endswith("}]")):
+        raise ValueError("Unexpected JSON layout for columnar payload")
+    return one[1:-1]
+
+
+def _generic_payload(df: pl.DataFrame | None, fields: dict, key: str, columnar: bool) -> str:
+    """Même enveloppe via les objets Python (types que Polars ne sait pas écrire en JSON)."""
+    payload = dict(fields)
+    if columnar:
+        payload.pop(key, None)
+        payload["format"] = COLUMNAR
+        payload["columns"] = list(df.columns) if df is not None else []
+        payload["data"] = {c: df.get_column(c).to_list() for c in df.columns} if df is not None else {}
+    else:
+        payload[key] = df.to_dicts() if df is not None else []
+    return current_app.json.dumps(payload)
+
+
+def frame_payload(
+    df: pl.DataFrame | None,
+    fields: dict | None = None,
+    key: str = "rows",
+    columnar: bool | None = None,
+) -> str:
+    """Corps JSON : les champs ``fields`` puis les lignes de ``df`` sous ``key``
+    (ou ``columns`` / ``data`` en format colonnes)."""
+    columnar = wants_columnar() if columnar is None else columnar
+    head = dict(fields or {})
+    if columnar:
+        head.pop(key, None)
+        head["format"] = COLUMNAR
+        head["columns"] = list(df.columns) if df is not None else []
+        body_key, body = "data", frame_columns_json(df)
+    else:
+        body_key, body = key, frame_rows_json(df)
+    head.pop(body_key, None)
+    envelope = json.dumps(head, ensure_ascii=False, default=str)
+    return envelope[:-1] + ("," if head else "") + json.dumps(body_key) + ":" + body + "}"
+
+
+def frame_response(
+    df: pl.DataFrame | None,
+    fields: dict | None = None,
+    key: str = "rows",
+    status: int = 200,
+) -> Response:
+    """Réponse Flask JSON pour ``df`` (voir ``frame_payload``)."""
+    columnar = wants_columnar()
+    try:
+        body = frame_payload(df, fields, key, columnar)
+    except Exception:
+        body = _generic_payload(df, dict(fields or {}), key, columnar)
+    return Response(body, status=status, mimetype="application/json")
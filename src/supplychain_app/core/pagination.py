@@ -0,0 +1,208 @@
+"""Pagination côté serveur des réponses volumineuses : contrat ``limit`` / ``cursor`` / ``sort``.
+
+- ``limit`` : taille de page (plafonnée à ``MAX_LIMIT``) ;
+- ``sort`` : colonnes de tri séparées par des virgules, ``-`` pour un tri
+  décroissant (ex. ``ville,-code_postal``) ; valeurs nulles en dernier ;
+- ``cursor`` : jeton opaque renvoyé dans ``page.next_cursor`` pour lire la page
+  suivante (même requête, même tri ; sans ``limit``, même taille de page).
+
+Le curseur contient la version des données (version du snapshot, éventuellement
+combinée à celle d'un fichier) : les données d'une version étant immuables, le
+décalage qu'il porte désigne toujours les mêmes lignes. Si les données ont été
+rechargées entre deux pages, le curseur est refusé (``cursor_expired``) et le
+client recommence à la première page.
+
+Sans ``limit`` ni ``cursor``, la réponse reste complète (compatibilité).
+"""
+import base64
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import polars as pl
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+# Paramètres propres à la pagination : exclus de l'empreinte de la requête
+_PAGE_ARGS = {"limit", "cursor", "sort", "format"}
+
+
+class PageError(ValueError):
+    """Paramètres de pagination invalides ; ``code`` / ``status`` pour la réponse HTTP."""
+
+    def __init__(self, code: str, status: int = 400):
+        super().__init__(code)
+        self.code = code
+        self.status = status
+
+
+@dataclass(frozen=True)
+class PageRequest:
+    """Page demandée : ``offset`` / ``limit`` dans les lignes triées selon ``sort``."""
+
+    limit: int
+    offset: int
+    sort: tuple[tuple[str, bool], ...]
+    version: str
+    query: str
+
+
+def data_version(base: str, *paths: str | None) -> str:
+    """Version des données : ``base`` (version du snapshot) + taille et date des
+    fichiers lus en dehors du snapshot (``paths``)."""
+    parts = [base or ""]
+    for path in paths:
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        parts.append(f"{st.st_size}:{st.st_mtime_ns}" if st else "-")
+    if len(parts) == 1:
+        return parts[0]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _parse_sort(raw: str | None) -> tuple[tuple[str, bool], ...]:
+    keys = []
+    for part in (raw or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        desc = part.startswith("-")
+        name = part.lstrip("+-").strip()
+        if name:
+            keys.append((name, desc))
+    return tuple(keys)
+
+
+def _format_sort(sort: tuple[tuple[str, bool], ...]) -> str:
+    return ",".join(("-" if desc else "") + name for name, desc in sort)
+
+
+def _query_key(args: Mapping, query: Mapping | None) -> str:
+    """Empreinte des paramètres de la requête (hors pagination) : un curseur ne vaut que pour sa requête."""
+    items = []
+    getlist = getattr(args, "getlist", None)
+    for k in sorted(set(args.keys()) - _PAGE_ARGS):
+        items.append([k, getlist(k) if getlist else args.get(k)])
+    raw = json.dumps([items, query or {}], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(page: PageRequest, offset: int) -> str:
+    raw = json.dumps({
+        "v": page.version, "o": offset, "l": page.limit, "s": _format_sort(page.sort), "q": page.query,
+    })
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if not isinstance(data, dict) or not isinstance(data.get("o"), int) or data["o"] < 0:
+            raise ValueError(cursor)
+        return data
+    except Exception:
+        raise PageError("invalid_cursor")
+
+
+def page_request(
+    args: Mapping,
+    version: str,
+    query: Mapping | None = None,
+    default_limit: int = DEFAULT_LIMIT,
+) -> PageRequest | None:
+    """Lit ``limit`` / ``cursor`` / ``sort`` ; None si aucune pagination n'est demandée.
+
+    ``query`` : paramètres de la requête hors query string (corps d'un POST).
+    """
+    raw_limit = args.get("limit")
+    cursor = (args.get("cursor") or "").strip()
+    if raw_limit in (None, "") and not cursor:
+        return None
+    data = _decode_cursor(cursor) if cursor else {}
+    if raw_limit in (None, ""):
+        # Page suivante sans ``limit`` : même taille de page que la précédente
+        raw_limit = data.get("l", default_limit)
+    try:
+        limit = int(raw_limit)
+    except (TypeError, ValueError):
+        raise PageError("invalid_limit")
+    limit = max(1, min(limit, MAX_LIMIT))
+    sort = _parse_sort(args.get("sort"))
+    key = _query_key(args, query)
+
+    offset = 0
+    if cursor:
+        if data.get("q") != key:
+            raise PageError("invalid_cursor")
+        if data.get("v") != version:
+            raise PageError("cursor_expired", status=409)
+        if args.get("sort") is None:
+            sort = _parse_sort(data.get("s"))
+        elif _format_sort(sort) != data.get("s"):
+            raise PageError("invalid_cursor")
+        offset = data["o"]
+    return PageRequest(limit=limit, offset=offset, sort=sort, version=version, query=key)
+
+
+def _sort_frame(df: pl.DataFrame, sort: tuple[tuple[str, bool], ...]) -> pl.DataFrame:
+    unknown = [name for name, _ in sort if name not in df.columns]
+    if unknown:
+        raise PageError("invalid_sort")
+    return df.sort(
+        [name for name, _ in sort],
+        descending=[desc for _, desc in sort],
+        nulls_last=True,
+        maintain_order=True,
+    )
+
+
+def _sort_rows(rows: list[dict], sort: tuple[tuple[str, bool], ...]) -> list[dict]:
+    columns = set().union(*(r.keys() for r in rows)) if rows else set()
+    if any(name not in columns for name, _ in sort) and rows:
+        raise PageError("invalid_sort")
+    out = list(rows)
+    # Tris stables successifs, de la dernière clé à la première ; nulls en dernier
+    for name, desc in reversed(sort):
+        present = [r for r in out if r.get(name) is not None]
+        missing = [r for r in out if r.get(name) is None]
+        try:
+            present.sort(key=lambda r: r[name], reverse=desc)
+        except TypeError:
+            present.sort(key=lambda r: str(r[name]), reverse=desc)
+        out = present + missing
+    return out
+
+
+def paginate(data, page: PageRequest | None):
+    """Page de ``data`` (DataFrame ou liste de dicts) ; retourne (page, métadonnées ou None).
+
+    Métadonnées : ``total``, ``offset``, ``limit``, ``sort``, ``version`` et
+    ``next_cursor`` (None sur la dernière page).
+    """
+    if page is None:
+        return data, None
+    if data is None:
+        total, chunk = 0, None
+    elif isinstance(data, pl.DataFrame):
+        ordered = _sort_frame(data, page.sort) if page.sort else data
+        total = ordered.height
+        chunk = ordered.slice(page.offset, page.limit)
+    else:
+        rows = list(data or [])
+        ordered = _sort_rows(rows, page.sort) if page.sort else rows
+        total = len(ordered)
+        chunk = ordered[page.offset:page.offset + page.limit]
+    end = page.offset + page.limit
+    return chunk, {
+        "total": total,
+        "offset": page.offset,
+        "limit": page.limit,
+        "sort": _format_sort(page.sort) or None,
+        "version": page.version,
+        "next_cursor": encode_cursor(page, end) if end < total else None,
+    }
@@ -0,0 +1,290 @@
+"""Cache des résultats des lectures coûteuses, indexé par version des données.
+
+Clé : espace de noms (endpoint) + paramètres normalisés de la requête + version
+des données (version du snapshot, éventuellement combinée à celle d'un fichier
+lu hors snapshot, voir ``core.pagination.data_version``).
+
+- borné en mémoire (``max_bytes``) : les entrées les moins récemment utilisées
+  sont évincées en premier (LRU) ;
+- durée de vie maximale ``ttl_s`` par entrée (garde-fou pour les parties de
+  réponse qui ne dépendent pas des données, ex. géocodage) ;
+- vidé à chaque publication d'un nouveau snapshot par ``reload_data`` : les
+  entrées de l'ancienne version ne seraient de toute façon plus jamais lues ;
+- statistiques hits / misses / évictions, globales et par espace de noms
+  (``/api/updates/cache``).
+
+Deux usages :
+- ``get_result_cache().get_or_compute(namespace, params, compute, version)`` pour
+  un résultat intermédiaire (ex. DataFrame de l'offre consommables) ;
+- ``@cached_response()`` sur une route : le corps de la réponse 200 est mis en cache.
+"""
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import polars as pl
+from flask import Response, make_response, request
+
+from supplychain_app.core.pagination import data_version
+from supplychain_app.data.data_store import current_snapshot, get_data_store, on_snapshot_published
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+DEFAULT_TTL_S = 3600
+# Surcoût forfaitaire par entrée (clé, métadonnées)
+_ENTRY_OVERHEAD = 256
+
+
+def _normalize(value):
+    """Forme canonique des paramètres : seules les clés des mappings sont ordonnées.
+
+    L'ordre des listes et les valeurs vides explicites (``""``, ``[]``, None)
+    sont conservés : ils peuvent changer le résultat d'une route.
+    """
+    if isinstance(value, Mapping):
+        return {str(k): _normalize(value[k]) for k in sorted(value, key=str)}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_normalize(v) for v in value), key=repr)
+    return value
+
+
+def request_params() -> dict:
+    """Paramètres normalisés de la requête courante : arguments de route, query string et corps JSON."""
+    args = {k: request.args.getlist(k) for k in request.args.keys()}
+    params = {"view": dict(request.view_args or {}), "args": args}
+    if request.method not in ("GET", "HEAD"):
+        params["body"] = request.get_json(silent=True)
+    return _normalize(params)
+
+
+def cache_key(namespace: str, params, version: str) -> str:
+    return f"{namespace}|{version}|{json.dumps(_normalize(params), sort_keys=True, default=str)}"
+
+
+def _size_of(value) -> int:
+    """Taille (octets) estimée d'un résultat en cache."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, CachedBody):
+        return len(value.body)
+    if isinstance(value, pl.DataFrame):
+        return int(value.estimated_size())
+    try:
+        return len(json.dumps(value, default=str))
+    except Exception:
+        return 1024
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """Corps d'une réponse HTTP 200 mis en cache."""
+
+    body: bytes
+    mimetype: str
+
+
+@dataclass
+class _Entry:
+    namespace: str
+    value: Any
+    size: int
+    expires_at: float
+
+
+class ResultCache:
+    """Cache LRU borné en octets, avec durée de vie par entrée ; thread-safe."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl_s: float = DEFAULT_TTL_S):
+        self.max_bytes = int(max_bytes)
+        self.ttl_s = float(ttl_s)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "rejected": 0}
+        self._by_namespace: dict[str, dict[str, int]] = {}
+        self._invalidations = 0
+        self._last_invalidation: dict | None = None
+
+    def configure(self, max_bytes: int | None = None, ttl_s: float | None = None) -> None:
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max(0, int(max_bytes))
+            if ttl_s is not None:
+                self.ttl_s = max(0.0, float(ttl_s))
+            self._evict()
+
+    def _count(self, namespace: str, name: str) -> None:
+        self._counters[name] += 1
+        ns = self._by_namespace.setdefault(namespace, {"hits": 0, "misses": 0})
+        if name in ns:
+            ns[name] += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._entries and self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self._counters["evictions"] += 1
+
+    def get(self, key: str, namespace: str = ""):
+        """Valeur en cache ou None (compte un hit ou un miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._drop(key)
+                self._counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._count(namespace, "misses")
+                return None
+            self._entries.move_to_end(key)
+            self._count(namespace, "hits")
+            return entry.value
+
+    def put(self, key: str, value, namespace: str = "", ttl_s: float | None = None) -> bool:
+        """Met ``value`` en cache ; False si elle dépasse à elle seule la taille du cache."""
+        size = _size_of(value) + _ENTRY_OVERHEAD
+        ttl = self.ttl_s if ttl_s is None else float(ttl_s)
+        with self._lock:
+            if size > self.max_bytes or ttl <= 0:
+                self._counters["rejected"] += 1
+                return False
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(namespace, value, size, time.monotonic() + ttl)
+            self._bytes += size
+            self._counters["stores"] += 1
+            self._evict()
+            return True
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        params,
+        compute: Callable[[], Any],
+        version: str | None = None,
+        ttl_s: float | None = None,
+    ):
+        """Résultat en cache pour (namespace, params, version), sinon ``compute()`` mis en cache.
+
+        ``version`` : version des données (par défaut celle du snapshot courant).
+        Un résultat calculé sur un snapshot déjà remplacé n'est pas conservé.
+        """
+        snap_version = current_snapshot().version
+        key = cache_key(namespace, params, version or snap_version)
+        value = self.get(key, namespace)
+        if value is not None:
+            return value
+        value = compute()
+        if value is not None and snap_version == get_data_store().snapshot.version:
+            self.put(key, value, namespace, ttl_s)
+        return value
+
+    def clear(self, reason: str = "manual") -> int:
+        """Vide le cache ; retourne le nombre d'entrées supprimées."""
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            self._invalidations += 1
+            self._last_invalidation = {"reason": reason, "at": time.time(), "entries": dropped}
+            return dropped
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            per_ns: dict[str, dict] = {}
+            for name, counts in self._by_namespace.items():
+                per_ns[name] = {**counts, "entries": 0, "bytes": 0}
+            for entry in self._entries.values():
+                ns = per_ns.setdefault(entry.namespace, {"hits": 0, "misses": 0, "entries": 0, "bytes": 0})
+                ns["entries"] += 1
+                ns["bytes"] += entry.size
+            return {
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl_s,
+                "invalidations": self._invalidations,
+                "last_invalidation": dict(self._last_invalidation) if self._last_invalidation else None,
+                "namespaces": per_ns,
+            }
+
+
+_cache: ResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Retourne le cache de résultats unique du process."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache()
+    return _cache
+
+
+def _on_publish(snapshot) -> None:
+    get_result_cache().clear(f"snapshot {snapshot.version}")
+
+
+on_snapshot_published(_on_publish)
+
+
+def cached_response(
+    *paths,
+    namespace: str | None = None,
+    ttl_s: float | None = None,
+    vary: Callable[[], str] | None = None,
+):
+    """Décorateur de route : met en cache le corps des réponses 200.
+
+    Clé : ``namespace`` (par défaut le nom de l'endpoint) + arguments de route,
+    query string et corps JSON normalisés + version du snapshot (et des fichiers
+    ``paths`` lus hors snapshot : chemins ou fonctions sans argument). ``vary`` :
+    fonction sans argument dont la valeur entre aussi dans la clé, pour une
+    réponse qui dépend d'autre chose que des données (ex. le mois en cours).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            ns = namespace or request.endpoint or view.__name__
+            try:
+                files = [p() if callable(p) else p for p in paths]
+                version = data_version(current_snapshot().version, *files)
+                if vary is not None:
+                    version = f"{version}|{vary()}"
+                params = request_params()
+            except Exception:
+                return view(*args, **kwargs)
+            computed: list[Response] = []
+
+            def _compute():
+                response = make_response(view(*args, **kwargs))
+                computed.append(response)
+                if response.status_code != 200 or response.is_streamed or response.direct_passthrough:
+                    return None
+                return CachedBody(response.get_data(), response.mimetype or "application/json")
+
+            cached = get_result_cache().get_or_compute(ns, params, _compute, version=version, ttl_s=ttl_s)
+            if computed:
+                computed[0].headers["X-Cache"] = "MISS"
+                return computed[0]
+            hit = Response(cached.body, status=200, mimetype=cached.mimetype)
+            hit.headers["X-Cache"] = "HIT"
+            return hit
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,236 @@
+"""Index spatial en grille pour les recherches de proximité (rayon et k plus proches).
+
+Les points sont rangés dans des cellules de ``cell_deg`` degrés. L'index ne
+fournit que des candidats (numéros de ligne des cellules proches du point
+demandé) ; les distances exactes et le filtre de rayon sont ensuite calculés de
+façon vectorisée (``core.geo.within_radius`` / ``haversine_expr``) sur ces
+seules lignes, au lieu de toute la table.
+"""
+from collections.abc import Callable, Mapping
+from math import floor
+
+import polars as pl
+
+from supplychain_app.core.geo import bounding_box, with_distance, within_radius
+
+# Mode "nearest" des recherches de proximité : nombre de résultats par défaut / maximum
+NEAREST_DEFAULT = 10
+NEAREST_MAX = 500
+
+
+class GridIndex:
+    """Grille lat/lon immuable sur les lignes d'un DataFrame.
+
+    Les candidats sont des ``offsets`` : numéros de ligne dans le DataFrame
+    source, triés par ordre croissant.
+    """
+
+    def __init__(self, cells: dict[tuple[int, int], list[int]], cell_deg: float = 0.25):
+        self.cell_deg = float(cell_deg)
+        self._cells = cells
+        self._size = sum(len(v) for v in cells.values())
+        if cells:
+            rows = [c[0] for c in cells]
+            cols = [c[1] for c in cells]
+            self._row_range = (min(rows), max(rows))
+            self._col_range = (min(cols), max(cols))
+        else:
+            self._row_range = self._col_range = (0, -1)
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pl.DataFrame,
+        lat_col: str = "latitude",
+        lon_col: str = "longitude",
+        cell_deg: float = 0.25,
+    ) -> "GridIndex":
+        """Construit l'index sur les lignes de ``df`` ayant des coordonnées valides."""
+        if df.is_empty() or lat_col not in df.columns or lon_col not in df.columns:
+            return cls({}, cell_deg)
+        cell = float(cell_deg)
+        grouped = (
+            df.select(
+                pl.int_range(pl.len(), dtype=pl.Int64).alias("__offset"),
+                pl.col(lat_col).cast(pl.Float64, strict=False).alias("__lat"),
+                pl.col(lon_col).cast(pl.Float64, strict=False).alias("__lon"),
+            )
+            .filter(
+                pl.col("__lat").is_between(-90.0, 90.0)
+                & pl.col("__lon").is_between(-180.0, 180.0)
+            )
+            .group_by(
+                (pl.col("__lat") / cell).floor().cast(pl.Int64).alias("__row"),
+                (pl.col("__lon") / cell).floor().cast(pl.Int64).alias("__col"),
+            )
+            .agg(pl.col("__offset").sort())
+        )
+        return cls({(r, c): offsets for r, c, offsets in grouped.iter_rows()}, cell)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (int(floor(lat / self.cell_deg)), int(floor(lon / self.cell_deg)))
+
+    def _offsets_in(self, r0: int, r1: int, c0: int, c1: int) -> list[int]:
+        """Offsets des cellules du rectangle [r0, r1] × [c0, c1], triés."""
+        r0, r1 = max(r0, self._row_range[0]), min(r1, self._row_range[1])
+        c0, c1 = max(c0, self._col_range[0]), min(c1, self._col_range[1])
+        if r0 > r1 or c0 > c1:
+            return []
+        out: list[int] = []
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self._cells):
+            # Rectangle plus grand que la grille occupée : on parcourt les cellules existantes
+            for (r, c), offsets in self._cells.items():
+                if r0 <= r <= r1 and c0 <= c <= c1:
+                    out.extend(offsets)
+        else:
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    out.extend(self._cells.get((r, c), ()))
+        out.sort()
+        return out
+
+    def box_candidates(self, lat: float, lon: float, radius_km: float) -> list[int]:
+        """Offsets des points des cellules couvrant le cercle de rayon ``radius_km``."""
+        if not self._cells:
+            return []
+        lat_min, lat_max, lon_min, lon_max = bounding_box(float(lat), float(lon), float(radius_km))
+        r0, c0 = self._cell(lat_min, max(lon_min, -180.0))
+        r1, c1 = self._cell(lat_max, min(lon_max, 180.0))
+        return self._offsets_in(r0, r1, c0, c1)
+
+    def ring_candidates(self, lat: float, lon: float, ring: int) -> list[int]:
+        """Offsets des points des cellules à au plus ``ring`` cellules de celle du point."""
+        if not self._cells:
+            return []
+        r, c = self._cell(float(lat), float(lon))
+        return self._offsets_in(r - ring, r + ring, c - ring, c + ring)
+
+    def max_ring(self, lat: float, lon: float) -> int:
+        """Anneau à partir duquel toutes les cellules occupées sont couvertes."""
+        if not self._cells:
+            return 0
+        r, c = self._cell(float(lat), float(lon))
+        return max(
+            abs(r - self._row_range[0]), abs(r - self._row_range[1]),
+            abs(c - self._col_range[0]), abs(c - self._col_range[1]),
+        )
+
+
+def _empty(df: pl.DataFrame, alias: str, dtype: pl.DataType) -> pl.DataFrame:
+    return df.clear().with_columns(pl.lit(None, dtype=dtype).alias(alias))
+
+
+def _rows(df: pl.DataFrame, offsets: list[int]) -> pl.DataFrame:
+    return df.select(pl.all().gather(offsets))
+
+
+def radius_search(
+    df: pl.DataFrame,
+    index: GridIndex | None,
+    lat: float,
+    lon: float,
+    radius_km: float,
+    lat_col: str = "latitude",
+    lon_col: str = "longitude",
+    alias: str = "distance",
+) -> pl.DataFrame:
+    """Lignes à moins de ``radius_km``, triées par distance.
+
+    Avec un index, seules les lignes des cellules proches sont évaluées.
+    """
+    if index is not None:
+        df = _rows(df, index.box_candidates(lat, lon, radius_km))
+    return within_radius(df, lat, lon, radius_km, lat_col, lon_col, alias).sort(alias, maintain_order=True)
+
+
+def nearest_search(
+    df: pl.DataFrame,
+    index: GridIndex | None,
+    lat: float,
+    lon: float,
+    k: int,
+    mask: pl.Expr | None = None,
+    lat_col: str = "latitude",
+    lon_col: str = "longitude",
+    alias: str = "distance",
+    dtype: pl.DataType = pl.Float32,
+) -> pl.DataFrame:
+    """Les ``k`` lignes les plus proches (optionnellement restreintes à ``mask``), triées par distance.
+
+    Avec un index : les anneaux de cellules sont élargis jusqu'à contenir ``k``
+    candidats ; la distance du k-ième donne un rayon qui contient forcément les
+    ``k`` plus proches, relus ensuite dans la boîte de ce rayon.
+    """
+    k = int(k)
+    if df.is_empty() or k <= 0:
+        return _empty(df, alias, dtype)
+    if index is None:
+        out = with_distance(df, lat, lon, lat_col, lon_col, alias, dtype).filter(pl.col(alias).is_not_null())
+        if mask is not None:
+            out = out.filter(mask)
+        return out.sort(alias, maintain_order=True).head(k)
+
+    keep = df.select(mask.fill_null(False)).to_series() if mask is not None else None
+
+    def _count(offsets: list[int]) -> int:
+        if keep is None or not offsets:
+            return len(offsets)
+        return int(keep.gather(offsets).sum())
+
+    def _nearest(offsets: list[int], radius_km: float) -> pl.DataFrame:
+        rows = _rows(df, offsets)
+        if mask is not None:
+            rows = rows.filter(mask)
+        return (
+            within_radius(rows, lat, lon, radius_km, lat_col, lon_col, alias, pl.Float64)
+            .sort(alias, maintain_order=True)
+            .head(k)
+        )
+
+    last = index.max_ring(lat, lon)
+    ring = 0
+    offsets = index.ring_candidates(lat, lon, ring)
+    while _count(offsets) < k and ring < last:
+        ring = min(last, 2 * ring + 1)
+        offsets = index.ring_candidates(lat, lon, ring)
+    if not offsets:
+        return _empty(df, alias, dtype)
+
+    # 1) k premiers candidats (rayon illimité : demi-circonférence terrestre)
+    first = _nearest(offsets, 20_040.0)
+    if first.height >= k:
+        # 2) les k plus proches sont à moins de la distance du k-ième candidat
+        reach = float(first.get_column(alias).max()) * (1 + 1e-9) + 1e-9
+        first = _nearest(index.box_candidates(lat, lon, reach), reach)
+    return first.with_columns(pl.col(alias).cast(dtype))
+
+
+def nearest_count(body: Mapping, default: int = NEAREST_DEFAULT, max_n: int = NEAREST_MAX) -> int | None:
+    """Nombre de résultats demandés en mode ``"nearest"`` (``body["n"]``) ; None en mode rayon."""
+    if str(body.get("mode") or "").strip().lower() != "nearest":
+        return None
+    try:
+        n = int(body.get("n", default))
+    except (TypeError, ValueError):
+        n = default
+    return max(1, min(n, max_n))
+
+
+def proximity_search(
+    body: Mapping,
+    lat: float,
+    lon: float,
+    radius_km: float,
+    nearest: Callable[..., pl.DataFrame],
+    within: Callable[..., pl.DataFrame],
+    *filters,
+) -> pl.DataFrame:
+    """Recherche selon ``body["mode"]`` : ``nearest(lat, lon, n, *filters)`` en mode
+    ``"nearest"``, sinon ``within(lat, lon, radius_km, *filters)``."""
+    n = nearest_count(body)
+    if n is not None:
+        return nearest(lat, lon, n, *filters)
+    return within(lat, lon, radius_km, *filters)
@@ -0,0 +1,177 @@
+"""Service des fichiers du frontend (``web/``) : empreintes de contenu, cache navigateur et gzip.
+
+- Dans les pages HTML, les références locales ``js/...`` et ``css/...``
+  (attributs ``src`` / ``href``) sont réécrites avec l'empreinte du contenu du
+  fichier : ``js/api.js?h=<sha1>``. Une URL avec la bonne empreinte désigne un
+  contenu immuable : elle est servie avec ``Cache-Control: public,
+  max-age=31536000, immutable`` et n'est plus redemandée tant que le fichier ne
+  change pas (nouveau contenu = nouvelle empreinte = nouvelle URL).
+- Les fichiers de ``js/vendor/`` portent leur version dans leur nom
+  (``d3.v7.min.js``) : même durée de cache.
+- Tout le reste (pages HTML, URL sans empreinte) est servi en ``no-cache`` avec
+  un ETag : le navigateur revalide et reçoit ``304 Not Modified`` sans corps si
+  le fichier n'a pas changé.
+- Les fichiers texte (HTML, JS, CSS, JSON, SVG) sont envoyés compressés en gzip
+  quand le navigateur l'accepte ; la version compressée est calculée une fois
+  par version du fichier.
+
+Les empreintes et les versions compressées sont gardées en mémoire et
+recalculées quand la taille ou la date du fichier change (édition en
+développement).
+"""
+import gzip
+import hashlib
+import http.server
+import mimetypes
+import os
+import re
+import threading
+from dataclasses import dataclass
+from email.utils import formatdate
+from urllib.parse import parse_qs, urlsplit
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+HASH_PARAM = "h"
+VENDOR_PREFIXES = ("js/vendor/",)
+GZIP_MIN_SIZE = 1024
+_TEXT_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+# src="js/x.js?v=2" / href="css/style.css" (références locales, relatives)
+_ASSET_REF = re.compile(r'''(?P<attr>\b(?:src|href)=)(?P<q>["'])(?P<path>(?:js|css)/[^"'?#]+)(?:\?[^"'#]*)?(?P=q)''')
+
+
+@dataclass(frozen=True)
+class _Asset:
+    stamp: tuple[int, int]
+    body: bytes
+    digest: str
+    gz: bytes | None
+
+
+_assets: dict[str, _Asset] = {}
+_assets_lock = threading.Lock()
+
+
+def _stamp(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _load(path: str) -> _Asset | None:
+    """Contenu, empreinte et version gzip d'un fichier (mémorisés par taille + date)."""
+    stamp = _stamp(path)
+    if stamp is None:
+        return None
+    with _assets_lock:
+        cached = _assets.get(path)
+    if cached is not None and cached.stamp == stamp:
+        return cached
+    with open(path, "rb") as f:
+        body = f.read()
+    gz = None
+    ctype = mimetypes.guess_type(path)[0] or ""
+    if len(body) >= GZIP_MIN_SIZE and ctype.startswith(_TEXT_TYPES):
+        gz = gzip.compress(body, compresslevel=9)
+    asset = _Asset(stamp=stamp, body=body, digest=hashlib.sha1(body).hexdigest()[:12], gz=gz)
+    with _assets_lock:
+        _assets[path] = asset
+    return asset
+
+
+def asset_digest(web_dir: str, rel_path: str) -> str | None:
+    """Empreinte du contenu de ``web_dir/rel_path`` (None si absent)."""
+    path = os.path.join(web_dir, *rel_path.split("/"))
+    if not os.path.isfile(path):
+        return None
+    asset = _load(path)
+    return asset.digest if asset else None
+
+
+def fingerprint_html(html: str, web_dir: str) -> str:
+    """Réécrit les références ``js/...`` / ``css/...`` d'une page avec l'empreinte des fichiers."""
+
+    def _replace(m: re.Match) -> str:
+        digest = asset_digest(web_dir, m.group("path"))
+        if digest is None:
+            return m.group(0)
+        q = m.group("q")
+        return f"{m.group('attr')}{q}{m.group('path')}?{HASH_PARAM}={digest}{q}"
+
+    return _ASSET_REF.sub(_replace, html)
+
+
+class StaticAssetHandler(http.server.SimpleHTTPRequestHandler):
+    """``SimpleHTTPRequestHandler`` avec empreintes, ETag / 304, cache long et gzip."""
+
+    def do_GET(self):
+        self._serve(head_only=False)
+
+    def do_HEAD(self):
+        self._serve(head_only=True)
+
+    def _resolve(self) -> str | None:
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            return index if os.path.isfile(index) else None
+        return path if os.path.isfile(path) else None
+
+    def _serve(self, head_only: bool) -> None:
+        parts = urlsplit(self.path)
+        if os.path.isdir(self.translate_path(self.path)) and not parts.path.endswith("/"):
+            # Redirection / listing : comportement standard
+            return super().do_HEAD() if head_only else super().do_GET()
+        path = self._resolve()
+        if path is None:
+            return super().do_HEAD() if head_only else super().do_GET()
+
+        ctype = self.guess_type(path)
+        try:
+            asset = _load(path)
+        except OSError:
+            asset = None
+        if asset is None:
+            self.send_error(404, "File not found")
+            return
+
+        body, gz, digest = asset.body, asset.gz, asset.digest
+        if ctype.startswith("text/html"):
+            # Empreinte de la page = empreinte de son contenu réécrit (donc des fichiers référencés)
+            web_dir = os.path.abspath(self.directory)
+            body = fingerprint_html(body.decode("utf-8", errors="surrogateescape"), web_dir).encode(
+                "utf-8", errors="surrogateescape"
+            )
+            digest = hashlib.sha1(body).hexdigest()[:12]
+            gz = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+
+        rel = os.path.relpath(path, os.path.abspath(self.directory)).replace(os.sep, "/")
+        requested = parse_qs(parts.query).get(HASH_PARAM, [None])[0]
+        immutable = requested == digest or rel.startswith(VENDOR_PREFIXES)
+        # ETag faible : même contenu servi compressé ou non
+        etag = f'W/"{digest}"'
+        if_none_match = [t.strip().removeprefix("W/") for t in (self.headers.get("If-None-Match") or "").split(",")]
+        if f'"{digest}"' in if_none_match or "*" in if_none_match:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE)
+            self.end_headers()
+            return
+
+        use_gzip = gz is not None and "gzip" in (self.headers.get("Accept-Encoding") or "").lower()
+        payload = gz if use_gzip else body
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(asset.stamp[1] / 1e9, usegmt=True))
+        self.send_header("Cache-Control", IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE)
+        if gz is not None:
+            self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(payload)
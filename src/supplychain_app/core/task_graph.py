@@ -0,0 +1,115 @@
+"""Exécution parallèle d'un petit graphe de tâches (DAG) avec entrées / sorties déclarées.
+
+Une tâche dépend des tâches qui produisent ses entrées (chemins de fichiers) :
+elle démarre dès que toutes ses dépendances sont terminées, sur un pool de
+threads borné. Les tâches indépendantes s'exécutent en parallèle ; la durée
+totale est celle de la chaîne la plus lente.
+
+Une tâche en erreur n'interrompt pas les autres ; les tâches qui en dépendent
+ne sont pas lancées (statut ``blocked``).
+"""
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class Task:
+    """Tâche du graphe : ``action()`` lit ``inputs`` et écrit ``outputs``."""
+
+    key: str
+    action: Callable[[], object]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class TaskResult:
+    """Compte rendu d'une tâche : ``status`` = ``ok`` / ``error`` / ``blocked``."""
+
+    key: str
+    status: str
+    seconds: float = 0.0
+    result: object = None
+    error: str | None = None
+    blocked_by: tuple[str, ...] = field(default_factory=tuple)
+
+
+def task_dependencies(tasks: list[Task]) -> dict[str, set[str]]:
+    """Dépendances de chaque tâche (tâches produisant ses entrées) ; ValueError si cycle."""
+    keys = [t.key for t in tasks]
+    if len(set(keys)) != len(keys):
+        raise ValueError("Clés de tâches en double")
+    producers: dict[str, str] = {}
+    for t in tasks:
+        for out in t.outputs:
+            if out in producers:
+                raise ValueError(f"Sortie {out} produite par {producers[out]} et {t.key}")
+            producers[out] = t.key
+    deps = {
+        t.key: {producers[i] for i in t.inputs if i in producers and producers[i] != t.key}
+        for t in tasks
+    }
+
+    # Tri topologique : tout ce qui reste est sur un cycle
+    pending = {k: len(d) for k, d in deps.items()}
+    ready = [k for k, n in pending.items() if n == 0]
+    dependents: dict[str, list[str]] = {k: [] for k in deps}
+    for k, d in deps.items():
+        for dep in d:
+            dependents[dep].append(k)
+    while ready:
+        k = ready.pop()
+        for nxt in dependents[k]:
+            pending[nxt] -= 1
+            if pending[nxt] == 0:
+                ready.append(nxt)
+    cyclic = sorted(k for k, n in pending.items() if n > 0)
+    if cyclic:
+        raise ValueError(f"Cycle dans le graphe de tâches : {cyclic}")
+    return deps
+
+
+def run_task_graph(tasks: list[Task], max_workers: int = 4) -> dict[str, TaskResult]:
+    """Exécute les tâches dans l'ordre des dépendances ; retourne les comptes rendus par clé."""
+    deps = task_dependencies(tasks)
+    by_key = {t.key: t for t in tasks}
+    results: dict[str, TaskResult] = {}
+    waiting = {k: set(d) for k, d in deps.items()}
+
+    def _run(task: Task) -> TaskResult:
+        start = time.perf_counter()
+        try:
+            value = task.action()
+            return TaskResult(task.key, "ok", time.perf_counter() - start, result=value)
+        except Exception as e:
+            return TaskResult(task.key, "error", time.perf_counter() - start, error=f"{e.__class__.__name__}: {e}")
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="etl") as pool:
+        running = {}
+
+        def _submit_ready() -> None:
+            for k in [k for k, d in waiting.items() if not d]:
+                del waiting[k]
+                running[pool.submit(_run, by_key[k])] = k
+
+        _submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key = running.pop(fut)
+                result = fut.result()
+                results[key] = result
+                failed = [key] if result.status != "ok" else []
+                # Les tâches en aval d'une tâche en échec sont bloquées (en cascade)
+                while failed:
+                    bad = failed.pop()
+                    for k in [k for k, d in waiting.items() if bad in d]:
+                        del waiting[k]
+                        results[k] = TaskResult(k, "blocked", blocked_by=(bad,))
+                        failed.append(k)
+                for d in waiting.values():
+                    d.discard(key)
+            _submit_ready()
+    return results
@@ -0,0 +1,215 @@
+"""Index inversé plein texte pour la recherche catalogue (articles + fabricants).
+
+Le texte de chaque ligne (toutes les colonnes, en minuscules) est découpé en
+tokens alphanumériques. L'index conserve, sous forme de colonnes Polars :
+
+- le texte de chaque ligne ;
+- chaque token du vocabulaire avec la liste triée des lignes qui le contiennent ;
+- chaque trigramme (3 caractères) avec les tokens qui le contiennent, pour
+  retrouver rapidement les tokens dont un terme de recherche n'est qu'une partie.
+
+Une recherche combine les lignes de chaque terme (tous les termes doivent
+apparaître) puis classe les résultats : correspondance exacte du code, puis
+tokens exacts, préfixes, sous-chaînes. Tous les calculs sont vectorisés : les
+listes de lignes ne sont jamais parcourues en Python. Un terme de moins de trois
+caractères correspond à une grande partie du vocabulaire : il est recherché
+directement dans le texte des lignes (comme un ``str.contains``).
+"""
+import re
+
+import polars as pl
+
+# Un token = suite de lettres / chiffres (le "_" sert de séparateur)
+TOKEN_PATTERN = r"[^\W_]+"
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+# Qualité d'une correspondance terme / token
+_EXACT, _PREFIX, _INFIX = 3, 2, 1
+# Bonus quand la requête correspond au code de la ligne
+_KEY_EXACT_BONUS, _KEY_PREFIX_BONUS = 100, 50
+# Longueur minimale d'un terme résolu par les trigrammes (sinon : parcours du texte)
+_MIN_INDEXED_TERM = 3
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Tokens (minuscules, dédoublonnés, dans l'ordre) d'un texte de recherche."""
+    seen: dict[str, None] = {}
+    for tok in _TOKEN_RE.findall((text or "").lower()):
+        seen.setdefault(tok, None)
+    return list(seen)
+
+
+def _token_quality(tok: pl.Series, term: str) -> pl.Series:
+    """Qualité de la correspondance de ``term`` dans chaque token (0 si absent)."""
+    return (
+        pl.select(
+            pl.when(tok == term).then(pl.lit(_EXACT, dtype=pl.UInt32))
+            .when(tok.str.starts_with(term)).then(pl.lit(_PREFIX, dtype=pl.UInt32))
+            .when(tok.str.contains(term, literal=True)).then(pl.lit(_INFIX, dtype=pl.UInt32))
+            .otherwise(pl.lit(0, dtype=pl.UInt32))
+        )
+        .to_series()
+    )
+
+
+class TextIndex:
+    """Index inversé immuable sur les lignes d'un DataFrame.
+
+    Les résultats sont des numéros de ligne (offsets) du DataFrame source.
+    """
+
+    def __init__(self, vocab: pl.DataFrame, trigrams: pl.DataFrame, texts: pl.Series, keys: pl.Series | None = None):
+        self.n_rows = len(texts)
+        # Vocabulaire trié : l'id d'un token est sa position (tokens d'un même préfixe contigus)
+        self._toks = vocab.get_column("tok")
+        self._rows = vocab.get_column("row")
+        self._tri_ids = {t: i for i, t in enumerate(trigrams.get_column("tri").to_list())}
+        self._tri_tokens = trigrams.get_column("tid")
+        self._tri_sizes = self._tri_tokens.list.len()
+        self._texts = texts
+        self._keys = keys
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pl.DataFrame,
+        key_col: str | None = None,
+        extra_text: pl.DataFrame | None = None,
+    ) -> "TextIndex":
+        """Construit l'index sur toutes les colonnes de ``df``.
+
+        ``extra_text`` (colonnes ``key_col`` et ``text``) ajoute un texte
+        complémentaire par clé, par exemple les fabricants d'un article.
+        """
+        empty_vocab = pl.DataFrame(schema={"tok": pl.Utf8, "row": pl.List(pl.UInt32)})
+        empty_tri = pl.DataFrame(schema={"tri": pl.Utf8, "tid": pl.List(pl.UInt32)})
+        if df.is_empty():
+            return cls(empty_vocab, empty_tri, pl.Series("text", [], dtype=pl.Utf8))
+
+        parts = [pl.col(c).cast(pl.Utf8).fill_null("").str.to_lowercase() for c in df.columns]
+        base = df.lazy().with_row_index("__row")
+        if extra_text is not None and key_col and key_col in df.columns and not extra_text.is_empty():
+            base = base.join(
+                extra_text.lazy().select(pl.col(key_col), pl.col("text").alias("__extra")),
+                on=key_col,
+                how="left",
+            )
+            parts.append(pl.col("__extra").fill_null("").str.to_lowercase())
+
+        lines = (
+            base.select(pl.col("__row").cast(pl.UInt32).alias("row"), pl.concat_str(parts, separator=" ").alias("text"))
+            .sort("row")
+            .collect()
+        )
+        tokens = (
+            lines.lazy()
+            .select(pl.col("row"), pl.col("text").str.extract_all(TOKEN_PATTERN).alias("tok"))
+            .explode("tok")
+            .drop_nulls("tok")
+            .unique()
+        )
+        vocab = (
+            tokens.group_by("tok")
+            .agg(pl.col("row").sort())
+            .sort("tok")
+            .collect()
+        )
+        trigrams = (
+            vocab.lazy()
+            .select(pl.int_range(pl.len(), dtype=pl.UInt32).alias("tid"), pl.col("tok"))
+            .filter(pl.col("tok").str.len_chars() >= 3)
+            .with_columns(pl.int_ranges(0, pl.col("tok").str.len_chars().cast(pl.Int64) - 2).alias("pos"))
+            .explode("pos")
+            .select(pl.col("tok").str.slice(pl.col("pos"), 3).alias("tri"), pl.col("tid"))
+            .unique()
+            .group_by("tri")
+            .agg(pl.col("tid").sort())
+            .collect()
+        )
+        keys = None
+        if key_col and key_col in df.columns:
+            keys = df.get_column(key_col).cast(pl.Utf8).fill_null("").str.to_lowercase()
+        return cls(vocab, trigrams, lines.get_column("text"), keys)
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def _candidate_tokens(self, term: str) -> pl.Series:
+        """Tokens contenant tous les trigrammes de ``term`` (ids triés)."""
+        ids = []
+        for g in {term[i:i + 3] for i in range(len(term) - 2)}:
+            i = self._tri_ids.get(g)
+            if i is None:
+                return pl.Series("tid", [], dtype=pl.UInt32)
+            ids.append(i)
+        # Listes les plus courtes d'abord : l'intersection reste petite
+        ids.sort(key=lambda i: self._tri_sizes[i])
+        candidates = self._tri_tokens[ids[0]]
+        for i in ids[1:]:
+            candidates = candidates.filter(candidates.is_in(self._tri_tokens[i].implode()))
+            if candidates.is_empty():
+                break
+        return candidates
+
+    def _scatter_tokens(self, best: pl.Series, tids: pl.Series, quality: pl.Series) -> None:
+        """Reporte sur ``best`` (par ligne) la qualité de chaque token, la meilleure l'emportant."""
+        for level in (_INFIX, _PREFIX, _EXACT):
+            sel = tids.filter(quality == level)
+            if not sel.is_empty():
+                best.scatter(self._rows.gather(sel).explode(), level)
+
+    def _term_quality(self, term: str) -> pl.Series:
+        """Meilleure qualité de correspondance de ``term`` pour chaque ligne (0 si absent)."""
+        best = pl.zeros(self.n_rows, dtype=pl.UInt32, eager=True)
+        if len(term) >= _MIN_INDEXED_TERM:
+            tids = self._candidate_tokens(term)
+            if not tids.is_empty():
+                self._scatter_tokens(best, tids, _token_quality(self._toks.gather(tids), term))
+            return best
+        # Terme court : sous-chaîne cherchée dans le texte des lignes ; les tokens
+        # qui commencent par le terme (plage contiguë du vocabulaire) donnent
+        # les correspondances exactes / préfixes.
+        best = self._texts.str.contains(term, literal=True).cast(pl.UInt32) * _INFIX
+        lo = self._toks.search_sorted(term, side="left")
+        hi = self._toks.search_sorted(term + "\U0010ffff", side="left")
+        if hi > lo:
+            tids = pl.int_range(lo, hi, dtype=pl.UInt32, eager=True)
+            self._scatter_tokens(best, tids, _token_quality(self._toks.slice(lo, hi - lo), term))
+        return best
+
+    def search(self, query: str | None, limit: int | None = None) -> list[int]:
+        """Lignes contenant tous les termes de ``query`` (en sous-chaîne), classées par pertinence."""
+        terms = tokenize(query)
+        if not terms or not self.n_rows:
+            return []
+        score = pl.zeros(self.n_rows, dtype=pl.UInt32, eager=True)
+        found = pl.repeat(True, self.n_rows, eager=True)
+        for term in terms:
+            best = self._term_quality(term)
+            found = found & (best > 0)
+            if not found.any():
+                return []
+            score = score + best
+
+        q = (query or "").strip().lower()
+        ranked = pl.DataFrame({"score": score, "found": found}).with_row_index("row").lazy()
+        if self._keys is not None and q:
+            ranked = ranked.with_columns(pl.Series("key", self._keys)).with_columns(
+                pl.col("score")
+                + pl.when(pl.col("key") == q).then(pl.lit(_KEY_EXACT_BONUS, dtype=pl.UInt32))
+                .when(pl.col("key").str.starts_with(q)).then(pl.lit(_KEY_PREFIX_BONUS, dtype=pl.UInt32))
+                .otherwise(pl.lit(0, dtype=pl.UInt32))
+            )
+        ranked = ranked.filter(pl.col("found"))
+        ranked = ranked.sort(["score", "row"], descending=[True, False])
+        if limit is not None:
+            # sort + head : sélection des k meilleurs (top-k), sans tri complet
+            ranked = ranked.head(max(0, int(limit)))
+        return ranked.select("row").collect().get_column("row").to_list()
+
+
+def take_rows(df: pl.DataFrame, offsets: list[int]) -> pl.DataFrame:
+    """Lignes de ``df`` aux offsets donnés, dans cet ordre."""
+    if not offsets:
+        return df.clear()
+    return df.select(pl.all().gather(offsets))
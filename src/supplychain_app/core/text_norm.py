@@ -0,0 +1,36 @@
+"""Normalisation de texte pour les comparaisons robustes (codes, libellés, références).
+
+Une valeur normalisée est : sans accents, espaces (y compris NBSP) réduits à un
+seul, sans espaces en début / fin, en majuscules. ``norm_text`` (valeur Python)
+et ``norm_text_expr`` (colonne Polars) produisent exactement le même résultat,
+ce qui permet de comparer une saisie utilisateur aux colonnes normalisées
+matérialisées par le ``DataStore``.
+"""
+import unicodedata
+
+import polars as pl
+
+
+def norm_text(value) -> str:
+    """Forme normalisée d'une valeur (chaîne vide si la valeur est vide ou None)."""
+    if value is None:
+        return ""
+    s = str(value).strip()
+    if not s:
+        return ""
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return " ".join(s.split()).upper()
+
+
+def norm_text_expr(col) -> pl.Expr:
+    """Expression Polars alignée sur ``norm_text`` (``col`` : nom de colonne ou expression)."""
+    expr = col if isinstance(col, pl.Expr) else pl.col(col)
+    return (
+        expr.cast(pl.Utf8, strict=False)
+        .str.normalize("NFKD")
+        .str.replace_all(r"\p{Mn}", "")
+        .str.replace_all(r"\s+", " ")
+        .str.strip_chars()
+        .str.to_uppercase()
+    )
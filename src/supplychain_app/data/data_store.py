@@ -0,0 +1,656 @@
+"""Magasin de données en mémoire partagé par tout le process API.
+
+Les parquets de travail (``path_datan/folder_name_app``) sont lus une seule fois
+et servis à la fois à ``supplychain_app.data.pudo_service`` et à
+``supplychain_app.services.pudo_service`` : chaque table n'est donc présente
+qu'une fois en mémoire et n'est relue qu'une fois par mise à jour.
+
+Chaque recharge construit un ``DataSnapshot`` complet et immuable à côté de
+l'existant, puis le publie par un simple échange de référence : une requête
+ne voit jamais un mélange de tables anciennes et nouvelles.
+
+La recharge est incrémentale : seules les tables dont le parquet a changé sont
+relues, et seuls les index dérivés qui en dépendent sont reconstruits.
+"""
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+import polars as pl
+
+from supplychain_app.constants import path_datan, folder_name_app
+from supplychain_app.core.article_graph import ArticleGraph
+from supplychain_app.core.spatial import GridIndex
+from supplychain_app.core.text_index import TextIndex, take_rows
+from supplychain_app.core.text_norm import norm_text, norm_text_expr
+from supplychain_app.items import Nomenclatures
+from supplychain_app.my_loguru import logger
+
+# Nom logique de la table -> nom du parquet (sans extension)
+TABLES: dict[str, str] = {
+    "pudos": "pudo_directory",
+    "stores": "stores",
+    "helios": "helios",
+    "items": "items",
+    "items_parent_buildings": "items_parent_buildings",
+    "items_son_buildings": "items_son_buildings",
+    "nomenclatures": "nomenclatures",
+    "manufacturers": "manufacturers",
+    "equivalents": "equivalents",
+    "stats_exit": "stats_exit",
+    "stock_554": "stock_554",
+}
+
+
+def _prepare_stats_exit(df: pl.DataFrame) -> pl.DataFrame:
+    try:
+        return df.with_columns(pl.col("date_mvt").dt.year().alias("annee"))
+    except Exception:
+        return df
+
+
+# Transformations appliquées une fois au chargement d'une table
+_PREPARE = {
+    "stats_exit": _prepare_stats_exit,
+}
+
+# Colonnes texte dont une version normalisée (majuscules, sans accents, espaces
+# réduits : voir ``core.text_norm``) est matérialisée à chaque chargement.
+NORMALIZED_COLUMNS: dict[str, tuple[str, ...]] = {
+    "items": ("code_article", "libelle_court_article"),
+    "manufacturers": ("code_article", "nom_fabricant", "reference_article_fabricant"),
+    "equivalents": ("code_article", "code_article_correspondant"),
+    "stores": ("code_magasin",),
+    "pudos": ("code_point_relais",),
+    "helios": ("code_ig",),
+    "stock_554": ("code_article", "code_magasin", "flag_stock_d_m", "code_qualite"),
+    "stats_exit": ("code_article", "lib_motif_mvt"),
+}
+
+# Clés naturelles indexées (valeur normalisée -> offsets des lignes), index dérivés "pk:<table>.<colonne>"
+KEY_COLUMNS: dict[str, tuple[str, ...]] = {
+    "items": ("code_article",),
+    "manufacturers": ("code_article",),
+    "equivalents": ("code_article", "code_article_correspondant"),
+    "stores": ("code_magasin",),
+    "pudos": ("code_point_relais",),
+    "helios": ("code_ig",),
+    "stock_554": ("code_article",),
+}
+
+
+def _file_signature(path: str) -> tuple[float, int] | None:
+    """(mtime, taille) du fichier, ou None s'il est absent."""
+    try:
+        st = os.stat(path)
+        return (float(st.st_mtime), int(st.st_size))
+    except OSError:
+        return None
+
+
+def _read_or_empty(path: str) -> pl.DataFrame:
+    try:
+        return pl.read_parquet(path)
+    except Exception:
+        return pl.DataFrame()
+
+
+def _index_rows(df: pl.DataFrame, key: str) -> dict:
+    if df.is_empty() or key not in df.columns:
+        return {}
+    return {row[key]: row for row in df.iter_rows(named=True)}
+
+
+# Index dérivés : nom -> (tables dont il dépend, constructeur(tables) -> objet)
+_DERIVED: dict[str, tuple[tuple[str, ...], Callable[[Mapping[str, pl.DataFrame]], Any]]] = {}
+
+
+def register_derived(
+    name: str,
+    depends_on: tuple[str, ...] | list[str],
+    builder: Callable[[Mapping[str, pl.DataFrame]], Any],
+) -> None:
+    """Déclare un index dérivé, reconstruit uniquement quand une de ses tables change.
+
+    Le constructeur reçoit le mapping des tables du nouveau snapshot. Les index
+    sont déclarés dans ce module, avant le premier chargement (``get_data_store``
+    est appelé dès l'import des modules de données). Un index enregistré plus
+    tard est construit à la demande via ``DataSnapshot.derived_index``, puis à
+    chaque recharge.
+    """
+    unknown = [t for t in depends_on if t not in TABLES]
+    if unknown:
+        raise ValueError(f"Tables inconnues pour l'index {name!r}: {unknown}")
+    _DERIVED[name] = (tuple(depends_on), builder)
+
+
+# Fonctions appelées après la publication d'un nouveau snapshot (ex. vidage des caches de résultats)
+_ON_PUBLISH: list[Callable[["DataSnapshot"], None]] = []
+
+
+def on_snapshot_published(callback: Callable[["DataSnapshot"], None]) -> None:
+    """Enregistre ``callback(snapshot)``, appelé à chaque publication d'un nouveau snapshot."""
+    if callback not in _ON_PUBLISH:
+        _ON_PUBLISH.append(callback)
+
+
+register_derived("dico_stores", ("stores",), lambda t: MappingProxyType(_index_rows(t["stores"], "code_magasin")))
+register_derived("dico_helios", ("helios",), lambda t: MappingProxyType(_index_rows(t["helios"], "code_ig")))
+# Index spatiaux (recherches par rayon / plus proches voisins)
+register_derived("geo_pudos", ("pudos",), lambda t: GridIndex.from_frame(t["pudos"], "latitude", "longitude"))
+register_derived("geo_stores", ("stores",), lambda t: GridIndex.from_frame(t["stores"], "latitude_right", "longitude_right"))
+register_derived("geo_helios", ("helios",), lambda t: GridIndex.from_frame(t["helios"], "latitude", "longitude"))
+
+
+def _build_items_text_index(tables: Mapping[str, pl.DataFrame]) -> TextIndex:
+    """Index plein texte des articles, enrichi du texte des fabricants de chaque article."""
+    items = tables["items"]
+    mf = tables["manufacturers"]
+    extra = None
+    if not mf.is_empty() and "code_article" in mf.columns and "code_article" in items.columns:
+        text_cols = [c for c in mf.columns if c != "code_article"]
+        if text_cols:
+            extra = (
+                mf.group_by("code_article")
+                .agg(
+                    pl.concat_str([pl.col(c).cast(pl.Utf8).fill_null("") for c in text_cols], separator=" ")
+                    .str.join(" ")
+                    .alias("text")
+                )
+                .with_columns(pl.col("code_article").cast(items.schema["code_article"], strict=False))
+            )
+    return TextIndex.from_frame(items, "code_article", extra)
+
+
+# Recherche catalogue (search_items / search_items_advanced)
+register_derived("items_text", ("items", "manufacturers"), _build_items_text_index)
+# Nomenclatures (BOM) partagées par tous les endpoints BOM (``services.items_service``)
+register_derived("bom", ("nomenclatures",), lambda t: Nomenclatures.from_dataframe(t["nomenclatures"]))
+# Graphe des articles (nomenclature + équivalences) pour /api/items/<code>/network
+register_derived(
+    "article_graph",
+    ("nomenclatures", "equivalents"),
+    lambda t: ArticleGraph.from_frames(t["nomenclatures"], t["equivalents"]),
+)
+
+
+def _normalized_frame(df: pl.DataFrame, columns: tuple[str, ...]) -> pl.DataFrame:
+    """Colonnes normalisées, alignées ligne à ligne sur ``df`` (mêmes lignes, même ordre)."""
+    present = [c for c in columns if c in df.columns]
+    if not present:
+        return pl.DataFrame()
+    return df.select([norm_text_expr(c).alias(c) for c in present])
+
+
+# Colonnes normalisées : index dérivés "norm_<table>"
+for _table, _columns in NORMALIZED_COLUMNS.items():
+    register_derived(
+        f"norm_{_table}",
+        (_table,),
+        lambda t, _table=_table, _columns=_columns: _normalized_frame(t[_table], _columns),
+    )
+
+
+def _key_index(df: pl.DataFrame, column: str) -> Mapping[str, tuple[int, ...]]:
+    """Index de clé : valeur normalisée de ``column`` -> offsets des lignes (ordre d'origine)."""
+    if df.is_empty() or column not in df.columns:
+        return MappingProxyType({})
+    groups = (
+        df.select(norm_text_expr(column).alias("__key"))
+        .with_row_index("__row")
+        .filter(pl.col("__key").is_not_null() & (pl.col("__key") != ""))
+        .group_by("__key", maintain_order=True)
+        .agg(pl.col("__row"))
+    )
+    return MappingProxyType(dict(zip(groups["__key"].to_list(), map(tuple, groups["__row"].to_list()))))
+
+
+def _key_index_name(table: str, column: str) -> str:
+    return f"pk:{table}.{column}"
+
+
+for _table, _columns in KEY_COLUMNS.items():
+    for _column in _columns:
+        register_derived(
+            _key_index_name(_table, _column),
+            (_table,),
+            lambda t, _table=_table, _column=_column: _key_index(t[_table], _column),
+        )
+
+
+def _snapshot_version(signatures: Mapping[str, tuple[float, int] | None]) -> str:
+    """Version déterministe d'un jeu de fichiers (mêmes fichiers -> même version)."""
+    h = hashlib.sha1()
+    for name in sorted(signatures):
+        h.update(f"{name}={signatures[name]!r};".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class ReloadReport:
+    """Compte rendu d'une recharge (tables relues, index reconstruits, durées)."""
+
+    version: str
+    started_at: float
+    duration_s: float
+    refreshed: tuple[dict, ...] = ()
+    reused: tuple[str, ...] = ()
+    derived_rebuilt: tuple[dict, ...] = ()
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+            "duration_s": round(self.duration_s, 3),
+            "refreshed": list(self.refreshed),
+            "reused": list(self.reused),
+            "derived_rebuilt": list(self.derived_rebuilt),
+        }
+
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class _BuildFailure:
+    """Échec de construction d'un index dérivé (pas de nouvel essai sur ce snapshot)."""
+
+    error: Exception
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """Jeu de données cohérent, immuable une fois publié.
+
+    - ``tables`` : DataFrames par nom logique (voir ``TABLES``) ;
+    - ``derived`` : index dérivés (``dico_stores``, ``dico_helios``, ...) ;
+    - ``version`` : empreinte des fichiers sources (mtime + taille).
+    """
+
+    tables: Mapping[str, pl.DataFrame]
+    derived: Mapping[str, Any]
+    signatures: Mapping[str, tuple[float, int] | None]
+    version: str
+    loaded_at: float = field(default_factory=time.time)
+    # Index construits à la demande pour ce snapshot (enregistrés tardivement) et
+    # échecs de construction (``_BuildFailure``), mémorisés jusqu'à la recharge suivante
+    _lazy: dict = field(default_factory=dict, repr=False, compare=False)
+    _lazy_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def table(self, name: str) -> pl.DataFrame:
+        df = self.tables.get(name)
+        return df if df is not None else pl.DataFrame()
+
+    def derived_index(self, name: str) -> Any:
+        """Retourne l'index dérivé ``name`` (construit à la demande si absent)."""
+        if name in self.derived:
+            return self.derived[name]
+        value = self._lazy.get(name, _MISSING)
+        if value is _MISSING:
+            with self._lazy_lock:
+                value = self._lazy.get(name, _MISSING)
+                if value is _MISSING:
+                    _, builder = _DERIVED[name]
+                    try:
+                        value = builder(self.tables)
+                    except Exception as e:
+                        value = _BuildFailure(e)
+                    self._lazy[name] = value
+        if isinstance(value, _BuildFailure):
+            raise value.error
+        return value
+
+    def derived_or_none(self, name: str) -> Any:
+        """Comme ``derived_index``, mais renvoie None si l'index ne peut pas être construit."""
+        try:
+            return self.derived_index(name)
+        except Exception:
+            return None
+
+    def normalized(self, name: str) -> pl.DataFrame:
+        """Colonnes normalisées de la table ``name`` (voir ``NORMALIZED_COLUMNS``), alignées sur ses lignes."""
+        df = self.derived_or_none(f"norm_{name}") if name in NORMALIZED_COLUMNS else None
+        return df if df is not None else pl.DataFrame()
+
+    def key_offsets(self, name: str, column: str, value) -> tuple[int, ...] | None:
+        """Offsets des lignes dont la clé ``column`` vaut ``value`` (normalisée), via l'index de clé.
+
+        Renvoie None si ``column`` n'est pas une clé indexée de la table (voir ``KEY_COLUMNS``).
+        """
+        if column not in KEY_COLUMNS.get(name, ()):
+            return None
+        index = self.derived_or_none(_key_index_name(name, column))
+        if index is None:
+            return None
+        return index.get(norm_text(value), ())
+
+    def rows_by_key(self, name: str, value, column: str | None = None) -> list[dict]:
+        """Lignes (dict) dont la clé naturelle vaut ``value`` ; ``column`` par défaut : première clé de la table."""
+        column = column or KEY_COLUMNS.get(name, ("",))[0]
+        offsets = self.key_offsets(name, column, value)
+        if offsets is None:
+            return self.match_normalized(name, column, value).to_dicts()
+        df = self.table(name)
+        return [df.row(i, named=True) for i in offsets]
+
+    def row_by_key(self, name: str, value, column: str | None = None) -> dict | None:
+        """Première ligne (dict) dont la clé naturelle vaut ``value``, ou None."""
+        rows = self.rows_by_key(name, value, column)
+        return rows[0] if rows else None
+
+    def match_normalized(self, name: str, column: str, value) -> pl.DataFrame:
+        """Lignes de la table ``name`` dont ``column`` vaut ``value`` après normalisation des deux côtés.
+
+        Utilise l'index de clé si ``column`` est une clé naturelle, sinon la colonne
+        normalisée matérialisée, sinon normalise la colonne à la volée.
+        """
+        df = self.table(name)
+        target = norm_text(value)
+        if not target or column not in df.columns:
+            return df.clear()
+        offsets = self.key_offsets(name, column, target)
+        if offsets is not None:
+            return take_rows(df, list(offsets))
+        norm = self.normalized(name)
+        if column in norm.columns and norm.height == df.height:
+            return df.filter(norm.get_column(column) == target)
+        return df.filter(norm_text_expr(column) == target)
+
+    def match_any_column(self, name: str, value, columns: list[str] | None = None) -> tuple[str, dict] | None:
+        """Première ligne dont une des ``columns`` (toutes par défaut, dans l'ordre) vaut ``value`` normalisée.
+
+        Un seul passage vectorisé sur la table ; la colonne correspondante n'est
+        ensuite recherchée que parmi les lignes trouvées. Renvoie (colonne, ligne).
+        """
+        df = self.table(name)
+        target = norm_text(value)
+        cols = [c for c in (columns or df.columns) if c in df.columns and not df.schema[c].is_nested()]
+        if not target or not cols:
+            return None
+        hits = df.filter(pl.any_horizontal([norm_text_expr(c) == target for c in cols]).fill_null(False))
+        for c in cols:
+            sub = hits.filter((norm_text_expr(c) == target).fill_null(False))
+            if sub.height:
+                return c, sub.row(0, named=True)
+        return None
+
+    @property
+    def dico_stores(self) -> Mapping:
+        return self.derived_index("dico_stores")
+
+    @property
+    def dico_helios(self) -> Mapping:
+        return self.derived_index("dico_helios")
+
+    @property
+    def pudos(self) -> pl.DataFrame:
+        return self.table("pudos")
+
+    @property
+    def stores(self) -> pl.DataFrame:
+        return self.table("stores")
+
+    @property
+    def helios(self) -> pl.DataFrame:
+        return self.table("helios")
+
+    @property
+    def items(self) -> pl.DataFrame:
+        return self.table("items")
+
+    @property
+    def items_parent_buildings(self) -> pl.DataFrame:
+        return self.table("items_parent_buildings")
+
+    @property
+    def items_son_buildings(self) -> pl.DataFrame:
+        return self.table("items_son_buildings")
+
+    @property
+    def nomenclatures(self) -> pl.DataFrame:
+        return self.table("nomenclatures")
+
+    @property
+    def manufacturers(self) -> pl.DataFrame:
+        return self.table("manufacturers")
+
+    @property
+    def equivalents(self) -> pl.DataFrame:
+        return self.table("equivalents")
+
+    @property
+    def stats_exit(self) -> pl.DataFrame:
+        return self.table("stats_exit")
+
+    @property
+    def stock_554(self) -> pl.DataFrame:
+        return self.table("stock_554")
+
+
+def _empty_snapshot() -> DataSnapshot:
+    return DataSnapshot(
+        tables=MappingProxyType({name: pl.DataFrame() for name in TABLES}),
+        derived=MappingProxyType({}),
+        signatures=MappingProxyType({}),
+        version="",
+    )
+
+
+class DataStore:
+    """Publie le snapshot courant des DataFrames de référence.
+
+    - ``reload()`` construit un nouveau snapshot si les fichiers ont changé,
+      puis le publie d'un seul coup ; les lecteurs ne prennent jamais de verrou ;
+    - ``snapshot`` renvoie le snapshot publié (à conserver le temps d'un traitement) ;
+    - ``last_reload_report`` décrit la dernière recharge effectuée.
+    """
+
+    def __init__(self, data_dir: str | None = None):
+        self.data_dir = data_dir or os.path.join(path_datan, folder_name_app)
+        # Sérialise les recharges entre elles (pas les lectures).
+        self._reload_lock = threading.Lock()
+        self._snapshot: DataSnapshot = _empty_snapshot()
+        self.last_reload_report: ReloadReport | None = None
+
+    def parquet_path(self, name: str) -> str:
+        return os.path.join(self.data_dir, f"{TABLES[name]}.parquet")
+
+    def _current_signatures(self) -> dict[str, tuple[float, int] | None]:
+        return {name: _file_signature(self.parquet_path(name)) for name in TABLES}
+
+    def missing_tables(self, names: list[str] | None = None) -> list[str]:
+        """Retourne les tables (parmi ``names``) dont le parquet est absent."""
+        return [n for n in (names or list(TABLES)) if not os.path.exists(self.parquet_path(n))]
+
+    @property
+    def snapshot(self) -> DataSnapshot:
+        return self._snapshot
+
+    def _build_snapshot(
+        self,
+        signatures: dict[str, tuple[float, int] | None],
+        previous: DataSnapshot,
+        force: bool,
+    ) -> tuple[DataSnapshot, ReloadReport]:
+        started = time.time()
+        t0 = time.perf_counter()
+
+        tables: dict[str, pl.DataFrame] = {}
+        changed: set[str] = set()
+        refreshed: list[dict] = []
+        reused: list[str] = []
+        for name in TABLES:
+            old = previous.tables.get(name)
+            if (not force) and old is not None and previous.signatures.get(name) == signatures[name]:
+                tables[name] = old
+                reused.append(name)
+                continue
+            t_read = time.perf_counter()
+            df = _read_or_empty(self.parquet_path(name))
+            prepare = _PREPARE.get(name)
+            if prepare is not None and not df.is_empty():
+                df = prepare(df)
+            tables[name] = df
+            changed.add(name)
+            refreshed.append({
+                "table": name,
+                "rows": df.height,
+                "seconds": round(time.perf_counter() - t_read, 3),
+            })
+
+        tables_view = MappingProxyType(tables)
+        derived: dict[str, Any] = {}
+        failed: dict[str, _BuildFailure] = {}
+        derived_rebuilt: list[dict] = []
+        for name, (deps, builder) in list(_DERIVED.items()):
+            if name in previous.derived and not changed.intersection(deps):
+                derived[name] = previous.derived[name]
+                continue
+            t_build = time.perf_counter()
+            try:
+                derived[name] = builder(tables_view)
+            except Exception as e:
+                logger.warning(f"Index dérivé {name!r} non construit : {e.__class__.__name__}: {e}")
+                failed[name] = _BuildFailure(e)
+                continue
+            derived_rebuilt.append({
+                "index": name,
+                "seconds": round(time.perf_counter() - t_build, 3),
+            })
+
+        version = _snapshot_version(signatures)
+        snapshot = DataSnapshot(
+            tables=tables_view,
+            derived=MappingProxyType(derived),
+            signatures=MappingProxyType(dict(signatures)),
+            version=version,
+            _lazy=failed,
+        )
+        report = ReloadReport(
+            version=version,
+            started_at=started,
+            duration_s=time.perf_counter() - t0,
+            refreshed=tuple(refreshed),
+            reused=tuple(reused),
+            derived_rebuilt=tuple(derived_rebuilt),
+        )
+        return snapshot, report
+
+    def reload(self, force: bool = False) -> bool:
+        """Recharge les parquets modifiés depuis le dernier snapshot.
+
+        Sans ``force``, rien n'est relu si aucun fichier n'a changé, et seules les
+        tables modifiées sont relues sinon. ``force`` relit toutes les tables.
+        Retourne True si un nouveau snapshot a été publié.
+        """
+        with self._reload_lock:
+            signatures = self._current_signatures()
+            previous = self._snapshot
+            if (not force) and previous.signatures and signatures == dict(previous.signatures):
+                return False
+
+            snapshot, report = self._build_snapshot(signatures, previous, force)
+            # Publication atomique : une seule affectation de référence.
+            self._snapshot = snapshot
+            self.last_reload_report = report
+            logger.info(
+                "DataStore rechargé en {:.3f}s (version {}) : {}",
+                report.duration_s,
+                report.version,
+                ", ".join(f"{r['table']}={r['seconds']}s" for r in report.refreshed) or "aucune table relue",
+            )
+            for callback in list(_ON_PUBLISH):
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logger.warning(f"Callback de publication en échec : {e.__class__.__name__}: {e}")
+            return True
+
+    def reload_report(self) -> dict | None:
+        report = self.last_reload_report
+        return report.to_dict() if report is not None else None
+
+
+_store: DataStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_data_store() -> DataStore:
+    """Retourne l'instance unique du magasin de données (chargée au premier appel)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = DataStore()
+                store.reload(force=True)
+                _store = store
+    return _store
+
+
+def current_snapshot() -> DataSnapshot:
+    """Retourne le snapshot à utiliser pour le traitement en cours.
+
+    Dans une requête Flask, le premier appel fige le snapshot dans ``flask.g`` :
+    tous les accès de la même requête voient donc les mêmes tables, même si
+    une recharge est publiée entre-temps. Hors requête, renvoie le snapshot publié.
+    """
+    try:
+        from flask import g, has_request_context
+    except Exception:
+        return get_data_store().snapshot
+
+    if not has_request_context():
+        return get_data_store().snapshot
+    snap = g.get("scapp_snapshot")
+    if snap is None:
+        snap = get_data_store().snapshot
+        g.scapp_snapshot = snap
+    return snap
+
+
+def reload_data(force: bool = False) -> bool:
+    return get_data_store().reload(force=force)
+
+
+def rows_for_keys(name: str, column: str, values, path: str | None = None) -> pl.DataFrame:
+    """Lignes de la table ``name`` dont ``column`` vaut exactement une des ``values``.
+
+    - table résidente du snapshot courant (voir ``TABLES``) : sélection en mémoire,
+      via l'index de clé quand ``column`` en est une (voir ``KEY_COLUMNS``) ;
+    - sinon (table non chargée, ex. stock_final) : lecture paresseuse du parquet
+      avec le filtre poussé au lecteur ; les row groups dont les statistiques
+      min / max excluent les valeurs ne sont pas lus (les parquets de stock sont
+      triés par code_article, voir l'ETL).
+
+    FileNotFoundError si la table n'est pas résidente et que son parquet est absent.
+    """
+    values = [v for v in dict.fromkeys(values) if v is not None]
+    snap = current_snapshot()
+    if name in TABLES and snap.signatures.get(name) is not None:
+        df = snap.table(name)
+        if not values or column not in df.columns:
+            return df.clear()
+        offsets = None
+        for value in values:
+            found = snap.key_offsets(name, column, value)
+            if found is None:
+                break
+            offsets = (offsets or set()) | set(found)
+        else:
+            # Index normalisé : on garde ensuite la correspondance exacte
+            df = take_rows(df, sorted(offsets or ()))
+        return df.filter(pl.col(column).is_in(values))
+
+    path = path or os.path.join(get_data_store().data_dir, f"{TABLES.get(name, name)}.parquet")
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    lf = pl.scan_parquet(path)
+    if not values:
+        return lf.head(0).collect()
+    # Égalité simple pour une seule valeur : prédicat toujours évalué sur les statistiques
+    predicate = pl.col(column) == values[0] if len(values) == 1 else pl.col(column).is_in(values)
+    return lf.filter(predicate).collect()
@@ -0,0 +1,231 @@
+"""Planificateur de la mise à jour des données (ETL ``update_data`` + recharge mémoire).
+
+- cadence configurable (``ETL_INTERVAL_S``) avec une gigue aléatoire
+  (``ETL_JITTER_S``) pour ne pas solliciter le partage réseau à heure fixe ;
+- exécution unique (single-flight) : un déclenchement manuel pendant une
+  exécution complète en cours ne lance pas une seconde mise à jour en
+  parallèle, il en attend le résultat ; pendant une exécution partielle
+  (étapes ciblées par la surveillance), il met en attente une exécution
+  complète et attend celle-ci ; les déclenchements arrivés pendant
+  l'exécution sont regroupés en une seule exécution suivante ;
+- la recharge du ``DataStore`` (incrémentale, non forcée) n'a lieu que si
+  l'ETL a effectivement modifié des parquets.
+"""
+import random
+import threading
+import time
+
+from supplychain_app.data.data_store import reload_data
+from supplychain_app.data.pudo_etl import get_last_update_summary, update_data
+from supplychain_app.my_loguru import logger
+
+DEFAULT_INTERVAL_S = 1800
+DEFAULT_JITTER_S = 120
+
+
+class EtlScheduler:
+    """Exécute ``update_data`` périodiquement ou à la demande, jamais deux fois en parallèle."""
+
+    def __init__(self, interval_s: float = DEFAULT_INTERVAL_S, jitter_s: float = DEFAULT_JITTER_S):
+        self.interval_s = float(interval_s)
+        self.jitter_s = float(jitter_s)
+        self._cond = threading.Condition()
+        self._running = False
+        self._running_trigger: str | None = None
+        self._running_since: float | None = None
+        self._running_steps: set[str] | None = None
+        # Déclenchements en attente (regroupés en une seule exécution) : raisons,
+        # étapes ETL demandées, ou toutes les étapes
+        self._queued: list[str] = []
+        self._queued_steps: set[str] = set()
+        self._queued_all = False
+        self._generation = 0
+        self._last_result: dict | None = None
+        self._last_error: Exception | None = None
+        self._last_run: dict | None = None
+        self._runs = 0
+        self._next_run: float | None = None
+        self._thread: threading.Thread | None = None
+
+    def configure(self, interval_s: float | None = None, jitter_s: float | None = None) -> None:
+        with self._cond:
+            if interval_s is not None:
+                self.interval_s = max(1.0, float(interval_s))
+            if jitter_s is not None:
+                self.jitter_s = max(0.0, float(jitter_s))
+            if self._next_run is not None:
+                self._next_run = self._schedule_next()
+            self._cond.notify_all()
+
+    def _schedule_next(self) -> float:
+        return time.time() + self.interval_s + random.uniform(0, self.jitter_s)
+
+    def start(self) -> None:
+        """Démarre le thread périodique (une seule fois) ; la première exécution est immédiate."""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._next_run = time.time()
+            self._thread = threading.Thread(target=self._loop, name="etl-scheduler", daemon=True)
+            self._thread.start()
+
+    def trigger(self, reason: str = "manual", steps: set[str] | None = None) -> None:
+        """Demande une exécution dès que possible, sans attendre (regroupée si déjà demandée).
+
+        ``steps`` limite l'exécution à ces étapes ETL (et à celles qui en dépendent).
+        """
+        with self._cond:
+            if reason not in self._queued:
+                self._queued.append(reason)
+            if steps is None:
+                self._queued_all = True
+            else:
+                self._queued_steps.update(steps)
+            self._cond.notify_all()
+            started = self._thread is not None
+        if not started:
+            threading.Thread(target=self._run_queued, name="etl-trigger", daemon=True).start()
+
+    def run_now(self, reason: str = "manual", timeout: float | None = None) -> dict | None:
+        """Exécute une mise à jour complète et retourne son résultat.
+
+        Si une exécution complète est déjà en cours, on attend sa fin et on
+        retourne son résultat au lieu d'en lancer une seconde. Pendant une
+        exécution partielle, une exécution complète est mise en attente (ou
+        lancée ici dès la fin de la partielle) et c'est son résultat qui est
+        retourné. Une mise à jour en erreur lève l'exception rencontrée.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._running:
+                generation = self._generation
+                coalesce = self._running_steps is None
+                if not coalesce:
+                    if reason not in self._queued:
+                        self._queued.append(reason)
+                    self._queued_all = True
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not self._cond.wait_for(lambda: self._generation != generation, timeout=remaining):
+                    return self._last_result
+                if coalesce:
+                    if self._last_error is not None:
+                        raise self._last_error
+                    return self._last_result
+            self._begin(reason, all_steps=True)
+        result, error = self._execute(reason, None)
+        if error is not None:
+            raise error
+        return result
+
+    def _begin(self, reason: str, all_steps: bool = False) -> set[str] | None:
+        """Passe à l'état "en cours" (sous self._cond) ; retourne les étapes à exécuter (None = toutes)."""
+        steps = None if (all_steps or self._queued_all or not self._queued_steps) else set(self._queued_steps)
+        self._running = True
+        self._running_trigger = reason
+        self._running_since = time.time()
+        self._running_steps = steps
+        self._queued.clear()
+        self._queued_steps.clear()
+        self._queued_all = False
+        return steps
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def _execute(self, reason: str, steps: set[str] | None) -> tuple[dict | None, Exception | None]:
+        """Exécute l'ETL puis la recharge ; retourne (résultat, exception éventuelle)."""
+        started = time.perf_counter()
+        result = None
+        exc: Exception | None = None
+        error = None
+        reloaded = False
+        try:
+            result = update_data(steps) if steps is not None else update_data()
+            summary = get_last_update_summary()
+            if summary.get("has_changes"):
+                # Recharge incrémentale : seules les tables modifiées sont relues.
+                reloaded = reload_data()
+        except Exception as e:
+            exc = e
+            error = f"{e.__class__.__name__}: {e}"
+            logger.error(f"ETL run ({reason}) failed: {error}")
+        finally:
+            with self._cond:
+                self._running = False
+                self._running_trigger = None
+                self._running_since = None
+                self._running_steps = None
+                self._generation += 1
+                self._runs += 1
+                self._last_result = result
+                self._last_error = exc
+                self._last_run = {
+                    "trigger": reason,
+                    "steps": sorted(steps) if steps is not None else None,
+                    "finished_at": time.time(),
+                    "duration_s": round(time.perf_counter() - started, 3),
+                    "has_changes": bool(get_last_update_summary().get("has_changes")),
+                    "reloaded": bool(reloaded),
+                    "error": error,
+                }
+                # Seule une exécution complète repousse la prochaine exécution périodique
+                if self._thread is not None and steps is None:
+                    self._next_run = self._schedule_next()
+                self._cond.notify_all()
+        return result, exc
+
+    def _run_queued(self) -> None:
+        with self._cond:
+            if self._running or not self._queued:
+                return
+            reason = "+".join(self._queued)
+            steps = self._begin(reason)
+        self._execute(reason, steps)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queued and not self._running and time.time() < (self._next_run or 0):
+                    self._cond.wait(timeout=max(0.0, (self._next_run or 0) - time.time()))
+                if self._running:
+                    # Exécution manuelle en cours : on attend sa fin puis on réévalue
+                    self._cond.wait_for(lambda: not self._running)
+                    continue
+                periodic = time.time() >= (self._next_run or 0)
+                reason = "+".join(self._queued) if self._queued else "periodic"
+                steps = self._begin(reason, all_steps=periodic)
+            try:
+                self._execute(reason, steps)
+            except Exception:
+                pass
+
+    def status(self) -> dict:
+        with self._cond:
+            return {
+                "state": "running" if self._running else "idle",
+                "running_trigger": self._running_trigger,
+                "running_since": self._running_since,
+                "running_steps": sorted(self._running_steps) if self._running and self._running_steps is not None else None,
+                "queued": list(self._queued),
+                "queued_steps": "all" if self._queued_all else sorted(self._queued_steps),
+                "interval_s": self.interval_s,
+                "jitter_s": self.jitter_s,
+                "next_run": self._next_run if self._thread is not None else None,
+                "runs": self._runs,
+                "last_run": dict(self._last_run) if self._last_run else None,
+            }
+
+
+_scheduler: EtlScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_etl_scheduler() -> EtlScheduler:
+    """Retourne le planificateur unique du process."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = EtlScheduler()
+    return _scheduler
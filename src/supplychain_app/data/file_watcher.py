@@ -0,0 +1,278 @@
+"""Surveillance des dossiers de données pour rafraîchir l'application en quelques secondes.
+
+Dossiers surveillés : ceux des sources de l'ETL (``path_exit_parquet``, dossier
+de l'annuaire PR, fichier 554, offre consommables) et le dossier des parquets
+de travail (``path_datan/folder_name_app``).
+
+- Sur un disque local Windows, les notifications du système
+  (``ReadDirectoryChangesW`` via pywin32) signalent les fichiers modifiés.
+- Sur un partage réseau (ou sans pywin32), un balayage périodique du dossier
+  (``os.scandir`` : une lecture de répertoire, pas un stat() par table) compare
+  taille et date de chaque fichier.
+
+Les événements sont regroupés (anti-rebond) puis traduits en actions ciblées :
+- source modifiée : seules les étapes ETL concernées (et leurs dépendantes) sont
+  demandées au planificateur ;
+- parquet de travail modifié : recharge incrémentale du DataStore (seules les
+  tables modifiées sont relues), sauf si une mise à jour est en cours (elle
+  recharge elle-même à la fin).
+"""
+import os
+import threading
+import time
+
+from supplychain_app.constants import path_datan, folder_name_app
+from supplychain_app.data.data_store import reload_data
+from supplychain_app.data.etl_scheduler import get_etl_scheduler
+from supplychain_app.data.pudo_etl import get_update_status
+from supplychain_app.my_loguru import logger
+
+DEFAULT_POLL_S = 15
+DEFAULT_DEBOUNCE_S = 3
+# Au-delà, les événements accumulés sont traités même si d'autres arrivent encore
+MAX_DEBOUNCE_S = 30
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _ignored(name: str) -> bool:
+    """Fichiers temporaires (écritures atomiques, verrous Office) : pas d'événement."""
+    lower = name.lower()
+    return lower.endswith(".tmp") or lower.startswith("~$") or lower == "etl_manifest.json"
+
+
+def _is_network_path(path: str) -> bool:
+    if path.startswith("\\\\") or path.startswith("//"):
+        return True
+    try:
+        import win32file
+
+        drive = os.path.splitdrive(os.path.abspath(path))[0]
+        return bool(drive) and win32file.GetDriveType(drive + "\\") == win32file.DRIVE_REMOTE
+    except Exception:
+        return False
+
+
+def _scan(directory: str) -> dict[str, tuple[int, int]]:
+    """Taille et date (ns) des fichiers du dossier, en une lecture de répertoire."""
+    out: dict[str, tuple[int, int]] = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if _ignored(entry.name):
+                    continue
+                try:
+                    if entry.is_file():
+                        st = entry.stat()
+                        out[entry.name] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return out
+
+
+class DataWatcher:
+    """Surveille des dossiers et appelle ``on_changes(chemins)`` après anti-rebond."""
+
+    def __init__(self, on_changes, poll_s: float = DEFAULT_POLL_S, debounce_s: float = DEFAULT_DEBOUNCE_S):
+        self.on_changes = on_changes
+        self.poll_s = float(poll_s)
+        self.debounce_s = float(debounce_s)
+        self._lock = threading.Condition()
+        self._pending: set[str] = set()
+        self._first_event: float | None = None
+        self._last_event: float | None = None
+        self._watched: dict[str, str] = {}
+        self._threads: list[threading.Thread] = []
+
+    def watch(self, directory: str) -> None:
+        """Ajoute un dossier (notifications système si possible, balayage sinon)."""
+        if not directory or not os.path.isdir(directory):
+            return
+        key = _norm(directory)
+        if key in self._watched:
+            return
+        backend = "poll"
+        if os.name == "nt" and not _is_network_path(directory):
+            try:
+                import win32file  # noqa: F401
+
+                backend = "native"
+            except ImportError:
+                backend = "poll"
+        self._watched[key] = backend
+        target = self._native_loop if backend == "native" else self._poll_loop
+        t = threading.Thread(target=target, args=(directory,), name=f"watch-{os.path.basename(key)}", daemon=True)
+        self._threads.append(t)
+        t.start()
+        logger.info(f"Watching {directory} ({backend})")
+
+    def start(self) -> None:
+        t = threading.Thread(target=self._dispatch_loop, name="watch-dispatch", daemon=True)
+        self._threads.append(t)
+        t.start()
+
+    def _notify(self, paths: list[str]) -> None:
+        if not paths:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._pending.update(paths)
+            if self._first_event is None:
+                self._first_event = now
+            self._last_event = now
+            self._lock.notify_all()
+
+    def _native_loop(self, directory: str) -> None:
+        import win32con
+        import win32file
+
+        try:
+            handle = win32file.CreateFile(
+                directory,
+                0x0001,  # FILE_LIST_DIRECTORY
+                win32con.FILE_SHARE_READ | win32con.FILE_SHARE_WRITE | win32con.FILE_SHARE_DELETE,
+                None,
+                win32con.OPEN_EXISTING,
+                win32con.FILE_FLAG_BACKUP_SEMANTICS,
+                None,
+            )
+        except Exception as e:
+            logger.warning(f"Native watch unavailable for {directory}, polling: {e}")
+            self._poll_loop(directory)
+            return
+        flags = (
+            win32con.FILE_NOTIFY_CHANGE_FILE_NAME
+            | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE
+            | win32con.FILE_NOTIFY_CHANGE_SIZE
+        )
+        while True:
+            try:
+                changes = win32file.ReadDirectoryChangesW(handle, 64 * 1024, False, flags)
+            except Exception as e:
+                logger.warning(f"Native watch stopped for {directory}, polling: {e}")
+                self._poll_loop(directory)
+                return
+            self._notify([
+                os.path.join(directory, name)
+                for _action, name in changes
+                if not _ignored(os.path.basename(name))
+            ])
+
+    def _poll_loop(self, directory: str) -> None:
+        previous = _scan(directory)
+        while True:
+            time.sleep(self.poll_s)
+            current = _scan(directory)
+            changed = [
+                os.path.join(directory, name)
+                for name in set(previous) | set(current)
+                if previous.get(name) != current.get(name)
+            ]
+            previous = current
+            self._notify(changed)
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._lock:
+                while True:
+                    if self._first_event is None:
+                        self._lock.wait()
+                        continue
+                    now = time.monotonic()
+                    quiet = now - self._last_event
+                    waited = now - self._first_event
+                    if quiet >= self.debounce_s or waited >= MAX_DEBOUNCE_S:
+                        break
+                    self._lock.wait(timeout=min(self.debounce_s - quiet, MAX_DEBOUNCE_S - waited))
+                paths = sorted(self._pending)
+                self._pending.clear()
+                self._first_event = None
+                self._last_event = None
+            try:
+                self.on_changes(paths)
+            except Exception as e:
+                logger.error(f"Watcher dispatch failed: {e}")
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "watched": dict(self._watched),
+                "pending": sorted(self._pending),
+                "poll_s": self.poll_s,
+                "debounce_s": self.debounce_s,
+            }
+
+
+def affected_steps(paths: list[str], status: list[dict]) -> set[str]:
+    """Étapes ETL dont une entrée (ou le dossier source) fait partie des chemins modifiés."""
+    changed = {_norm(p) for p in paths}
+    changed_dirs = {os.path.dirname(p) for p in changed}
+    steps = set()
+    for it in status:
+        inputs = {_norm(p) for p in it.get("inputs") or [] if p}
+        if inputs & changed:
+            steps.add(it["key"])
+        elif it.get("src_dir") and _norm(it["src_dir"]) in changed_dirs:
+            steps.add(it["key"])
+    return steps
+
+
+def _app_folder() -> str:
+    return os.path.join(path_datan, folder_name_app)
+
+
+def _on_changes(paths: list[str]) -> None:
+    """Traduit les fichiers modifiés en étapes ETL ciblées et / ou recharge des tables."""
+    app_dir = _norm(_app_folder())
+    sources = [p for p in paths if os.path.dirname(_norm(p)) != app_dir]
+    working = [p for p in paths if os.path.dirname(_norm(p)) == app_dir]
+
+    scheduler = get_etl_scheduler()
+    if sources:
+        steps = affected_steps(sources, get_update_status())
+        if steps:
+            logger.info(f"Sources changed, ETL steps requested: {sorted(steps)}")
+            scheduler.trigger("watch", steps=steps)
+    if working and not scheduler.running:
+        # Recharge incrémentale : seules les tables dont le parquet a changé sont relues
+        reload_data()
+
+
+def watched_directories(status: list[dict]) -> list[str]:
+    """Dossiers des sources de l'ETL + dossier des parquets de travail."""
+    dirs: dict[str, str] = {}
+    for it in status:
+        if it.get("src_dir"):
+            dirs.setdefault(_norm(it["src_dir"]), it["src_dir"])
+        for p in it.get("inputs") or []:
+            if p:
+                d = os.path.dirname(p)
+                dirs.setdefault(_norm(d), d)
+    app = _app_folder()
+    dirs.setdefault(_norm(app), app)
+    return list(dirs.values())
+
+
+_watcher: DataWatcher | None = None
+_watcher_lock = threading.Lock()
+
+
+def start_data_watcher(poll_s: float = DEFAULT_POLL_S, debounce_s: float = DEFAULT_DEBOUNCE_S) -> DataWatcher:
+    """Démarre (une seule fois) la surveillance des dossiers de données."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            watcher = DataWatcher(_on_changes, poll_s=poll_s, debounce_s=debounce_s)
+            for directory in watched_directories(get_update_status()):
+                watcher.watch(directory)
+            watcher.start()
+            _watcher = watcher
+    return _watcher
+
+
+def get_data_watcher() -> DataWatcher | None:
+    return _watcher
@@ -1,6 +1,10 @@
 import os
-import shutil
+import json
+import hashlib
+import io
+import threading
 import time
+from functools import partial
 from supplychain_app.constants import (path_exit,
                                        folder_gestion_pr,  
                                        path_exit_parquet,
@@ -10,6 +14,8 @@ from supplychain_app.constants import (path_exit,
                                        CONSO_OFFER_PARQUET_DIR)
 import polars as pl
 from supplychain_app.excel_csv_to_dataframe import read_excel
+from supplychain_app.core.task_graph import Task, run_task_graph, task_dependencies
+from supplychain_app.data.data_store import rows_for_keys
 from supplychain_app.my_loguru import logger
 
 SRC_STOCK_554_SUPPLYCHAIN_APP = path_exit
@@ -17,6 +23,9 @@ NAME_FILE_554 = "554 - (STK SPD TPS REEL) - STOCK TEMPS REEL SUPPLYCHAIN_APP.xls
 
 last_update_summary: dict | None = None
 
+# Empreintes (taille + mtime) des entrées de chaque étape lors de sa dernière exécution
+ETL_MANIFEST_NAME = "etl_manifest.json"
+
 
 def _latest_excel_in_dir(directory: str) -> str | None:
     try:
@@ -46,7 +55,9 @@ def _latest_excel_in_dir(directory: str) -> str | None:
         return None
 
 
-def _atomic_write_parquet(df: pl.DataFrame, dst_path: str) -> None:
+def _atomic_write(dst_path: str, write) -> None:
+    """Écrit ``dst_path`` via un fichier temporaire renommé à la fin (``write(tmp_path)``) :
+    les lecteurs ne voient jamais un fichier partiel."""
     dst_dir = os.path.dirname(dst_path)
     os.makedirs(dst_dir, exist_ok=True)
     tmp_path = dst_path + ".tmp"
@@ -56,7 +67,7 @@ def _atomic_write_parquet(df: pl.DataFrame, dst_path: str) -> None:
                 os.remove(tmp_path)
             except Exception:
                 pass
-        df.write_parquet(tmp_path)
+        write(tmp_path)
         os.replace(tmp_path, dst_path)
     finally:
         if os.path.exists(tmp_path):
@@ -65,6 +76,136 @@ def _atomic_write_parquet(df: pl.DataFrame, dst_path: str) -> None:
             except Exception:
                 pass
 
+
+def _atomic_write_parquet(df: pl.DataFrame, dst_path: str) -> None:
+    _atomic_write(dst_path, df.write_parquet)
+
+
+# Parquets de stock triés par code_article, avec statistiques par row group : une
+# lecture filtrée sur un article (scan_parquet) ne lit que les row groups dont
+# l'intervalle min / max peut le contenir.
+STOCK_SORT_COLUMN = "code_article"
+STOCK_ROW_GROUP_SIZE = 50_000
+
+
+def _write_sorted_parquet(df: pl.DataFrame, dst_path: str, column: str = STOCK_SORT_COLUMN) -> None:
+    if column in df.columns:
+        df = df.sort(column, nulls_last=True)
+    _atomic_write(
+        dst_path,
+        lambda tmp_path: df.write_parquet(tmp_path, statistics=True, row_group_size=STOCK_ROW_GROUP_SIZE),
+    )
+
+
+def _row_groups_ordered_by(path: str, column: str) -> bool:
+    """True si les row groups du parquet se suivent sans chevauchement sur ``column``.
+
+    Lu dans le footer (statistiques min / max) ; False si une statistique manque
+    ou si pyarrow est absent.
+    """
+    try:
+        import pyarrow.parquet as pq
+
+        md = pq.read_metadata(path)
+        previous_max = None
+        for i in range(md.num_row_groups):
+            rg = md.row_group(i)
+            col = next((rg.column(j) for j in range(rg.num_columns) if rg.column(j).path_in_schema == column), None)
+            st = col.statistics if col is not None else None
+            if st is None or not st.has_min_max:
+                return False
+            if previous_max is not None and st.min < previous_max:
+                return False
+            previous_max = st.max
+        return True
+    except Exception:
+        return False
+
+
+def _parquet_layout(path: str) -> dict | None:
+    """Signature du footer d'un parquet : schéma + une signature par row group.
+
+    Seul le footer est lu (quelques Ko, même sur le partage réseau). La signature
+    d'un row group combine son nombre de lignes, ses tailles par colonne et les
+    statistiques min / max / nulls. Retourne None si le fichier n'est pas un
+    parquet lisible (ou si pyarrow est absent).
+    """
+    try:
+        import pyarrow.parquet as pq
+
+        md = pq.read_metadata(path)
+        schema = hashlib.sha1(str(md.schema.to_arrow_schema()).encode("utf-8")).hexdigest()
+        row_groups = []
+        for i in range(md.num_row_groups):
+            rg = md.row_group(i)
+            h = hashlib.sha1(f"{rg.num_rows}|{rg.total_byte_size}".encode("utf-8"))
+            for j in range(rg.num_columns):
+                col = rg.column(j)
+                h.update(f"|{col.path_in_schema}|{col.total_compressed_size}|{col.total_uncompressed_size}".encode("utf-8"))
+                st = col.statistics
+                if st is not None and st.has_min_max:
+                    h.update(f"|{st.min!r}|{st.max!r}|{st.null_count}".encode("utf-8"))
+            row_groups.append(h.hexdigest())
+        return {"schema": schema, "row_groups": row_groups}
+    except Exception:
+        return None
+
+
+# Taille des blocs lus pour l'empreinte de contenu des sources
+_HASH_CHUNK = 1024 * 1024
+
+
+def _file_sha1(path: str) -> str:
+    """Empreinte SHA-1 du contenu d'un fichier (lu par blocs)."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _copy_with_sha1(src: str, dst: str) -> str:
+    """Copie ``src`` vers ``dst`` et retourne l'empreinte SHA-1 du contenu copié (une seule lecture)."""
+    h = hashlib.sha1()
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        for chunk in iter(lambda: fin.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+            fout.write(chunk)
+    return h.hexdigest()
+
+
+def _sync_parquet(src: str, dst: str, previous: dict | None) -> dict:
+    """Copie ``src`` vers ``dst`` sauf si son contenu est inchangé.
+
+    Le footer de la source est comparé à celui enregistré lors de la dernière
+    synchronisation (manifest), à condition que ``dst`` n'ait pas été modifié depuis.
+    Un footer identique n'est qu'un candidat « inchangé » : il est confirmé par
+    l'empreinte SHA-1 du contenu de la source (``source_sha1``, enregistrée à
+    chaque copie). Contenu identique : pas de copie (la source a seulement été
+    « touchée ») ; sinon, ou sans empreinte enregistrée : copie complète.
+    Les row groups ne sont pas repris de ``dst`` : une signature de footer égale
+    ne garantit pas un contenu égal, et vérifier le contenu d'un row group
+    demande de le lire sur la source, soit le coût de la copie.
+    L'écriture passe toujours par un fichier temporaire renommé (``_atomic_write``).
+    Retourne les informations à conserver dans le manifest.
+    """
+    layout = _parquet_layout(src)
+    previous = previous or {}
+    old = previous.get("parquet")
+    dst_intact = bool(old) and previous.get("output") is not None and previous.get("output") == _fingerprint(dst)
+
+    if layout is not None and dst_intact and old == layout and previous.get("source_sha1"):
+        digest = _file_sha1(src)
+        if digest == previous["source_sha1"]:
+            return {"changed": False, "reason": "content_unchanged", "mode": "unchanged",
+                    "parquet": layout, "output": previous["output"], "source_sha1": digest}
+
+    digests: list[str] = []
+    _atomic_write(dst, lambda tmp_path: digests.append(_copy_with_sha1(src, tmp_path)))
+    return {"changed": True, "mode": "full", "parquet": layout, "output": _fingerprint(dst),
+            "source_sha1": digests[0]}
+
+
 def _ensure_app_folder():
     folders_list = os.listdir(path_datan)
     if folder_name_app not in folders_list:
@@ -78,6 +219,73 @@ def _mtime(path: str):
         return None
 
 
+def _fingerprint(path: str | None) -> dict | None:
+    """Empreinte d'un fichier : taille + mtime (None si absent)."""
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime": st.st_mtime}
+
+
+def _manifest_path() -> str:
+    return os.path.join(path_datan, folder_name_app, ETL_MANIFEST_NAME)
+
+
+def _load_manifest() -> dict:
+    try:
+        with open(_manifest_path(), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except Exception:
+        return {}
+
+
+def _save_manifest(manifest: dict) -> None:
+    path = _manifest_path()
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"ETL manifest not saved: {e}")
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except Exception:
+                pass
+
+
+def _inputs_fingerprints(inputs: list[str]) -> dict:
+    return {path: _fingerprint(path) for path in inputs}
+
+
+def _step_needs_update(manifest: dict, it: dict) -> tuple[bool, str]:
+    """Décide si l'étape ``it`` doit s'exécuter ; retourne (à faire, raison).
+
+    - source absente : rien à faire ;
+    - destination absente : à faire ;
+    - étape déjà exécutée (manifest) : à faire seulement si l'empreinte d'une entrée a changé ;
+    - sinon (pas encore de manifest) : ancienne règle, source plus récente que la destination.
+    """
+    if not it.get("src") or it.get("src_mtime") is None:
+        return False, "source_missing"
+    if it.get("dst_mtime") is None:
+        return True, "destination_missing"
+    entry = manifest.get(it["key"])
+    if isinstance(entry, dict) and isinstance(entry.get("inputs"), dict):
+        current = _inputs_fingerprints(it["inputs"])
+        if current != entry["inputs"]:
+            return True, "inputs_changed"
+        return False, "unchanged"
+    if it["src_mtime"] > it["dst_mtime"]:
+        return True, "source_newer"
+    return False, "unchanged"
+
+
 def get_update_status():
     annuaire_dir = os.path.join(path_exit, "GESTION_PR\GESTION_PR\ANNUAIRE_PR")
 
@@ -129,7 +337,7 @@ def get_update_status():
     src_stats_exit = os.path.join(path_exit_parquet, "stats_exit.parquet")
     dst_stats_exit = os.path.join(path_datan, folder_name_app, "stats_exit.parquet")
 
-    src_stock_554 = SRC_STOCK_554_SUPPLYCHAIN_APP
+    src_stock_554 = os.path.join(SRC_STOCK_554_SUPPLYCHAIN_APP, NAME_FILE_554)
     dst_stock_554 = os.path.join(path_datan, folder_name_app, "stock_554.parquet")
 
     src_stock_final = os.path.join(path_exit_parquet, "stock_final.parquet")
@@ -149,6 +357,8 @@ def get_update_status():
     if src_annuaire:
         items.append({
             "key": "pudo_directory",
+            # Dossier source : l'étape lit le fichier le plus récent qu'il contient
+            "src_dir": annuaire_dir,
             "src": src_annuaire,
             "dst": dst_annuaire_parquet,
             "src_mtime": _mtime(src_annuaire),
@@ -249,135 +459,233 @@ def get_update_status():
     if conso_src or conso_dst:
         items.append({
             "key": "conso_offer",
+            "src_dir": conso_src_dir or None,
             "src": conso_src,
             "dst": conso_dst,
             "src_mtime": _mtime(conso_src) if conso_src else None,
             "dst_mtime": _mtime(conso_dst) if conso_dst else None,
         })
 
+    manifest = _load_manifest()
     for it in items:
-        sm = it.get("src_mtime")
-        dm = it.get("dst_mtime")
-        it["needs_update"] = (sm is not None) and (dm is None or sm > dm)
+        # Entrées de l'étape : la source, plus les parquets joints pour stock_554
+        it["inputs"] = [it["src"]] if it.get("src") else []
+        if it["key"] == "stock_554":
+            it["inputs"] += [dst_stores, dst_items]
+        it["needs_update"], it["reason"] = _step_needs_update(manifest, it)
 
     return items
 
-@logger.catch(level="ERROR")
-def update_data():
-    logger.info("Update data")
-    _ensure_app_folder()
+def _copy_step(it: dict, previous: dict | None) -> dict:
+    return _sync_parquet(it["src"], it["dst"], previous)
 
-    global last_update_summary
-    status = get_update_status()
 
-    # 1) Convert latest annuaire Excel to parquet if newer or missing
-    annuaire_info = next((x for x in status if x["key"] == "pudo_directory"), None)
-    if annuaire_info and annuaire_info["src"] and annuaire_info["needs_update"]:
-        src_path = annuaire_info["src"]
-        pudo_directory = read_excel(os.path.dirname(src_path), os.path.basename(src_path))
-        pudo_directory.write_parquet(annuaire_info["dst"])
-
-    # 2) Copy stores parquet if newer or missing
-    stores_info = next((x for x in status if x["key"] == "stores"), None)
-    if stores_info and stores_info["src_mtime"] is not None and stores_info["needs_update"]:
-        shutil.copy(stores_info["src"], stores_info["dst"])
-
-    # 3) Copy helios parquet if newer or missing
-    helios_info = next((x for x in status if x["key"] == "helios"), None)
-    if helios_info and helios_info["src_mtime"] is not None and helios_info["needs_update"]:
-        shutil.copy(helios_info["src"], helios_info["dst"])
-
-    # 4) Copy items parquet if newer or missing
-    items_info = next((x for x in status if x["key"] == "items"), None)
-    if items_info and items_info["src_mtime"] is not None and items_info["needs_update"]:
-        shutil.copy(items_info["src"], items_info["dst"])
-
-    # 5) Copy items_parent_buildings parquet if newer or missing
-    items_parent_buildings_info = next((x for x in status if x["key"] == "items_parent_buildings"), None)
-    if items_parent_buildings_info and items_parent_buildings_info["src_mtime"] is not None and items_parent_buildings_info["needs_update"]:
-        shutil.copy(items_parent_buildings_info["src"], items_parent_buildings_info["dst"])
-
-    items_wo_exit_info = next((x for x in status if x["key"] == "items_without_exit_final"), None)
-    if items_wo_exit_info and items_wo_exit_info["src_mtime"] is not None and items_wo_exit_info["needs_update"]:
-        shutil.copy(items_wo_exit_info["src"], items_wo_exit_info["dst"])
-
-    nomenclatures_info = next((x for x in status if x["key"] == "nomenclatures"), None)
-    if nomenclatures_info and nomenclatures_info["src_mtime"] is not None and nomenclatures_info["needs_update"]:
-        shutil.copy(nomenclatures_info["src"], nomenclatures_info["dst"])
-    
-    manufacturers_info = next((x for x in status if x["key"] == "manufacturers"), None)
-    if manufacturers_info and manufacturers_info["src_mtime"] is not None and manufacturers_info["needs_update"]:
-        shutil.copy(manufacturers_info["src"], manufacturers_info["dst"])
-    
-    equivalents_info = next((x for x in status if x["key"] == "equivalents"), None)
-    if equivalents_info and equivalents_info["src_mtime"] is not None and equivalents_info["needs_update"]:
-        shutil.copy(equivalents_info["src"], equivalents_info["dst"])
+def _convert_annuaire_step(it: dict, previous: dict | None) -> None:
+    """Convertit le dernier annuaire PR Excel en parquet."""
+    src_path = it["src"]
+    pudo_directory = read_excel(os.path.dirname(src_path), os.path.basename(src_path))
+    _atomic_write_parquet(pudo_directory, it["dst"])
+
 
-    minmax_info = next((x for x in status if x["key"] == "minmax"), None)
-    if minmax_info and minmax_info["src_mtime"] is not None and minmax_info["needs_update"]:
-        shutil.copy(minmax_info["src"], minmax_info["dst"])
+def _build_stock_554_step(it: dict, previous: dict | None) -> None:
+    """554 Excel enrichi avec stores et items (parquets copiés par leurs étapes)."""
+    stock_554_df = read_excel(SRC_STOCK_554_SUPPLYCHAIN_APP, NAME_FILE_554)
 
-    stats_exit_info = next((x for x in status if x["key"] == "stats_exit"), None)
-    if stats_exit_info and stats_exit_info["src_mtime"] is not None and stats_exit_info["needs_update"]:
-        shutil.copy(stats_exit_info["src"], stats_exit_info["dst"])
+    stores_df = pl.read_parquet(os.path.join(path_datan, folder_name_app, "stores.parquet"))
+    items_df = pl.read_parquet(os.path.join(path_datan, folder_name_app, "items.parquet"))
 
-    stock_554_info = next((x for x in status if x["key"] == "stock_554"), None)
-    if stock_554_info:
-        stock_554_df = read_excel(SRC_STOCK_554_SUPPLYCHAIN_APP, NAME_FILE_554)
+    stock_554_df = stock_554_df.join(
+        stores_df.select(pl.col("code_magasin", "libelle_magasin", "type_de_depot")),
+        how="left",
+        on="code_magasin",
+    )
+
+    stock_554_df = stock_554_df.join(
+        items_df.select(pl.col("code_article", "libelle_court_article")),
+        how="left",
+        on="code_article",
+    )
+    
+    stock_554_df = stock_554_df.select(pl.col("code_magasin", "libelle_magasin", "type_de_depot", "emplacement", "flag_stock_d_m", "code_article", "libelle_court_article", "code_qualite", "qte_stock"))
 
-        stores_df = pl.read_parquet(os.path.join(path_datan, folder_name_app, "stores.parquet"))
-        items_df = pl.read_parquet(os.path.join(path_datan, folder_name_app, "items.parquet"))
+    _write_sorted_parquet(stock_554_df, it["dst"])
 
-        stock_554_df = stock_554_df.join(
-            stores_df.select(pl.col("code_magasin", "libelle_magasin", "type_de_depot")),
-            how="left",
-            on="code_magasin",
-        )
 
-        stock_554_df = stock_554_df.join(
-            items_df.select(pl.col("code_article", "libelle_court_article")),
-            how="left",
-            on="code_article",
-        )
-        
-        stock_554_df = stock_554_df.select(pl.col("code_magasin", "libelle_magasin", "type_de_depot", "emplacement", "flag_stock_d_m", "code_article", "libelle_court_article", "code_qualite", "qte_stock"))
+def _stock_final_step(it: dict, previous: dict | None) -> dict:
+    """stock_final trié par code_article.
+
+    Source déjà triée (row groups sans chevauchement) : synchronisée telle quelle
+    (``_sync_parquet``). Sinon le fichier est relu et réécrit trié ; le
+    manifest garde la signature de la source (footer + empreinte SHA-1 du
+    contenu) pour ne pas le refaire tant qu'elle ne change pas.
+    """
+    src, dst = it["src"], it["dst"]
+    previous = previous or {}
+    old = previous.get("parquet") or {}
+    if _row_groups_ordered_by(src, STOCK_SORT_COLUMN):
+        # Une destination réécrite (triée) n'est pas une copie de la source : pas de saut possible
+        return _sync_parquet(src, dst, None if old.get("sorted_by") else previous)
+
+    layout = _parquet_layout(src)
+    signature = dict(layout, sorted_by=STOCK_SORT_COLUMN) if layout is not None else None
+    dst_intact = previous.get("output") is not None and previous.get("output") == _fingerprint(dst)
+    with open(src, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()
+    if signature is not None and dst_intact and old == signature and previous.get("source_sha1") == digest:
+        return {"changed": False, "reason": "content_unchanged", "mode": "unchanged",
+                "parquet": signature, "output": previous["output"], "source_sha1": digest}
+    _write_sorted_parquet(pl.read_parquet(io.BytesIO(raw)), dst)
+    return {"changed": True, "mode": "sorted", "parquet": signature, "output": _fingerprint(dst),
+            "source_sha1": digest}
+
+
+def _convert_conso_offer_step(it: dict, previous: dict | None) -> None:
+    src_path = str(it["src"])
+    df_offer = read_excel(os.path.dirname(src_path), os.path.basename(src_path))
+    _atomic_write_parquet(df_offer, str(it["dst"]))
+
+
+# Action de chaque étape (par défaut : synchronisation du parquet source).
+# Une action reçoit l'étape et son entrée précédente du manifest ; elle peut
+# retourner des informations à y conserver (voir _sync_parquet).
+_STEP_ACTIONS = {
+    "pudo_directory": _convert_annuaire_step,
+    "stock_554": _build_stock_554_step,
+    "stock_final": _stock_final_step,
+    "conso_offer": _convert_conso_offer_step,
+}
+
+def _with_dependents(tasks: list[Task], keys: set[str]) -> set[str]:
+    """``keys`` et toutes les étapes qui en dépendent, directement ou non."""
+    deps = task_dependencies(tasks)
+    selected = set(keys)
+    changed = True
+    while changed:
+        changed = False
+        for key, d in deps.items():
+            if key not in selected and d & selected:
+                selected.add(key)
+                changed = True
+    return selected
+
+
+# Nombre d'étapes exécutées en parallèle (copies depuis le partage réseau, conversions Excel)
+ETL_MAX_WORKERS = 4
 
-        stock_554_df.write_parquet(stock_554_info["dst"])
 
-    stock_final_info = next((x for x in status if x["key"] == "stock_final"), None)
-    if stock_final_info and stock_final_info["src_mtime"] is not None and stock_final_info["needs_update"]:
-        shutil.copy(stock_final_info["src"], stock_final_info["dst"])
+@logger.catch(level="ERROR")
+def update_data(steps: set[str] | None = None):
+    """Met à jour les parquets de travail.
 
-    distance_tech_pr_info = next((x for x in status if x["key"] == "distance_tech_pr"), None)
-    if distance_tech_pr_info and distance_tech_pr_info["src_mtime"] is not None and distance_tech_pr_info["needs_update"]:
-        shutil.copy(distance_tech_pr_info["src"], distance_tech_pr_info["dst"])
+    Chaque étape est une tâche avec ses entrées et sa sortie déclarées ; une
+    étape qui lit la sortie d'une autre (stock_554 lit stores et items) attend
+    celle-ci, les autres s'exécutent en parallèle (``ETL_MAX_WORKERS``).
+    Une étape ne s'exécute que si une de ses entrées a changé (manifest).
 
-    conso_info = next((x for x in status if x["key"] == "conso_offer"), None)
-    if conso_info and conso_info.get("src") and conso_info.get("dst") and conso_info.get("needs_update"):
-        try:
-            src_path = str(conso_info["src"])
-            df_offer = read_excel(os.path.dirname(src_path), os.path.basename(src_path))
-            _atomic_write_parquet(df_offer, str(conso_info["dst"]))
-        except Exception:
-            raise
+    ``steps`` limite la mise à jour à ces étapes et à celles qui en dépendent
+    (ex. une modification de stores relance aussi stock_554).
+    """
+    logger.info("Update data")
+    _ensure_app_folder()
+
+    global last_update_summary
+    started = time.perf_counter()
+    status = get_update_status()
+    manifest = _load_manifest()
+    lock = threading.Lock()
+
+    def _step(it: dict, action) -> tuple[bool, str, str | None]:
+        """Exécute l'étape si une de ses entrées a changé, puis enregistre leurs empreintes.
+
+        Les fichiers sont réexaminés au moment de l'étape : stock_554 voit ainsi
+        les copies de stores / items faites dans le même cycle. Retourne
+        ``(exécutée, raison, mode de transfert)``.
+        """
+        it = dict(it, src_mtime=_mtime(it["src"]) if it.get("src") else None, dst_mtime=_mtime(it["dst"]))
+        with lock:
+            needed, reason = _step_needs_update(manifest, it)
+            previous = manifest.get(it["key"])
+        if not needed:
+            return False, reason, None
+        # Empreintes prises avant l'étape : une source modifiée pendant la copie sera reprise au cycle suivant
+        inputs = _inputs_fingerprints(it["inputs"])
+        extra = action(it, previous) or {}
+        with lock:
+            entry = {"inputs": inputs, "timestamp": time.time()}
+            entry.update({k: extra[k] for k in ("parquet", "output", "source_sha1") if k in extra})
+            manifest[it["key"]] = entry
+            _save_manifest(manifest)
+        return extra.get("changed", True), extra.get("reason", reason), extra.get("mode")
+
+    tasks = [
+        Task(
+            key=it["key"],
+            action=partial(_step, it, _STEP_ACTIONS.get(it["key"], _copy_step)),
+            inputs=tuple(it["inputs"]),
+            outputs=(it["dst"],),
+        )
+        for it in status
+        if it.get("dst")
+    ]
+    if steps is not None:
+        tasks = [t for t in tasks if t.key in _with_dependents(tasks, set(steps))]
+    results = run_task_graph(tasks, max_workers=ETL_MAX_WORKERS)
+
+    ran: list[str] = []
+    skipped: list[dict] = []
+    errors: list[dict] = []
+    durations: dict[str, float] = {}
+    transfers: dict[str, str] = {}
+    for task in tasks:
+        res = results[task.key]
+        durations[task.key] = round(res.seconds, 3)
+        if res.status == "ok":
+            done, reason, mode = res.result
+            if mode:
+                transfers[task.key] = mode
+            if done:
+                ran.append(task.key)
+            else:
+                skipped.append({"key": task.key, "reason": reason})
+        elif res.status == "blocked":
+            skipped.append({"key": task.key, "reason": "blocked", "blocked_by": list(res.blocked_by)})
+        else:
+            errors.append({"key": task.key, "error": res.error})
+            logger.error(f"ETL step {task.key} failed: {res.error}")
 
     # Recompute after updates to report final state
     status_after = get_update_status()
-    logger.info("Data updated successfully")
+    duration_s = round(time.perf_counter() - started, 3)
+    logger.info(f"Data updated in {duration_s}s (ran: {ran or 'none'}, skipped: {len(skipped)}, errors: {len(errors)})")
 
-    has_changes = any(it.get("needs_update") for it in status)
     last_update_summary = {
-        "has_changes": bool(has_changes),
+        "has_changes": bool(ran),
         "timestamp": time.time(),
+        "ran": ran,
+        "skipped": skipped,
+        "errors": errors,
+        "durations": durations,
+        "transfers": transfers,
+        "duration_s": duration_s,
     }
 
-    return {"before": status, "after": status_after}
+    return {
+        "before": status,
+        "after": status_after,
+        "ran": ran,
+        "skipped": skipped,
+        "errors": errors,
+        "durations": durations,
+        "transfers": transfers,
+        "duration_s": duration_s,
+    }
 
 
 def get_last_update_summary() -> dict:
     global last_update_summary
     if last_update_summary is None:
-        return {"has_changes": False, "timestamp": None}
+        return {"has_changes": False, "timestamp": None, "ran": [], "skipped": [], "errors": [], "durations": {}, "transfers": {}, "duration_s": None}
     return last_update_summary
 
 
@@ -387,15 +695,10 @@ def get_stock_summary(code_article: str) -> pl.DataFrame:
     à partir du parquet stock_554.parquet enrichi.
     """
     stock_parquet = os.path.join(path_datan, folder_name_app, "stock_554.parquet")
-
-    if not os.path.exists(stock_parquet):
-        raise FileNotFoundError(stock_parquet)
-
-    stock = pl.read_parquet(stock_parquet)
+    stock = rows_for_keys("stock_554", "code_article", [code_article], stock_parquet)
 
     stock_filtered = (
         stock
-        .filter(pl.col("code_article") == code_article)
         .pivot(
             index=["type_de_depot", "flag_stock_d_m"],
             on="code_qualite",
@@ -416,15 +719,10 @@ def get_stock_details(code_article: str) -> pl.DataFrame:
         flag_stock_d_m, code_qualite, qte_stock
     """
     stock_parquet = os.path.join(path_datan, folder_name_app, "stock_554.parquet")
-
-    if not os.path.exists(stock_parquet):
-        raise FileNotFoundError(stock_parquet)
-
-    stock = pl.read_parquet(stock_parquet)
+    stock = rows_for_keys("stock_554", "code_article", [code_article], stock_parquet)
 
     stock_filtered = (
         stock
-        .filter(pl.col("code_article") == code_article)
         .select(
             pl.col(
                 "code_magasin",
@@ -454,15 +752,11 @@ def get_stock_final_details(code_article: str) -> pl.DataFrame:
         bu, date_stock
     """
     stock_parquet = os.path.join(path_datan, folder_name_app, "stock_final.parquet")
-
-    if not os.path.exists(stock_parquet):
-        raise FileNotFoundError(stock_parquet)
-
-    stock = pl.read_parquet(stock_parquet)
+    # Table non résidente : seuls les row groups pouvant contenir l'article sont lus
+    stock = rows_for_keys("stock_final", "code_article", [code_article], stock_parquet)
 
     stock_filtered = (
         stock
-        .filter(pl.col("code_article") == code_article)
         .filter(pl.col("qte_stock") > 0)
         .select(
             pl.col(
@@ -1,186 +1,48 @@
-import os
-import threading
-from math import radians, sin, cos, sqrt, atan2
 import polars as pl
 from supplychain_app.data.pudo_etl import update_data
-
-from supplychain_app.constants import path_datan, folder_name_app
-
-_reload_lock = threading.Lock()
-_data_mtimes: dict[str, float | None] = {}
-
-
-def _parquet_path(name: str) -> str:
-    return os.path.join(path_datan, folder_name_app, f"{name}.parquet")
-
-
-def _safe_mtime(path: str) -> float | None:
-    try:
-        return float(os.path.getmtime(path))
-    except OSError:
-        return None
+from supplychain_app.data.data_store import KEY_COLUMNS, current_snapshot, get_data_store
+from supplychain_app.core.geo import haversine_expr
+from supplychain_app.core.spatial import nearest_search, radius_search
+from supplychain_app.core.text_index import take_rows
+from supplychain_app.core.text_norm import norm_text, norm_text_expr
+
+# Tables indispensables au démarrage : si l'une manque, on lance l'ETL une fois.
+_REQUIRED_TABLES = [
+    "pudos",
+    "stores",
+    "helios",
+    "items",
+    "items_parent_buildings",
+    "nomenclatures",
+    "manufacturers",
+    "equivalents",
+    "stock_554",
+]
 
 
 def reload_data(force: bool = False) -> bool:
-    global pudos, stores, helios, items, items_parent_buildings, nomenclatures
-    global manufacturers, equivalents, stock_554, items_son_buildings
-    global dico_stores, dico_helios
-    global _data_mtimes
-
-    with _reload_lock:
-        mtimes = {
-            "pudo_directory": _safe_mtime(_parquet_path("pudo_directory")),
-            "stores": _safe_mtime(_parquet_path("stores")),
-            "helios": _safe_mtime(_parquet_path("helios")),
-            "items": _safe_mtime(_parquet_path("items")),
-            "items_parent_buildings": _safe_mtime(_parquet_path("items_parent_buildings")),
-            "nomenclatures": _safe_mtime(_parquet_path("nomenclatures")),
-            "manufacturers": _safe_mtime(_parquet_path("manufacturers")),
-            "equivalents": _safe_mtime(_parquet_path("equivalents")),
-            "stock_554": _safe_mtime(_parquet_path("stock_554")),
-            "items_son_buildings": _safe_mtime(_parquet_path("items_son_buildings")),
-        }
+    """Recharge le DataStore partagé (voir supplychain_app.data.data_store)."""
+    return get_data_store().reload(force=force)
 
-        if (not force) and _data_mtimes and mtimes == _data_mtimes:
-            return False
 
-        def _read_or_empty(p: str) -> pl.DataFrame:
-            try:
-                return pl.read_parquet(p)
-            except Exception:
-                return pl.DataFrame()
-
-        pudos = _read_or_empty(_parquet_path("pudo_directory"))
-        stores = _read_or_empty(_parquet_path("stores"))
-        helios = _read_or_empty(_parquet_path("helios"))
-        items = _read_or_empty(_parquet_path("items"))
-        items_parent_buildings = _read_or_empty(_parquet_path("items_parent_buildings"))
-        nomenclatures = _read_or_empty(_parquet_path("nomenclatures"))
-        manufacturers = _read_or_empty(_parquet_path("manufacturers"))
-        equivalents = _read_or_empty(_parquet_path("equivalents"))
-        stock_554 = _read_or_empty(_parquet_path("stock_554"))
-        items_son_buildings = _read_or_empty(_parquet_path("items_son_buildings"))
-
-        dico_stores = (
-            {row["code_magasin"]: row for row in stores.iter_rows(named=True)}
-            if (not stores.is_empty()) and ("code_magasin" in stores.columns)
-            else {}
-        )
-        dico_helios = (
-            {row["code_ig"]: row for row in helios.iter_rows(named=True)}
-            if (not helios.is_empty()) and ("code_ig" in helios.columns)
-            else {}
-        )
-
-        _data_mtimes = mtimes
-        return True
-
-
-try:
-    pudos = pl.read_parquet(os.path.join(path_datan, folder_name_app, "pudo_directory.parquet"))
-    stores = pl.read_parquet(os.path.join(path_datan, folder_name_app, "stores.parquet"))
-    helios = pl.read_parquet(os.path.join(path_datan, folder_name_app, "helios.parquet"))
-    items = pl.read_parquet(os.path.join(path_datan, folder_name_app, "items.parquet"))
-    items_parent_buildings = pl.read_parquet(os.path.join(path_datan, folder_name_app, "items_parent_buildings.parquet"))
-    nomenclatures = pl.read_parquet(os.path.join(path_datan, folder_name_app, "nomenclatures.parquet"))
-    manufacturers = pl.read_parquet(os.path.join(path_datan, folder_name_app, "manufacturers.parquet"))
-    equivalents = pl.read_parquet(os.path.join(path_datan, folder_name_app, "equivalents.parquet"))
-    stock_554 = pl.read_parquet(os.path.join(path_datan, folder_name_app, "stock_554.parquet"))
-    try:
-        items_son_buildings = pl.read_parquet(os.path.join(path_datan, folder_name_app, "items_son_buildings.parquet"))
-    except FileNotFoundError:
-        items_son_buildings = pl.DataFrame()
-except FileNotFoundError:
+_store = get_data_store()
+if _store.missing_tables(_REQUIRED_TABLES):
     update_data()
-    try:
-        pudos = pl.read_parquet(os.path.join(path_datan, folder_name_app, "pudo_directory.parquet"))
-    except FileNotFoundError:
-        pudos = pl.DataFrame()
-    try:
-        stores = pl.read_parquet(os.path.join(path_datan, folder_name_app, "stores.parquet"))
-    except FileNotFoundError:
-        stores = pl.DataFrame()
-    try:
-        helios = pl.read_parquet(os.path.join(path_datan, folder_name_app, "helios.parquet"))
-    except FileNotFoundError:
-        helios = pl.DataFrame()
-    try:
-        items = pl.read_parquet(os.path.join(path_datan, folder_name_app, "items.parquet"))
-    except FileNotFoundError:
-        items = pl.DataFrame()
-    try:
-        items_parent_buildings = pl.read_parquet(os.path.join(path_datan, folder_name_app, "items_parent_buildings.parquet"))
-    except FileNotFoundError:
-        items_parent_buildings = pl.DataFrame()
-    try:
-        nomenclatures = pl.read_parquet(os.path.join(path_datan, folder_name_app, "nomenclatures.parquet"))
-    except FileNotFoundError:
-        nomenclatures = pl.DataFrame()
-    try:
-        manufacturers = pl.read_parquet(os.path.join(path_datan, folder_name_app, "manufacturers.parquet"))
-    except FileNotFoundError:
-        manufacturers = pl.DataFrame()
-    try:
-        equivalents = pl.read_parquet(os.path.join(path_datan, folder_name_app, "equivalents.parquet"))
-    except FileNotFoundError:
-        equivalents = pl.DataFrame()
-    try:
-        stock_554 = pl.read_parquet(os.path.join(path_datan, folder_name_app, "stock_554.parquet"))
-    except FileNotFoundError:
-        stock_554 = pl.DataFrame()
-
-    # items_son_buildings.parquet est optionnel (pas bloquant pour démarrer l'API)
-    try:
-        items_son_buildings = pl.read_parquet(os.path.join(path_datan, folder_name_app, "items_son_buildings.parquet"))
-    except FileNotFoundError:
-        items_son_buildings = pl.DataFrame()
-
-# Dictionnaires utiles (magasins/helios)
-dico_stores = {row["code_magasin"]: row for row in stores.iter_rows(named=True)} if 'stores' in locals() else {}
-dico_helios = {row["code_ig"]: row for row in helios.iter_rows(named=True)} if 'helios' in locals() else {}
-
-# Snapshot mtimes initial (les DF ont été chargés ci-dessus)
-_data_mtimes = {
-    "pudo_directory": _safe_mtime(_parquet_path("pudo_directory")),
-    "stores": _safe_mtime(_parquet_path("stores")),
-    "helios": _safe_mtime(_parquet_path("helios")),
-    "items": _safe_mtime(_parquet_path("items")),
-    "items_parent_buildings": _safe_mtime(_parquet_path("items_parent_buildings")),
-    "nomenclatures": _safe_mtime(_parquet_path("nomenclatures")),
-    "manufacturers": _safe_mtime(_parquet_path("manufacturers")),
-    "equivalents": _safe_mtime(_parquet_path("equivalents")),
-    "stock_554": _safe_mtime(_parquet_path("stock_554")),
-    "items_son_buildings": _safe_mtime(_parquet_path("items_son_buildings")),
-}
-
-
-def haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371.0
-    lat1 = radians(lat1)
-    lon1 = radians(lon1)
-    lat2 = radians(lat2)
-    lon2 = radians(lon2)
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
+    # items_son_buildings.parquet reste optionnel (pas bloquant pour démarrer l'API)
+    _store.reload(force=True)
 
 
 def get_pudo_coords(code_pr: str) -> dict | None:
     """Retourne les coordonnées latitude/longitude pour un code point relais.
 
-    Les données proviennent de pudo_directory.parquet chargé dans le DataFrame global `pudos`.
+    Les données proviennent de pudo_directory.parquet chargé dans le DataStore (table `pudos`).
     """
     if not code_pr:
         return None
-    if "pudos" not in globals() or pudos.is_empty():
-        return None
     try:
-        df = pudos.filter(pl.col("code_point_relais") == code_pr)
-        if df.is_empty():
+        row = current_snapshot().row_by_key("pudos", code_pr)
+        if row is None:
             return None
-        row = df.row(0, named=True)
 
         def pick(keys: list[str]):
             for k in keys:
@@ -217,9 +79,7 @@ def get_items_son_buildings_df() -> pl.DataFrame:
     Ce parquet est chargé depuis path_datan/folder_name_app/items_son_buildings.parquet
     et pourra être utilisé notamment pour le Parc Helios par article.
     """
-    if 'items_son_buildings' not in globals():
-        return pl.DataFrame()
-    return items_son_buildings
+    return current_snapshot().items_son_buildings
 
 
 def get_items_parent_buildings_df() -> pl.DataFrame:
@@ -229,9 +89,23 @@ def get_items_parent_buildings_df() -> pl.DataFrame:
     et est utilisé pour calculer la quantité en production et le nombre de sites actifs
     pour un article donné.
     """
-    if 'items_parent_buildings' not in globals():
-        return pl.DataFrame()
-    return items_parent_buildings
+    return current_snapshot().items_parent_buildings
+
+
+def _with_store_distances(df: pl.DataFrame, targets: dict[str, tuple]) -> pl.DataFrame:
+    """Ajoute, pour chaque point cible {colonne: (lat, lon)}, la distance (km) depuis
+    latitude_right/longitude_right. Les cibles sans coordonnées donnent une colonne nulle.
+    """
+    exprs = []
+    for alias, (lat, lon) in targets.items():
+        expr = pl.lit(None, dtype=pl.Float64)
+        if lat is not None and lon is not None and {"latitude_right", "longitude_right"}.issubset(df.columns):
+            try:
+                expr = haversine_expr(float(lat), float(lon), "latitude_right", "longitude_right")
+            except (TypeError, ValueError):
+                pass
+        exprs.append(expr.alias(alias))
+    return df.with_columns(exprs) if exprs else df
 
 
 def get_stock_map_for_item(
@@ -256,9 +130,12 @@ def get_stock_map_for_item(
     """
     rows: list[dict] = []
     try:
-        if 'stock_554' not in globals() or stock_554.is_empty():
+        snap = current_snapshot()
+        stock_554 = snap.stock_554
+        stores = snap.stores
+        if stock_554.is_empty():
             return rows
-        if 'stores' not in globals() or stores.is_empty():
+        if stores.is_empty():
             return rows
 
         norm = (code_article or "").strip().upper()
@@ -354,6 +231,13 @@ def get_stock_map_for_item(
                 pr_hn_lat = info_hn.get("latitude")
                 pr_hn_lon = info_hn.get("longitude")
 
+        # Distances calculées en une passe vectorisée sur toutes les lignes
+        joined = _with_store_distances(joined, {
+            "__distance_km": (ref_lat, ref_lon),
+            "__distance_pr_principal_km": (pr_principal_lat, pr_principal_lon),
+            "__distance_pr_hn_km": (pr_hn_lat, pr_hn_lon),
+        })
+
         out_rows: list[dict] = []
         for r in joined.iter_rows(named=True):
             adr1 = _pick(r, ["adresse_1", "adresse1"]) or ""
@@ -384,27 +268,14 @@ def get_stock_map_for_item(
             }
 
             if ref_lat is not None and ref_lon is not None and lat is not None and lon is not None:
-                try:
-                    d = haversine_distance(float(ref_lat), float(ref_lon), float(lat), float(lon))
-                    row_dict["distance_km"] = float(d)
-                except Exception:
-                    row_dict["distance_km"] = None
+                row_dict["distance_km"] = r.get("__distance_km")
 
             # Distances magasin ↔ PR principal / hors normes si disponibles
             if lat is not None and lon is not None:
-                try:
-                    if pr_principal_lat is not None and pr_principal_lon is not None:
-                        d_pr = haversine_distance(float(lat), float(lon), float(pr_principal_lat), float(pr_principal_lon))
-                        row_dict["distance_pr_principal_km"] = float(d_pr)
-                except Exception:
-                    row_dict["distance_pr_principal_km"] = None
-
-                try:
-                    if pr_hn_lat is not None and pr_hn_lon is not None:
-                        d_hn = haversine_distance(float(lat), float(lon), float(pr_hn_lat), float(pr_hn_lon))
-                        row_dict["distance_pr_hors_normes_km"] = float(d_hn)
-                except Exception:
-                    row_dict["distance_pr_hors_normes_km"] = None
+                if pr_principal_lat is not None and pr_principal_lon is not None:
+                    row_dict["distance_pr_principal_km"] = r.get("__distance_pr_principal_km")
+                if pr_hn_lat is not None and pr_hn_lon is not None:
+                    row_dict["distance_pr_hors_normes_km"] = r.get("__distance_pr_hn_km")
 
             out_rows.append(row_dict)
 
@@ -434,8 +305,11 @@ def get_stock_map_for_all_stores_by_type(
     """
     rows: list[dict] = []
     try:
+        snap = current_snapshot()
+        stores = snap.stores
+        stock_554 = snap.stock_554
         # Il faut au minimum le référentiel magasins
-        if "stores" not in globals() or stores.is_empty():
+        if stores.is_empty():
             return rows
 
         # Point de départ : tous les magasins (stores)
@@ -461,7 +335,7 @@ def get_stock_map_for_all_stores_by_type(
 
         # Préparer l'agrégat de stock par magasin / type_de_depot si stock_554 est disponible
         stock_agg = None
-        if "stock_554" in globals() and not stock_554.is_empty():
+        if not stock_554.is_empty():
             df_stock = stock_554
             required_cols = {"code_magasin", "type_de_depot", "qte_stock"}
             if required_cols.issubset(df_stock.columns):
@@ -509,6 +383,8 @@ def get_stock_map_for_all_stores_by_type(
                     return v
             return None
 
+        joined = _with_store_distances(joined, {"__distance_km": (ref_lat, ref_lon)})
+
         out_rows: list[dict] = []
         for r in joined.iter_rows(named=True):
             adr1 = _pick(r, ["adresse_1", "adresse1"]) or ""
@@ -537,11 +413,7 @@ def get_stock_map_for_all_stores_by_type(
             }
 
             if ref_lat is not None and ref_lon is not None and lat is not None and lon is not None:
-                try:
-                    d = haversine_distance(float(ref_lat), float(ref_lon), float(lat), float(lon))
-                    row_dict["distance_km"] = float(d)
-                except Exception:
-                    row_dict["distance_km"] = None
+                row_dict["distance_km"] = r.get("__distance_km")
 
             out_rows.append(row_dict)
 
@@ -564,9 +436,9 @@ def get_helios_quantity_for_item(code_article: str) -> float:
     - Cherche une colonne de quantité (nom contenant 'quant' ou 'qte') et en fait la somme.
     - Si aucune ligne ou aucune quantité trouvée, retourne 0.0.
     """
-    if 'items_son_buildings' not in globals() or items_son_buildings.is_empty():
+    df = current_snapshot().items_son_buildings
+    if df.is_empty():
         return 0.0
-    df = items_son_buildings
     if "code_article" not in df.columns:
         return 0.0
     try:
@@ -609,6 +481,7 @@ def get_helios_production_summary_for_item(code_article: str) -> dict:
         "active_sites": 0,
     }
     try:
+        items_parent_buildings = current_snapshot().items_parent_buildings
         required_cols = {"code_article_fils", "quantite_fils_actif", "code_ig"}
         if not required_cols.issubset(items_parent_buildings.columns):
             return result
@@ -655,9 +528,12 @@ def get_helios_active_sites_for_item(code_article: str) -> list[dict]:
         norm = (code_article or "").strip().upper()
         if not norm:
             return out
-        if 'items_parent_buildings' not in globals() or items_parent_buildings.is_empty():
+        snap = current_snapshot()
+        items_parent_buildings = snap.items_parent_buildings
+        helios = snap.helios
+        if items_parent_buildings.is_empty():
             return out
-        if 'helios' not in globals() or helios.is_empty():
+        if helios.is_empty():
             return out
 
         required_cols = {"code_article_fils", "quantite_fils_actif", "code_ig"}
@@ -693,6 +569,80 @@ def get_helios_active_sites_for_item(code_article: str) -> list[dict]:
         return out
 
 
+# items_parent_buildings : colonnes candidates pour l'article parent et sa quantité active
+# (le nom varie selon les versions du parquet)
+PARENT_BUILDING_COLS = [
+    "code_article_pere",
+    "code_article_parent",
+    "code_article_mere",
+    "code_article_p",
+    "code_article_pere_fils",
+    "code_article_parent_building",
+    "code_article_pere_building",
+    "code_article",
+    "code_parent",
+    "article_parent",
+    "parent",
+]
+PARENT_BUILDING_QTY_COLS = [
+    "quantite_pere_actif",
+    "quantite_article_pere_actif",
+    "quantite_parent_actif",
+    "quantite_article_parent_actif",
+]
+
+
+def get_helios_installed_parents(codes: list[str]) -> pl.DataFrame:
+    """Parc installé (Helios) des articles parents donnés, à partir de items_parent_buildings.
+
+    Une ligne par code présent au parc actif :
+      - code_article
+      - quantity_active: somme de la quantité parent active (une fois par site)
+      - active_sites: nombre de codes IG uniques où le parent est actif
+
+    Retourne un DataFrame vide (mêmes colonnes) si la table ou ses colonnes manquent.
+    """
+    empty = pl.DataFrame(schema={
+        "code_article": pl.Utf8,
+        "quantity_active": pl.Float64,
+        "active_sites": pl.UInt32,
+    })
+    try:
+        wanted = [c for c in {norm_text(c) for c in codes or []} if c]
+        if not wanted:
+            return empty
+        items_parent_buildings = current_snapshot().items_parent_buildings
+        if items_parent_buildings.is_empty() or "code_ig" not in items_parent_buildings.columns:
+            return empty
+        parent_col = next((c for c in PARENT_BUILDING_COLS if c in items_parent_buildings.columns), None)
+        qty_parent_col = next((c for c in PARENT_BUILDING_QTY_COLS if c in items_parent_buildings.columns), None)
+        if not parent_col or not qty_parent_col:
+            return empty
+
+        # Une ligne par (site, parent, fils) : la quantité parent est répétée pour
+        # chaque fils, on la garde donc une seule fois par (site, parent).
+        return (
+            items_parent_buildings.lazy()
+            .select(
+                pl.col("code_ig"),
+                # Même normalisation que les codes demandés (norm_text)
+                norm_text_expr(parent_col).alias("code_article"),
+                pl.col(qty_parent_col).cast(pl.Float64, strict=False).alias("quantity_active"),
+            )
+            .filter(pl.col("code_article").is_in(wanted) & (pl.col("quantity_active") > 0))
+            .group_by("code_ig", "code_article")
+            .agg(pl.col("quantity_active").max())
+            .group_by("code_article")
+            .agg(
+                pl.col("quantity_active").sum(),
+                pl.col("code_ig").n_unique().alias("active_sites"),
+            )
+            .collect()
+        )
+    except Exception:
+        return empty
+
+
 def get_helios_parent_child_items_for_site(code_ig: str) -> dict:
     """Retourne le parc Helios d'un site (code IG) sous forme hiérarchique parent -> fils.
 
@@ -715,7 +665,11 @@ def get_helios_parent_child_items_for_site(code_ig: str) -> dict:
         norm = (code_ig or "").strip().upper()
         if not norm:
             return result
-        if 'items_parent_buildings' not in globals() or items_parent_buildings.is_empty():
+        snap = current_snapshot()
+        items_parent_buildings = snap.items_parent_buildings
+        items = snap.items
+        helios = snap.helios
+        if items_parent_buildings.is_empty():
             return result
 
         base_required = {"code_article_fils", "quantite_fils_actif", "code_ig"}
@@ -723,28 +677,8 @@ def get_helios_parent_child_items_for_site(code_ig: str) -> dict:
             return result
 
         # Colonne parent attendue (on garde une détection par sécurité)
-        parent_candidate_cols = [
-            "code_article_pere",
-            "code_article_parent",
-            "code_article_mere",
-            "code_article_p",
-            "code_article_pere_fils",
-            "code_article_parent_building",
-            "code_article_pere_building",
-            "code_article",
-            "code_parent",
-            "article_parent",
-            "parent",
-        ]
-        parent_col = next((c for c in parent_candidate_cols if c in items_parent_buildings.columns), None)
-
-        qty_parent_candidate_cols = [
-            "quantite_pere_actif",
-            "quantite_article_pere_actif",
-            "quantite_parent_actif",
-            "quantite_article_parent_actif",
-        ]
-        qty_parent_col = next((c for c in qty_parent_candidate_cols if c in items_parent_buildings.columns), None)
+        parent_col = next((c for c in PARENT_BUILDING_COLS if c in items_parent_buildings.columns), None)
+        qty_parent_col = next((c for c in PARENT_BUILDING_QTY_COLS if c in items_parent_buildings.columns), None)
 
         if not parent_col or not qty_parent_col:
             # Sans quantité père active, on ne peut pas appliquer les règles demandées.
@@ -754,7 +688,7 @@ def get_helios_parent_child_items_for_site(code_ig: str) -> dict:
 
         label_map: dict[str, str] = {}
         try:
-            if 'items' in globals() and items is not None and (not items.is_empty()):
+            if not items.is_empty():
                 if {"code_article", "libelle_court_article"}.issubset(items.columns):
                     for row in items.select(pl.col("code_article"), pl.col("libelle_court_article")).iter_rows(named=True):
                         k = row.get("code_article")
@@ -794,7 +728,7 @@ def get_helios_parent_child_items_for_site(code_ig: str) -> dict:
             result["parents"] = []
         else:
             # Ajouter libelle_long_ig depuis helios
-            if 'helios' in globals() and helios is not None and (not helios.is_empty()) and {"code_ig", "libelle_long_ig"}.issubset(helios.columns):
+            if (not helios.is_empty()) and {"code_ig", "libelle_long_ig"}.issubset(helios.columns):
                 df_parents = df_parents.join(
                     helios.select(pl.col("code_ig"), pl.col("libelle_long_ig")),
                     how="left",
@@ -879,12 +813,15 @@ def get_helios_active_items_for_site(code_ig: str) -> list[dict]:
         norm = (code_ig or "").strip().upper()
         if not norm:
             return out
-        if 'items_parent_buildings' not in globals() or items_parent_buildings.is_empty():
+        snap = current_snapshot()
+        items_parent_buildings = snap.items_parent_buildings
+        items = snap.items
+        if items_parent_buildings.is_empty():
             return out
 
         label_map: dict[str, str] = {}
         try:
-            if 'items' in globals() and items is not None and (not items.is_empty()):
+            if not items.is_empty():
                 if {"code_article", "libelle_court_article"}.issubset(items.columns):
                     for row in items.select(pl.col("code_article"), pl.col("libelle_court_article")).iter_rows(named=True):
                         k = row.get("code_article")
@@ -933,44 +870,9 @@ def get_helios_active_items_for_site(code_ig: str) -> list[dict]:
     except Exception:
         return out
 
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """
-    Calcule la distance à vol d'oiseau entre deux points GPS en kilomètres.
-    
-    lat1, lon1 : latitude et longitude du point 1 (en degrés décimaux)
-    lat2, lon2 : latitude et longitude du point 2 (en degrés décimaux)
-    """
-    # Rayon moyen de la Terre en km
-    R = 6371.0
-    
-    # Conversion des degrés en radians
-    lat1 = radians(lat1)
-    lon1 = radians(lon1)
-    lat2 = radians(lat2)
-    lon2 = radians(lon2)
-    
-    # Formule du haversine
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    distance = R * c
-
-    return distance
-
 def get_available_pudo(lat, long, radius, enseignes: list[str] | None = None):
-    pudos_filtered = pudos.filter(pl.col("latitude").is_not_null())
-    pudos_filtered = (
-        pudos_filtered
-        .with_columns(
-            pl.struct(["latitude", "longitude"]).map_elements(
-                lambda row: haversine_distance(lat, long, row["latitude"], row["longitude"]),
-                return_dtype=pl.Float32,
-            ).alias("distance")
-        )
-        .filter(pl.col("distance") <= radius)
-    )
+    snap = current_snapshot()
+    pudos_filtered = radius_search(snap.pudos, snap.derived_or_none("geo_pudos"), float(lat), float(long), float(radius))
 
 
     df = pl.DataFrame()
@@ -997,7 +899,7 @@ def get_coords_for_ig(code_ig: str):
     if not code_ig:
         return None
     code = code_ig.strip().upper()
-    row = dico_helios.get(code)
+    row = current_snapshot().dico_helios.get(code)
     if not row:
         return None
     # Hypothèse: le parquet helios contient 'latitude' et 'longitude'
@@ -1025,6 +927,30 @@ def get_coords_for_ig(code_ig: str):
     }
 
 
+def get_nearby_helios_sites(lat: float, lon: float, radius_km: float | None = None, n: int | None = None) -> list[dict]:
+    """Retourne les sites Helios proches d'un point, triés par distance croissante.
+
+    - avec ``radius_km`` : tous les sites dans le rayon (limités à ``n`` si fourni) ;
+    - sans rayon : les ``n`` sites les plus proches (10 par défaut).
+    """
+    snap = current_snapshot()
+    helios = snap.helios
+    if helios.is_empty():
+        return []
+    index = snap.derived_or_none("geo_helios")
+    try:
+        if radius_km is not None:
+            df = radius_search(helios, index, float(lat), float(lon), float(radius_km))
+            if n is not None:
+                df = df.head(int(n))
+        else:
+            df = nearest_search(helios, index, float(lat), float(lon), int(n or 10))
+    except Exception:
+        return []
+    cols = ["code_ig", "libelle_long_ig", "adresse", "code_postal", "commune", "latitude", "longitude", "distance"]
+    return df.select([c for c in cols if c in df.columns]).to_dicts()
+
+
 def get_nearby_stores(lat: float, lon: float, radius_km: float, types: list[str] | None = None):
     """
     Retourne un DataFrame des magasins à proximité d'un point (lat, lon),
@@ -1032,16 +958,14 @@ def get_nearby_stores(lat: float, lon: float, radius_km: float, types: list[str]
     Colonnes retournées: code_magasin, type_de_depot, adresse_1, adresse_2,
     code_postal, ville, distance, latitude_rigt, longitude_right
     """
-    if 'stores' not in locals() and 'stores' not in globals():
+    snap = current_snapshot()
+    stores = snap.stores
+    if stores.is_empty():
         return None
-    df = stores.filter(
-        pl.col("latitude_right").is_not_null() & pl.col("longitude_right").is_not_null()
-    ).with_columns(
-        pl.struct(["latitude_right", "longitude_right"]).map_elements(
-            lambda row: haversine_distance(lat, lon, float(row["latitude_right"]), float(row["longitude_right"])) ,
-            return_dtype=pl.Float32,
-        ).alias("distance")
-    ).filter(pl.col("distance") <= float(radius_km))
+    df = radius_search(
+        stores, snap.derived_or_none("geo_stores"), float(lat), float(lon), float(radius_km),
+        "latitude_right", "longitude_right",
+    )
 
     if types:
         # filtrage insensible à la casse et aux accents éventuels
@@ -1078,7 +1002,8 @@ def get_store_contacts(max_items: int | None = None, query: str | None = None, d
     Filtres: recherche plein texte (query) et type_de_depot (depot_types).
     """
     results: list[dict] = []
-    if 'stores' not in locals() and 'stores' not in globals():
+    stores = current_snapshot().stores
+    if stores.is_empty():
         return results
     # Normalize filters
     q = (query or "").strip().lower()
@@ -1150,7 +1075,8 @@ def get_store_contacts(max_items: int | None = None, query: str | None = None, d
 
 def get_store_types() -> list[str]:
     """Retourne la liste triée des valeurs distinctes de type_de_depot."""
-    if 'stores' not in locals() and 'stores' not in globals():
+    stores = current_snapshot().stores
+    if stores.is_empty():
         return []
     try:
         vals = (
@@ -1174,7 +1100,9 @@ def get_manufacturers_for(code_article: str) -> list[dict]:
     Cherche une colonne de jointure plausible parmi: code_article, code, id_article.
     """
     out: list[dict] = []
-    if 'manufacturers' not in globals() or manufacturers.is_empty():
+    snap = current_snapshot()
+    manufacturers = snap.manufacturers
+    if manufacturers.is_empty():
         return out
     key_candidates = [
         "code_article",
@@ -1191,14 +1119,12 @@ def get_manufacturers_for(code_article: str) -> list[dict]:
     if not key_cols:
         return out
     try:
-        norm = str(code_article).strip().upper()
+        norm = norm_text(code_article)
         seen: set[tuple] = set()
         results: list[dict] = []
         for col in key_cols:
             try:
-                df = manufacturers.filter(
-                    pl.col(col).cast(pl.Utf8).str.strip().str.to_uppercase() == norm
-                )
+                df = snap.match_normalized("manufacturers", col, norm)
                 for r in df.iter_rows(named=True):
                     key = tuple(sorted(r.items()))
                     if key in seen:
@@ -1222,39 +1148,34 @@ def get_item_by_code(code_article: str) -> dict | None:
     ce qui permet de retrouver l'article même si la colonne a un nom différent
     (CODE_ARTICLE, code_article_tdf, reference, etc.).
     """
-    if 'items' not in globals() or items.is_empty():
+    snap = current_snapshot()
+    items = snap.items
+    if items.is_empty():
         return None
     try:
-        norm = str(code_article).strip().upper()
+        norm = norm_text(code_article)
 
-        # 1) Tentative d'égalité stricte sur chaque colonne (comme avant)
-        for col in items.columns:
-            try:
-                df = items.filter(
-                    pl.col(col).cast(pl.Utf8).str.strip().str.to_uppercase() == norm
-                )
-                if df.height > 0:
-                    row = df.row(0, named=True)
-                    row["__matched_by"] = col
-                    return row
-            except Exception:
-                continue
+        # 1) Clé naturelle code_article (index de clé du snapshot), puis égalité
+        #    stricte sur les autres colonnes en un seul passage vectorisé
+        try:
+            row = snap.row_by_key("items", norm)
+            if row is not None:
+                row["__matched_by"] = "code_article"
+                return row
+            found = snap.match_any_column("items", norm, [c for c in items.columns if c != "code_article"])
+            if found is not None:
+                col, row = found
+                row["__matched_by"] = col
+                return row
+        except Exception:
+            pass
 
-        # 2) Fallback: recherche plein texte (contains) sur la concat de toutes les colonnes,
+        # 2) Fallback: recherche plein texte via l'index items_text,
         #    pour retrouver la même ligne que la recherche globale.
         try:
-            df = items
-            exprs = [
-                pl.col(c).cast(pl.Utf8).fill_null("").str.to_uppercase()
-                for c in df.columns
-            ]
-            hay = pl.concat_str(exprs, separator=" ").alias("__haystack")
-            df2 = (
-                df.with_columns(hay)
-                  .filter(pl.col("__haystack").str.contains(norm))
-            )
-            if df2.height > 0:
-                row = df2.drop("__haystack").row(0, named=True)
+            offsets = snap.derived_index("items_text").search(norm, limit=1)
+            if offsets:
+                row = items.row(offsets[0], named=True)
                 row["__matched_by"] = "__haystack_contains__"
                 return row
         except Exception:
@@ -1268,22 +1189,21 @@ def get_item_by_code(code_article: str) -> dict | None:
 def get_equivalents_for(code_article: str) -> list[dict]:
     """Retourne la liste des équivalences liées à un code article si le parquet est disponible.
 
-    Version robuste : on cherche le code normalisé dans *toutes* les colonnes du DF
-    `equivalents`, en égalité stricte (après cast en texte / strip / upper).
+    Version robuste : on cherche le code normalisé dans les colonnes de code du DF
+    `equivalents` (code_article, code_article_correspondant), via leurs index de clé.
     """
     out: list[dict] = []
-    if 'equivalents' not in globals() or equivalents.is_empty():
+    snap = current_snapshot()
+    equivalents = snap.equivalents
+    if equivalents.is_empty():
         return out
     try:
-        norm = str(code_article).strip().upper()
+        norm = norm_text(code_article)
         seen: set[tuple] = set()
         results: list[dict] = []
-        for col in equivalents.columns:
+        for col in [c for c in KEY_COLUMNS["equivalents"] if c in equivalents.columns]:
             try:
-                df = equivalents.filter(
-                    pl.col(col).cast(pl.Utf8).str.strip().str.to_uppercase() == norm
-                )
-                for r in df.iter_rows(named=True):
+                for r in snap.rows_by_key("equivalents", norm, col):
                     key = tuple(sorted(r.items()))
                     if key in seen:
                         continue
@@ -1308,14 +1228,14 @@ def get_store_details(code_magasin: str) -> dict | None:
     """
     if not code_magasin:
         return None
-    row = dico_stores.get(code_magasin) if 'dico_stores' in globals() else None
+    snap = current_snapshot()
+    row = snap.dico_stores.get(code_magasin)
     if row is None:
-        # tentative de récupération via DF
+        # tentative de récupération via l'index de clé (code normalisé)
         try:
-            match = stores.filter(pl.col("code_magasin") == code_magasin)
-            if match.height == 0:
+            row = snap.row_by_key("stores", code_magasin)
+            if row is None:
                 return None
-            row = match.row(0, named=True)
         except Exception:
             return None
 
@@ -1351,8 +1271,8 @@ def get_store_details(code_magasin: str) -> dict | None:
         "pr_hors_normes": pick(["pr_hors_norme"]),
     }
     code_ig_val = details.get("code_ig")
-    if code_ig_val and 'dico_helios' in globals():
-        hrow = dico_helios.get(code_ig_val)
+    if code_ig_val:
+        hrow = snap.dico_helios.get(code_ig_val)
         if hrow:
             adr = hrow.get("adresse") or ""
             cp = hrow.get("code_postal") or ""
@@ -1366,10 +1286,9 @@ def get_pudo_details(code_point_relais: str) -> dict | None:
     if not code_point_relais:
         return None
     try:
-        match = pudos.filter(pl.col("code_point_relais") == code_point_relais)
-        if match.height == 0:
+        row = current_snapshot().row_by_key("pudos", code_point_relais)
+        if row is None:
             return None
-        row = match.row(0, named=True)
     except Exception:
         return None
 
@@ -1405,7 +1324,8 @@ def list_technician_pudo_assignments() -> list[dict]:
               code_point_relais, enseigne, adresse_postale, statut
     """
     rows: list[dict] = []
-    if 'stores' not in globals():
+    stores = current_snapshot().stores
+    if stores.is_empty():
         return rows
     # Itérer sur tous les magasins/techniciens
     for srow in stores.iter_rows(named=True):
@@ -1445,27 +1365,18 @@ def list_technician_pudo_assignments() -> list[dict]:
 
 def search_items(query: str | None, max_rows: int = 200) -> pl.DataFrame | None:
     """
-    Recherche plein texte dans la table items (items.parquet) sur l'ensemble des colonnes.
+    Recherche plein texte dans la table items (items.parquet) sur l'ensemble des colonnes,
+    via l'index ``items_text`` du snapshot (tous les termes, résultats classés par pertinence).
     - query: texte recherché (insensible à la casse)
     - max_rows: limite de lignes retournées
     Retourne un DataFrame Polars (éventuellement vide) ou None si items indisponible.
     """
-    if 'items' not in globals():
-        return None
+    snap = current_snapshot()
     q = (query or '').strip().lower()
     if not q:
         return pl.DataFrame()
-    df = items
     try:
-        exprs = [pl.col(c).cast(pl.Utf8).fill_null("").str.to_lowercase() for c in df.columns]
-        hay = pl.concat_str(exprs, separator=" ").alias("__haystack")
-        out = (
-            df.with_columns(hay)
-              .filter(pl.col("__haystack").str.contains(q))
-              .drop("__haystack")
-              .head(max_rows)
-        )
-        return out
+        return take_rows(snap.items, snap.derived_index("items_text").search(q, limit=max_rows))
     except Exception:
         # Fallback très simple: pas de filtre, retourne vide
         return pl.DataFrame()
@@ -1473,10 +1384,8 @@ def search_items(query: str | None, max_rows: int = 200) -> pl.DataFrame | None:
 
 def get_items_columns() -> list[str]:
     """Retourne la liste des colonnes disponibles dans items, ou une liste vide."""
-    if 'items' not in globals():
-        return []
     try:
-        return list(items.columns)
+        return list(current_snapshot().items.columns)
     except Exception:
         return []
 
@@ -1484,21 +1393,17 @@ def get_items_columns() -> list[str]:
 def search_items_advanced(global_query: str | None, col_filters: dict[str, str] | None, max_rows: int = 300) -> pl.DataFrame | None:
     """
     Recherche avancée dans items:
-      - global_query: recherche plein texte sur toutes les colonnes (insensible case)
+      - global_query: recherche plein texte (index ``items_text``) sur toutes les colonnes (insensible case)
       - col_filters: dict {col -> valeur} appliqué par 'contains' insensible case, ignoré si valeur vide
     """
-    if 'items' not in globals():
-        return None
-    df = items
+    snap = current_snapshot()
+    df = snap.items
     try:
-        # Build filter expressions
-        filters = []
         gq = (global_query or '').strip().lower()
         if gq:
-            exprs = [pl.col(c).cast(pl.Utf8).fill_null("").str.to_lowercase() for c in df.columns]
-            hay = pl.concat_str(exprs, separator=" ").alias("__haystack")
-            df = df.with_columns(hay)
-            filters.append(pl.col("__haystack").str.contains(gq))
+            df = take_rows(df, snap.derived_index("items_text").search(gq))
+        # Build filter expressions
+        filters = []
         if col_filters:
             for col, val in col_filters.items():
                 if not val:
@@ -1512,8 +1417,6 @@ def search_items_advanced(global_query: str | None, col_filters: dict[str, str]
             for f in filters[1:]:
                 combined = combined & f
             df = df.filter(combined)
-        if "__haystack" in df.columns:
-            df = df.drop("__haystack")
         return df.head(max_rows)
     except Exception:
         return pl.DataFrame()
@@ -41,13 +41,12 @@ def transform_string(label: str) -> str:
     return label
 
 
-def transform_columns_name(dataframe: pl.DataFrame) -> pl.DataFrame:
+def _transform_names(labels: list[str]) -> list[str]:
     '''
-    Transform the header of the dataframe with transform_string function 
+    Transform the labels with transform_string function, then suffix the
+    duplicated names (_0, _1, ...) except their first occurrence
     '''
-    #logger.debug(f"Transforming columns names: {dataframe.columns}")
-    name_columns = [transform_string(label) for label in dataframe.columns]
-    #logger.debug(f"Transformed columns names: {name_columns}")
+    name_columns = [transform_string(label) for label in labels]
     name_columns_to_replace = []
     for i, name_col in enumerate(name_columns):
         if name_columns.count(name_col) > 1:
@@ -63,6 +62,16 @@ def transform_columns_name(dataframe: pl.DataFrame) -> pl.DataFrame:
                 name_columns[i] = "{}_{}".format(name_col_2, count)
                 count += 1
 
+    return name_columns
+
+
+def transform_columns_name(dataframe: pl.DataFrame) -> pl.DataFrame:
+    '''
+    Transform the header of the dataframe with transform_string function 
+    '''
+    #logger.debug(f"Transforming columns names: {dataframe.columns}")
+    name_columns = _transform_names(dataframe.columns)
+    #logger.debug(f"Transformed columns names: {name_columns}")
     dataframe.columns = name_columns
 
     return dataframe
@@ -79,6 +88,9 @@ def read_excel(folder_path: str, file_name: str, sheet_name: str=None) -> pl.Dat
 
     Returns:
         pl.DataFrame: Polars DataFrame containing the data of the sheet
+
+    The sheet is read with the calamine engine (fastexcel) when available,
+    openpyxl being the fallback.
     '''
     #logger.info(f"Reading Excel file and sheetname: {folder_path}\{file_name}, {sheet_name}")
     if not (file_name.endswith(".xlsx") or file_name.endswith(".xls")):
@@ -88,6 +100,11 @@ def read_excel(folder_path: str, file_name: str, sheet_name: str=None) -> pl.Dat
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Le fichier {file_path} n'existe pas")
 
+    df = _read_excel_calamine(file_path, sheet_name)
+    if df is not None:
+        #logger.info(f"End reading Excel file: {folder_path}/{file_name}, {sheet_name}")
+        return df
+
     try:
         # Lecture du classeur avec openpyxl
         wb = openpyxl.load_workbook(file_path, data_only=True)
@@ -124,6 +141,66 @@ def read_excel(folder_path: str, file_name: str, sheet_name: str=None) -> pl.Dat
     return df
 
 
+def _read_excel_calamine(file_path: str, sheet_name: str | None) -> pl.DataFrame | None:
+    '''
+    Fast path of read_excel: the sheet is read by the calamine engine (fastexcel)
+    directly into Arrow, then converted to Polars without any Python loop on the cells.
+
+    The result follows the openpyxl path:
+        - a column mixing several types (e.g. numbers and texts) is read as text
+          (fastexcel "coerce" mode, the numbers are written "12" / "1.5");
+        - calamine reads every number as a float: a float column whose values
+          are all integers becomes Int64, a column mixing integers and decimals
+          becomes text, as openpyxl gives int and float values;
+        - dates are cast to Datetime("us"), the unit of the datetime values
+          given by openpyxl (calamine reads them in milliseconds);
+        - the header goes through transform_columns_name (an empty header
+          gives an empty name).
+
+    Returns None if fastexcel is unavailable or fails (the caller then uses openpyxl).
+    Without sheet_name, the first sheet is read.
+    '''
+    try:
+        import fastexcel
+    except ImportError:
+        return None
+
+    try:
+        reader = fastexcel.read_excel(file_path)
+        sheet = reader.load_sheet(sheet_name if sheet_name else 0, header_row=0, dtype_coercion="coerce")
+        df = sheet.to_polars()
+    except Exception:
+        return None
+
+    headers = ["" if name.startswith("__UNNAMED__") else name for name in df.columns]
+    exprs = []
+    for name, dtype in df.schema.items():
+        if isinstance(dtype, pl.Datetime) and dtype.time_unit != "us":
+            exprs.append(pl.col(name).cast(pl.Datetime("us", dtype.time_zone)))
+            continue
+        if dtype != pl.Float64:
+            continue
+        values = df.get_column(name).drop_nulls()
+        if values.is_empty():
+            continue
+        integral = values == values.floor()
+        col = pl.col(name)
+        if integral.all():
+            exprs.append(col.cast(pl.Int64, strict=False))
+        elif integral.any():
+            exprs.append(
+                pl.when(col == col.floor())
+                .then(col.cast(pl.Int64, strict=False).cast(pl.Utf8))
+                .otherwise(col.cast(pl.Utf8))
+                .alias(name)
+            )
+    if exprs:
+        df = df.with_columns(exprs)
+
+    df.columns = _transform_names(headers)
+    return df
+
+
 def read_csv(folder_path: str, file_name: str) -> pl.DataFrame:
     #logger.info(f"Reading Csv file: {folder_path}\{file_name}")
     if not file_name.endswith(".csv"):
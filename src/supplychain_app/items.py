@@ -1,6 +1,10 @@
 import os
 import shutil
+import threading
 import datetime as dt
+from collections import deque
+from dataclasses import dataclass, field
+
 import polars as pl
 
 from supplychain_app.constants import (path_exit, 
@@ -134,6 +138,33 @@ class Items():
         self.manufacturer_df.write_parquet(os.path.join(folder_path, "manufacturers.parquet"))
 
 
+# Nomenclature explosion: node states of the depth-first search
+_IN_PROGRESS, _DONE = 1, 2
+# Maximum number of nodes of an exploded tree (beyond, nodes are marked "tronque")
+BOM_MAX_TREE_NODES = 20000
+# Number of explosions kept in cache per Nomenclatures instance
+BOM_EXPLOSION_CACHE_SIZE = 512
+
+
+@dataclass(frozen=True)
+class BomExplosion:
+    """Result of Nomenclatures.explode."""
+
+    tree: dict
+    quantities: dict
+    cycles: list = field(default_factory=list)
+    truncated: bool = False
+
+
+@dataclass(frozen=True)
+class BomWhereUsed:
+    """Result of Nomenclatures.where_used."""
+
+    quantities: dict
+    levels: dict
+    cycles: list = field(default_factory=list)
+
+
 class Nomenclatures():
     
     def __init__(self, folder_path, file_name, sheet_name=None):
@@ -144,10 +175,20 @@ class Nomenclatures():
             if sheet_name is not None:
                 self.df = read_excel(folder_path, file_name, sheet_name)
                 self._clean_columns()
-                self.nomenclature_dictionnary =  self._making_nomenclature_dictionnary()
                 self._making_nomenclature_dictionnary()
             else:
-                raise("Il manque le nom de la feuille excel")
+                raise ValueError("Il manque le nom de la feuille excel")
+
+    @classmethod
+    def from_dataframe(cls, df: pl.DataFrame) -> "Nomenclatures":
+        """
+        Build the nomenclatures from an already loaded dataframe
+        (e.g. the 'nomenclatures' table of the DataStore snapshot).
+        """
+        nomenclatures = cls.__new__(cls)
+        nomenclatures.df = df
+        nomenclatures._making_nomenclature_dictionnary()
+        return nomenclatures
 
     def _clean_columns(self):
         self.df = self.df.with_columns(pl.col("article").str.strip_chars())
@@ -186,87 +227,300 @@ class Nomenclatures():
         Making a dictionnary with as key the 'father' article and in value
         a list of dictionnary with in key the 'son' article and in value
         the quantity.
+
+        The adjacency is built with a single group_by on the 'father' article
+        (children kept in the dataframe order). The reverse adjacency
+        (parents_dictionnary: 'son' article -> list of its 'father' articles
+        with the quantity) is filled in the same pass; both are only read
+        afterwards.
+
+        The memo caches (flattened quantities, explosions, where-used) are
+        shared by the request threads and only touched under self._memo_lock.
         """
         self.nomenclature_dictionnary = {}
+        self.parents_dictionnary = {}
+        self._memo_lock = threading.RLock()
+        self._flat_memo = {}
+        self._explosions = {}
+        self._where_used = {}
+        required = {"article", "article_eqpt_article_fils", "art_et_art_fils_eqpt_quantite"}
+        if not required.issubset(self.df.columns):
+            return self.nomenclature_dictionnary
         list_items_with_nomenclature = self._get_list_items_with_nomenclature()
-        for item in list_items_with_nomenclature:
-            self.nomenclature_dictionnary[item] = []
-            df_item = (
-                self.df.filter(
-                    (pl.col("article") == item) 
-                    & ((pl.col("art_et_art_fils_eqpt_quantite").is_not_null()) 
-                       & (pl.col("art_et_art_fils_eqpt_quantite") > 0)))
-                       .iter_rows(named=True)
-                       )
-            for row in df_item:
-                self.nomenclature_dictionnary[item].append({"code_article": row["article_eqpt_article_fils"], 
-                                                            "quantite": row["art_et_art_fils_eqpt_quantite"]})
+        grouped = (
+            self.df.filter(
+                (pl.col("article").is_in(list_items_with_nomenclature))
+                & (pl.col("art_et_art_fils_eqpt_quantite").is_not_null())
+                & (pl.col("art_et_art_fils_eqpt_quantite") > 0)
+            )
+            .group_by("article", maintain_order=True)
+            .agg(
+                pl.col("article_eqpt_article_fils"),
+                pl.col("art_et_art_fils_eqpt_quantite"),
+            )
+            .sort("article")
+        )
+        for item, children, quantities in grouped.iter_rows():
+            self.nomenclature_dictionnary[item] = [
+                {"code_article": child, "quantite": quantity}
+                for child, quantity in zip(children, quantities)
+            ]
+            for child, quantity in zip(children, quantities):
+                self.parents_dictionnary.setdefault(child, []).append(
+                    {"code_article": item, "quantite": quantity}
+                )
+        return self.nomenclature_dictionnary
 
         #logger.debug(f"Number of items with nomenclature: {len(self.nomenclature_dictionnary)}")
         #logger.debug(f"List of items with nomenclature: {self.nomenclature_dictionnary}")
 
 
-    def get_item_tree(self, item_code: str, item_parent: str=None, multiplying_factor: int=1, counter: int=None) -> dict:
+    def _children(self, item_code: str) -> list[dict]:
+        return self.nomenclature_dictionnary.get(item_code, [])
+
+
+    def _parents(self, item_code: str) -> list[dict]:
+        return self.parents_dictionnary.get(item_code, [])
+
+
+    def _unit_quantities(self, item_code: str) -> tuple[dict, list[list[str]], set[tuple[str, str]]]:
+        """
+        Flattened multi-level quantities of the children of item_code, for 1 item_code.
+
+        Iterative post-order depth-first search:
+        - each article is computed once (its children results are reused);
+        - an edge towards an article being explored is a cycle: it is recorded
+          and ignored in the quantities.
+
+        Results of articles whose sub-nomenclature has no cycle are kept in
+        self._flat_memo and shared between explosions.
+        """
+        with self._memo_lock:
+            return self._unit_quantities_locked(item_code)
+
+
+    def _unit_quantities_locked(self, item_code: str) -> tuple[dict, list[list[str]], set[tuple[str, str]]]:
+        memo = self._flat_memo
+        if item_code in memo:
+            return memo[item_code], [], set()
+
+        local: dict[str, dict] = {}
+        state: dict[str, int] = {item_code: _IN_PROGRESS}
+        path = [item_code]
+        stack = [(item_code, iter(self._children(item_code)))]
+        cycles: list[list[str]] = []
+        cycle_edges: set[tuple[str, str]] = set()
+        cyclic: set[str] = set()
+
+        while stack:
+            code, children = stack[-1]
+            pushed = False
+            for edge in children:
+                child = edge["code_article"]
+                if child in memo or state.get(child) == _DONE:
+                    continue
+                if state.get(child) == _IN_PROGRESS:
+                    start = path.index(child)
+                    cycles.append(path[start:] + [child])
+                    cycle_edges.add((code, child))
+                    cyclic.update(path[start:])
+                    continue
+                state[child] = _IN_PROGRESS
+                path.append(child)
+                stack.append((child, iter(self._children(child))))
+                pushed = True
+                break
+            if pushed:
+                continue
+
+            stack.pop()
+            path.pop()
+            state[code] = _DONE
+            flat: dict[str, float] = {}
+            for edge in self._children(code):
+                child = edge["code_article"]
+                if (code, child) in cycle_edges:
+                    continue
+                quantity = edge["quantite"]
+                if child in local:
+                    sub = local[child]
+                    cyclic.add(code)
+                else:
+                    sub = memo.get(child, {})
+                flat[child] = flat.get(child, 0) + quantity
+                for grandchild, sub_quantity in sub.items():
+                    flat[grandchild] = flat.get(grandchild, 0) + quantity * sub_quantity
+            if code in cyclic:
+                local[code] = flat
+            else:
+                memo[code] = flat
+
+        result = memo[item_code] if item_code in memo else local[item_code]
+        return result, cycles, cycle_edges
+
+
+    def _build_tree(self, item_code: str, multiplying_factor, max_nodes: int) -> tuple[dict, bool]:
+        """
+        Tree of the nomenclature with cumulative quantities, built without recursion.
+
+        A child already present in its own branch is marked "cycle" and not expanded;
+        beyond max_nodes nodes, children are marked "tronque" and not expanded.
+        """
+        root = {"code_article": item_code, "quantite": 1 * multiplying_factor}
+        nodes_count = 1
+        truncated = False
+        stack = [(root, item_code, (item_code,))]
+        while stack:
+            node, code, branch = stack.pop()
+            children = self._children(code)
+            if code not in self.nomenclature_dictionnary:
+                continue
+            node["code_article_fils"] = []
+            for edge in children:
+                child = edge["code_article"]
+                child_node = {"code_article": child, "quantite": edge["quantite"] * node["quantite"]}
+                node["code_article_fils"].append(child_node)
+                if child in branch:
+                    child_node["cycle"] = True
+                    continue
+                if nodes_count >= max_nodes:
+                    child_node["tronque"] = True
+                    truncated = True
+                    continue
+                nodes_count += 1
+                stack.append((child_node, child, branch + (child,)))
+        return root, truncated
+
+
+    def explode(self, item_code: str, multiplying_factor=1, max_nodes: int = BOM_MAX_TREE_NODES) -> "BomExplosion":
+        """
+        Explode the nomenclature of item_code in one pass:
+        - tree: hierarchy with cumulative quantities (same format as before,
+          plus "cycle" / "tronque" markers);
+        - quantities: total quantity of every article at any level, for
+          multiplying_factor item_code;
+        - cycles: the cycles met (list of article paths).
+
+        Results are cached per (article, factor, max_nodes) on this instance,
+        which lives as long as the nomenclatures snapshot.
+        """
+        key = (item_code, multiplying_factor, max_nodes)
+        with self._memo_lock:
+            cached = self._explosions.get(key)
+        if cached is not None:
+            return cached
+        unit, cycles, _ = self._unit_quantities(item_code)
+        tree, truncated = self._build_tree(item_code, multiplying_factor, max_nodes)
+        explosion = BomExplosion(
+            tree=tree,
+            quantities={code: quantity * multiplying_factor for code, quantity in unit.items()},
+            cycles=cycles,
+            truncated=truncated,
+        )
+        with self._memo_lock:
+            if len(self._explosions) >= BOM_EXPLOSION_CACHE_SIZE:
+                self._explosions.clear()
+            self._explosions[key] = explosion
+        return explosion
+
+
+    def where_used(self, item_code: str) -> "BomWhereUsed":
+        """
+        Every ancestor of item_code (articles whose nomenclature contains it,
+        at any level) with:
+        - quantities: cumulative quantity of item_code in 1 ancestor (sum over
+          all the paths);
+        - levels: smallest number of levels between the ancestor and item_code
+          (1 = direct parent);
+        - cycles: ancestors where a cycle was broken (their quantity, and the
+          one of their own ancestors, ignores the paths going round the cycle).
+
+        The ancestors are found with a breadth-first search on the reverse
+        adjacency, then the quantities are propagated from item_code upwards
+        in topological order: an ancestor is processed once all its children
+        leading to item_code are. Results are cached on this instance.
+        """
+        with self._memo_lock:
+            cached = self._where_used.get(item_code)
+        if cached is not None:
+            return cached
+
+        levels: dict[str, int] = {}
+        queue = deque([item_code])
+        while queue:
+            code = queue.popleft()
+            level = levels.get(code, 0) + 1
+            for edge in self._parents(code):
+                parent = edge["code_article"]
+                if parent == item_code or parent in levels:
+                    continue
+                levels[parent] = level
+                queue.append(parent)
+
+        # Number of edges from each ancestor towards item_code or another ancestor
+        pending = {
+            parent: sum(
+                1 for edge in self._children(parent)
+                if edge["code_article"] == item_code or edge["code_article"] in levels
+            )
+            for parent in levels
+        }
+        needed: dict[str, float] = {item_code: 1}
+        ready = deque([item_code])
+        cycles: list[str] = []
+        while True:
+            while ready:
+                code = ready.popleft()
+                for edge in self._parents(code):
+                    parent = edge["code_article"]
+                    if parent == item_code or parent in cycles:
+                        continue
+                    needed[parent] = needed.get(parent, 0) + edge["quantite"] * needed[code]
+                    pending[parent] -= 1
+                    if pending[parent] == 0:
+                        ready.append(parent)
+            # Blocked: the remaining ancestors wait on each other (cycle).
+            # The closest one is released with the quantity known so far.
+            blocked = [code for code, count in pending.items() if count > 0]
+            if not blocked:
+                break
+            code = min(blocked, key=lambda c: (levels[c], c))
+            pending[code] = 0
+            cycles.append(code)
+            ready.append(code)
+
+        used = BomWhereUsed(
+            quantities={code: needed.get(code, 0) for code in levels},
+            levels=levels,
+            cycles=sorted(cycles),
+        )
+        with self._memo_lock:
+            if len(self._where_used) >= BOM_EXPLOSION_CACHE_SIZE:
+                self._where_used.clear()
+            self._where_used[item_code] = used
+        return used
+
+
+    def get_item_tree(self, item_code: str, multiplying_factor=1) -> dict:
         """
         return a dictionnary representing the hierarchy or nomenclature of the item
         
         """
-        if counter is None:
-            counter = 0
-        counter += 1
-        if counter > 10:
-            return {}
-        tree = {}
-        tree["code_article"] = item_code
-        if item_parent is not None:
-            for row in self.nomenclature_dictionnary[item_parent]:
-                if row["code_article"] == item_code:
-                    tree["quantite"] = row["quantite"] * multiplying_factor
-        else:
-            tree["quantite"] = 1 * multiplying_factor
-        if item_code in self.nomenclature_dictionnary:
-            tree["code_article_fils"] = []
-            for code_article_fils in self.nomenclature_dictionnary[item_code]:
-                tree["code_article_fils"].append(self.get_item_tree(code_article_fils["code_article"], item_code, tree["quantite"], counter))
-        
-        #logger.info(f"item_code: {item_code}")
-        #logger.info(f"counter: {counter}")
-        #logger.info(f"nomenclature: {tree}")
-        
-        return tree
+        return self.explode(item_code, multiplying_factor).tree
 
 
     def get_item_nomenclature(self, parent_item):
-
-        tree = self.get_item_tree(parent_item)
+        """
+        Return the children of parent_item at every level with their total
+        (multi-level, cumulative) quantity, sorted by article code.
+        """
+        explosion = self.explode(parent_item)
         item_nomenclature = {}
         item_nomenclature["code_article_parent"] = parent_item
-        item_nomenclature["code_article_fils"] = []
-        if "code_article_fils" in tree:
-            for row in tree["code_article_fils"]:
-                if "code_article" in row:
-                    item_nomenclature["code_article_fils"].append({"code_article": row["code_article"], "quantite": row["quantite"]})
-                if "code_article_fils" in row:
-                    tree_2 = self.get_item_tree(row["code_article"])
-                    for row_2 in tree_2["code_article_fils"]:
-                        if "code_article" in row_2:
-                            item_nomenclature["code_article_fils"].append({"code_article": row_2["code_article"], "quantite": row_2["quantite"]})
-        
-        item_nomenclature["code_article_fils"] = sorted(item_nomenclature["code_article_fils"], key=lambda x: x["code_article"])
-
-        dict_child_code = {}
-        for i, row in enumerate(item_nomenclature["code_article_fils"]):
-            if row["code_article"] not in dict_child_code:
-                dict_child_code[row["code_article"]] = 0
-            dict_child_code[row["code_article"]] += row["quantite"]
-        list_child_code = []
-        for code_art, qte in dict_child_code.items():
-            list_child_code.append({"code_article": code_art, "quantite": qte})
-
-        item_nomenclature["code_article_fils"] = list_child_code
-        item_nomenclature["code_article_fils"] = sorted(item_nomenclature["code_article_fils"], key= lambda row: row["code_article"])
-
-        #logger.info(f"{item_nomenclature}")
+        item_nomenclature["code_article_fils"] = [
+            {"code_article": code_art, "quantite": qte}
+            for code_art, qte in sorted(explosion.quantities.items(), key=lambda row: row[0])
+        ]
         return item_nomenclature
 
 
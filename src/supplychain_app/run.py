@@ -10,33 +10,30 @@ import socket
 
 FRONTEND_HOST = "127.0.0.1"
 FRONTEND_DEFAULT_PORT = 8000
+API_HOST = "127.0.0.1"
+API_PORT = 5001
 _frontend_port: int | None = None
 _frontend_port_ready = threading.Event()
 _frontend_httpd = None
 _api_httpd = None
+_api_server_mode: str | None = None
 _shutdown_lock = threading.Lock()
 _shutdown_started = False
 
 
 def run_frontend() -> None:
     try:
-        import http.server
         import socketserver
         import urllib.request
 
         from supplychain_app.core.paths import get_web_dir
+        from supplychain_app.core.static_assets import StaticAssetHandler
 
         web_dir = get_web_dir()
         os.chdir(web_dir)
 
-        class NoCacheHandler(http.server.SimpleHTTPRequestHandler):
-            def end_headers(self):
-                self.send_header("Cache-Control", "no-store, no-cache, must-revalidate, max-age=0")
-                self.send_header("Pragma", "no-cache")
-                self.send_header("Expires", "0")
-                return super().end_headers()
-
-        handler = NoCacheHandler
+        # Empreintes de contenu + cache long, ETag / 304 et gzip (voir core.static_assets)
+        handler = StaticAssetHandler
 
         class ReusableTCPServer(socketserver.ThreadingTCPServer):
             allow_reuse_address = True
@@ -77,14 +74,49 @@ def run_frontend() -> None:
             pass
 
 
+def _make_api_server(app):
+    """Serveur WSGI de l'API selon ``Config.API_SERVER`` ; retourne (serveur, mode).
+
+    - "waitress" (défaut) : pool borné de ``API_THREADS`` threads, au plus
+      ``API_CONNECTION_LIMIT`` connexions ouvertes, connexions keep-alive
+      fermées après ``API_KEEPALIVE_S`` s d'inactivité (voir ADR 0010) ;
+      repli sur werkzeug si waitress n'est pas installé ;
+    - "werkzeug" : serveur de développement, un thread par requête.
+    """
+    from supplychain_app.config import Config
+
+    if str(Config.API_SERVER or "").strip().lower() != "werkzeug":
+        try:
+            from waitress import create_server
+
+            server = create_server(
+                app,
+                host=API_HOST,
+                port=API_PORT,
+                threads=max(1, Config.API_THREADS),
+                connection_limit=max(1, Config.API_CONNECTION_LIMIT),
+                channel_timeout=max(1, Config.API_KEEPALIVE_S),
+                ident="SupplyChainApp",
+            )
+            return server, "waitress"
+        except ImportError:
+            print("waitress not installed, falling back to werkzeug", file=sys.stderr)
+
+    from werkzeug.serving import make_server
+
+    return make_server(API_HOST, API_PORT, app, threaded=True), "werkzeug"
+
+
 def run_api() -> None:
     try:
-        from werkzeug.serving import make_server
         from supplychain_app.app import app
 
-        global _api_httpd
-        _api_httpd = make_server("127.0.0.1", 5001, app, threaded=True)
-        _api_httpd.serve_forever()
+        global _api_httpd, _api_server_mode
+        _api_httpd, _api_server_mode = _make_api_server(app)
+        if _api_server_mode == "waitress":
+            _api_httpd.run()
+        else:
+            _api_httpd.serve_forever()
     except Exception:
         traceback.print_exc(file=sys.stderr)
         try:
@@ -104,7 +136,10 @@ def _shutdown_all() -> None:
         try:
             if _api_httpd is not None:
                 try:
-                    _api_httpd.shutdown()
+                    if _api_server_mode == "waitress":
+                        _api_httpd.close()
+                    else:
+                        _api_httpd.shutdown()
                 except Exception:
                     pass
         finally:
@@ -141,7 +176,7 @@ def main() -> None:
     try:
         import urllib.request
 
-        api_url = "http://127.0.0.1:5001/api/health"
+        api_url = f"http://{API_HOST}:{API_PORT}/api/health"
         deadline = time.time() + 6.0
         while time.time() < deadline:
             try:
@@ -3,6 +3,7 @@ import requests
 import re
 import unidecode
 
+from functools import lru_cache
 from string import punctuation
 from urllib.parse import quote
 from flask import session
@@ -55,6 +56,8 @@ def get_datagouv_response_gps_for_address(address: str) -> dict:
         return result
 
 
+# Nettoyage pur (mêmes entrées -> même sortie) : mis en cache pour les adresses répétées
+@lru_cache(maxsize=8192)
 def get_cleaning_address(*address):
     cleaned_address = []
     address_pretreatment = [] 
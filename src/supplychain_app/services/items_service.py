@@ -1,4 +1,8 @@
 import polars as pl
+from supplychain_app.data.data_store import current_snapshot
+from supplychain_app.items import Nomenclatures
+from supplychain_app.core.article_graph import ArticleGraph, BOM_CHILD, BOM_PARENT, EQUIV
+from supplychain_app.data.pudo_service import get_helios_installed_parents
 from supplychain_app.services.pudo_service import (
     search_items_advanced,
     get_item_by_code,
@@ -9,6 +13,144 @@ from supplychain_app.services.pudo_service import (
     stats_exit_items_monthly,
 )
 
+
+def get_nomenclatures() -> Nomenclatures:
+    """Nomenclatures du snapshot courant (reconstruites uniquement quand nomenclatures.parquet change)."""
+    return current_snapshot().derived_index("bom")
+
+
+def get_item_network(code: str, depth: int | None, max_nodes: int, max_edges: int, parents: bool = False) -> dict:
+    """Voisinage d'un article dans le graphe des articles du snapshot courant.
+
+    Nomenclature vers les fils et équivalences ; ``parents`` ajoute la
+    nomenclature vers les parents (cas d'emploi). ``depth=None`` : nomenclature
+    complète de l'article (sans limite de sauts) et ses seuls équivalents
+    directs, dans la limite de ``max_nodes`` / ``max_edges``.
+    """
+    kinds = (BOM_CHILD, EQUIV, BOM_PARENT) if parents else (BOM_CHILD, EQUIV)
+    graph: ArticleGraph = current_snapshot().derived_index("article_graph")
+    return graph.neighborhood(
+        code, depth=depth, max_nodes=max_nodes, max_edges=max_edges, kinds=kinds,
+        equiv_depth=1 if depth is None else None,
+    )
+
+
+def get_item_row(code: str) -> dict | None:
+    """Ligne items.parquet d'un code article (index de clé du snapshot)."""
+    return current_snapshot().row_by_key("items", code)
+
+def _top_level_installed(parents: dict, start: str, installed: set[str]) -> set[str]:
+    """Ascendants installés de ``start`` qui ne sont contenus dans aucun autre ascendant installé.
+
+    Un seul parcours du graphe des parents au-dessus de ``start`` : ses
+    composantes fortement connexes (boucles de nomenclature) sont calculées
+    (algorithme de Tarjan, itératif) ; une composante n'est émise qu'après
+    toutes celles au-dessus d'elle, on sait donc à ce moment si un ascendant
+    installé se trouve strictement au-dessus. Dans une boucle, un ascendant ne
+    couvre pas ceux qui le contiennent.
+    """
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    component: dict[str, int] = {}
+    # Par composante : contient un ascendant installé / en a un strictement au-dessus
+    has_installed: list[bool] = []
+    covered: list[bool] = []
+    top: set[str] = set()
+
+    work = [(start, iter(parents.get(start, ())))]
+    index[start] = low[start] = 0
+    stack.append(start)
+    on_stack.add(start)
+    while work:
+        node, edges = work[-1]
+        pushed = False
+        for edge in edges:
+            parent = edge["code_article"]
+            if parent not in index:
+                index[parent] = low[parent] = len(index)
+                stack.append(parent)
+                on_stack.add(parent)
+                work.append((parent, iter(parents.get(parent, ()))))
+                pushed = True
+                break
+            if parent in on_stack:
+                low[node] = min(low[node], index[parent])
+        if pushed:
+            continue
+        work.pop()
+        if work:
+            low[work[-1][0]] = min(low[work[-1][0]], low[node])
+        if low[node] != index[node]:
+            continue
+        members = []
+        while True:
+            member = stack.pop()
+            on_stack.discard(member)
+            members.append(member)
+            if member == node:
+                break
+        cid = len(has_installed)
+        for member in members:
+            component[member] = cid
+        above = any(
+            has_installed[component[edge["code_article"]]] or covered[component[edge["code_article"]]]
+            for member in members
+            for edge in parents.get(member, ())
+            if component[edge["code_article"]] != cid
+        )
+        installed_here = [m for m in members if m in installed]
+        has_installed.append(bool(installed_here))
+        covered.append(above)
+        if not above:
+            top.update(installed_here)
+    return top
+
+
+def get_where_used(code: str) -> dict:
+    """Cas d'emploi d'un article : tous ses ascendants (tous niveaux) avec la
+    quantité cumulée de l'article par ascendant, joints au parc installé Helios
+    (items_parent_buildings) de chaque ascendant.
+
+    ``installed_parents`` ne compte que les ascendants installés de plus haut
+    niveau (``installe_racine``) : un ascendant installé contenu dans un autre
+    ascendant installé fait partie du parc de ce dernier et n'est pas recompté.
+    """
+    nomenclatures = get_nomenclatures()
+    used = nomenclatures.where_used(code)
+    ancestors = pl.DataFrame(
+        {
+            "code_article": list(used.quantities),
+            "niveau": [used.levels[c] for c in used.quantities],
+            "quantite": [float(used.quantities[c]) for c in used.quantities],
+        },
+        schema={"code_article": pl.Utf8, "niveau": pl.Int64, "quantite": pl.Float64},
+    )
+    installed = get_helios_installed_parents(ancestors.get_column("code_article").to_list())
+    ancestors = ancestors.join(installed, on="code_article", how="left").with_columns(
+        pl.col("quantity_active").fill_null(0.0),
+        pl.col("active_sites").fill_null(0),
+    )
+
+    # Ascendants installés qui ne sont contenus dans aucun autre ascendant installé
+    # (dans une boucle de nomenclature, un ascendant ne couvre pas ceux qui le contiennent)
+    installed_codes = set(ancestors.filter(pl.col("quantity_active") > 0).get_column("code_article").to_list())
+    top_level = list(_top_level_installed(nomenclatures.parents_dictionnary, code, installed_codes))
+    ancestors = ancestors.with_columns(
+        pl.col("code_article").is_in(top_level).alias("installe_racine")
+    ).sort(["niveau", "code_article"])
+    return {
+        "code": code,
+        "ascendants": ancestors.to_dicts(),
+        "cycles": used.cycles,
+        # Parc installé (quantité active) des ascendants installés de plus haut niveau
+        "installed_parents": float(
+            ancestors.filter(pl.col("installe_racine")).get_column("quantity_active").sum()
+        ),
+    }
+
+
 def search_items_df(q: str, filters: dict, limit: int) -> pl.DataFrame | None:
     return search_items_advanced(q, filters, max_rows=limit)
 
@@ -1,9 +1,8 @@
 import os
 import datetime
 import re
-import threading
-from math import radians, sin, cos, sqrt, atan2
 import polars as pl
+from collections.abc import Iterator
 from supplychain_app.constants import (
     path_datan,
     folder_bdd_python,
@@ -12,107 +11,27 @@ from supplychain_app.constants import (
     CHOIX_PR_TECH_DIR,
     CHOIX_PR_TECH_FILE,
 )
+from supplychain_app.data.data_store import current_snapshot, get_data_store
+from supplychain_app.core.geo import pairwise_distances
+from supplychain_app.core.spatial import nearest_search, radius_search
+from supplychain_app.core.text_index import take_rows
+from supplychain_app.core.text_norm import norm_text
 
-_reload_lock = threading.Lock()
-_data_mtimes: dict[str, float | None] = {}
 _distance_tech_pr_df: pl.DataFrame | None = None
 _distance_tech_pr_mtime: float | None = None
-
-
-def _parquet_path(name: str) -> str:
-    return os.path.join(path_datan, folder_name_app, f"{name}.parquet")
-
-
-def _safe_mtime(path: str) -> float | None:
-    try:
-        return float(os.path.getmtime(path))
-    except OSError:
-        return None
+# Cache des IG OL : (version du snapshot, lignes)
+_ol_igs_cache: tuple[str, list[dict]] | None = None
 
 
 def reload_data(force: bool = False) -> bool:
-    """Recharge en mémoire les DataFrames globaux depuis les parquets.
+    """Recharge en mémoire les DataFrames depuis les parquets.
 
-    L'app charge ces données une fois au démarrage. Sans reload, une mise à jour
-    des parquets (ETL) n'est pas visible tant que le process n'est pas relancé.
+    Les tables sont détenues par le DataStore partagé avec
+    supplychain_app.data.pudo_service : une seule lecture suffit pour les deux.
 
     Retourne True si une recharge a été effectuée.
     """
-    global pudos, stores, helios, items, nomenclatures, manufacturers, equivalents
-    global stats_exit, items_parent_buildings, items_son_buildings
-    global dico_stores, dico_helios
-    global _ol_igs_cache
-    global _data_mtimes
-
-    with _reload_lock:
-        mtimes = {
-            "pudo_directory": _safe_mtime(_parquet_path("pudo_directory")),
-            "stores": _safe_mtime(_parquet_path("stores")),
-            "helios": _safe_mtime(_parquet_path("helios")),
-            "items": _safe_mtime(_parquet_path("items")),
-            "nomenclatures": _safe_mtime(_parquet_path("nomenclatures")),
-            "manufacturers": _safe_mtime(_parquet_path("manufacturers")),
-            "equivalents": _safe_mtime(_parquet_path("equivalents")),
-            "stats_exit": _safe_mtime(_parquet_path("stats_exit")),
-            "items_parent_buildings": _safe_mtime(_parquet_path("items_parent_buildings")),
-            "items_son_buildings": _safe_mtime(_parquet_path("items_son_buildings")),
-        }
-
-        if (not force) and _data_mtimes and mtimes == _data_mtimes:
-            return False
-
-        def _read_or_empty(p: str) -> pl.DataFrame:
-            try:
-                return pl.read_parquet(p)
-            except Exception:
-                return pl.DataFrame()
-
-        pudos = _read_or_empty(_parquet_path("pudo_directory"))
-        stores = _read_or_empty(_parquet_path("stores"))
-        helios = _read_or_empty(_parquet_path("helios"))
-        items = _read_or_empty(_parquet_path("items"))
-        nomenclatures = _read_or_empty(_parquet_path("nomenclatures"))
-        manufacturers = _read_or_empty(_parquet_path("manufacturers"))
-        equivalents = _read_or_empty(_parquet_path("equivalents"))
-
-        stats_exit = _read_or_empty(_parquet_path("stats_exit"))
-        try:
-            stats_exit = stats_exit.with_columns(pl.col("date_mvt").dt.year().alias("annee"))
-        except Exception:
-            pass
-
-        items_parent_buildings = _read_or_empty(_parquet_path("items_parent_buildings"))
-        items_son_buildings = _read_or_empty(_parquet_path("items_son_buildings"))
-
-        dico_stores = (
-            {row["code_magasin"]: row for row in stores.iter_rows(named=True)}
-            if (not stores.is_empty()) and ("code_magasin" in stores.columns)
-            else {}
-        )
-        dico_helios = (
-            {row["code_ig"]: row for row in helios.iter_rows(named=True)}
-            if (not helios.is_empty()) and ("code_ig" in helios.columns)
-            else {}
-        )
-
-        # caches dérivés
-        _ol_igs_cache = None
-
-        _data_mtimes = mtimes
-        return True
-
-
-def haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371.0
-    lat1 = radians(lat1)
-    lon1 = radians(lon1)
-    lat2 = radians(lat2)
-    lon2 = radians(lon2)
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
+    return get_data_store().reload(force=force)
 
 
 def _get_col_name(df: pl.DataFrame, candidates: list[str]) -> str | None:
@@ -127,8 +46,8 @@ def _get_col_name(df: pl.DataFrame, candidates: list[str]) -> str | None:
     return None
 
 
-# Initialisation des variables globales (au démarrage)
-reload_data(force=True)
+# Initialisation des données (au démarrage)
+get_data_store()
 
 
 def _load_distance_tech_pr_df(force: bool = False) -> pl.DataFrame | None:
@@ -202,67 +121,79 @@ def get_distance_tech_pr_for_store(code_magasin: str, code_pr: str | None = None
     return sub
 
 
-def get_available_pudo(lat, long, radius, enseignes: list[str] | None = None):
-    pudos_filtered = pudos.filter(pl.col("latitude").is_not_null())
-    pudos_filtered = (
-        pudos_filtered
-        .with_columns(
-            pl.struct(["latitude", "longitude"]).map_elements(
-                lambda row: haversine_distance(
-                    float(lat),
-                    float(long),
-                    float(row["latitude"]),
-                    float(row["longitude"]),
-                ),
-                return_dtype=pl.Float32,
-            ).alias("distance")
-        )
-        .filter(pl.col("distance") <= float(radius))
-    )
+_PUDO_SEARCH_COLS = [
+    "code_point_relais",
+    "enseigne",
+    "adresse_1",
+    "code_postal",
+    "ville",
+    "categorie_pr_chronopost",
+    "nom_prestataire",
+    "distance",
+    "latitude",
+    "longitude",
+]
+
+
+def _enseignes_mask(enseignes: list[str]) -> pl.Expr | None:
+    """Expression de filtre des PR correspondant aux enseignes demandées (insensible à la casse)."""
+    wanted = {e.strip().lower() for e in enseignes if e}
+    cat = pl.col("categorie_pr_chronopost").cast(pl.Utf8).str.to_lowercase()
+    prest = pl.col("nom_prestataire").cast(pl.Utf8).str.to_lowercase()
+    conds = []
+    if "chronopost 9h00" in wanted:
+        conds.append(cat.is_in(["c9", "c9_c13"]))
+    if "chronopost 13h00" in wanted:
+        conds.append(cat.is_in(["c9_c13", "c13"]))
+    if "lm2s" in wanted:
+        conds.append(prest == "lm2s")
+    if "tdf" in wanted:
+        conds.append(prest == "tdf")
+    if not conds:
+        return None
+    return pl.any_horizontal(conds).fill_null(False)
+
+
+def get_available_pudo(lat, long, radius, enseignes: list[str] | None = None) -> pl.DataFrame:
+    """Retourne les PR à moins de ``radius`` km du point, triés par distance.
+
+    Si ``enseignes`` est fourni, seuls les PR de ces enseignes sont retenus
+    (même filtre que ``get_nearest_pudo``) ; sinon tous les PR du rayon.
+    """
+    snap = current_snapshot()
+    pudos = snap.pudos
+    if pudos.is_empty():
+        return pl.DataFrame()
+    mask = _enseignes_mask(enseignes) if enseignes else None
+    if enseignes and mask is None:
+        return pl.DataFrame()
+    df = radius_search(pudos, snap.derived_or_none("geo_pudos"), float(lat), float(long), float(radius))
+    if mask is not None:
+        df = df.filter(mask)
+    return df.select([c for c in _PUDO_SEARCH_COLS if c in df.columns])
 
-    df = pl.DataFrame()
-    if enseignes:
-        # Normaliser les valeurs demandées (insensible à la casse)
-        wanted = {e.strip().lower() for e in enseignes if e}
-
-        # Préparer des colonnes en minuscules pour les comparaisons texte
-        pudos_lc = pudos_filtered.with_columns([
-            pl.col("categorie_pr_chronopost").cast(pl.Utf8).str.to_lowercase().alias("_cat_lc"),
-            pl.col("nom_prestataire").cast(pl.Utf8).str.to_lowercase().alias("_prest_lc"),
-        ])
-
-        if "chronopost 9h00" in wanted:
-            df = pl.concat([
-                df,
-                pudos_lc.filter(pl.col("_cat_lc").is_in(["c9", "c9_c13"]))
-            ])
-        if "chronopost 13h00" in wanted:
-            df = pl.concat([
-                df,
-                pudos_lc.filter(pl.col("_cat_lc").is_in(["c9_c13", "c13"]))
-            ])
-        if "lm2s" in wanted:
-            df = pl.concat([
-                df,
-                pudos_lc.filter(pl.col("_prest_lc") == "lm2s")
-            ])
-        if "tdf" in wanted:
-            df = pl.concat([
-                df,
-                pudos_lc.filter(pl.col("_prest_lc") == "tdf")
-            ])
-
-        if not df.is_empty():
-            df = df.select(pl.col("code_point_relais", "enseigne", "adresse_1", "code_postal", "ville", "categorie_pr_chronopost", "nom_prestataire", "distance", "latitude", "longitude"))
-
-        return df
+
+def get_nearest_pudo(lat, long, n: int = 10, enseignes: list[str] | None = None) -> pl.DataFrame:
+    """Retourne les ``n`` PR les plus proches du point (sans rayon), triés par distance.
+
+    Si ``enseignes`` est fourni, seuls les PR de ces enseignes sont candidats.
+    """
+    snap = current_snapshot()
+    pudos = snap.pudos
+    if pudos.is_empty():
+        return pl.DataFrame()
+    mask = _enseignes_mask(enseignes) if enseignes else None
+    if enseignes and mask is None:
+        return pl.DataFrame()
+    df = nearest_search(pudos, snap.derived_or_none("geo_pudos"), float(lat), float(long), int(n), mask)
+    return df.select([c for c in _PUDO_SEARCH_COLS if c in df.columns])
 
 
 def get_coords_for_ig(code_ig: str):
     if not code_ig:
         return None
     code = code_ig.strip().upper()
-    row = dico_helios.get(code)
+    row = current_snapshot().dico_helios.get(code)
     if not row:
         return None
     lat = row.get("latitude")
@@ -287,22 +218,43 @@ def get_coords_for_ig(code_ig: str):
     }
 
 
+def _store_types_mask(types: list[str] | None) -> pl.Expr | None:
+    if not types:
+        return None
+    wanted = {t.strip().lower() for t in types}
+    return pl.col("type_de_depot").str.to_lowercase().is_in(list(wanted)).fill_null(False)
+
+
 def get_nearby_stores(lat: float, lon: float, radius_km: float, types: list[str] | None = None):
-    if 'stores' not in locals() and 'stores' not in globals():
+    snap = current_snapshot()
+    stores = snap.stores
+    if stores.is_empty():
         return None
-    df = stores.filter(
-        pl.col("latitude_right").is_not_null() & pl.col("longitude_right").is_not_null()
-    ).with_columns(
-        pl.struct(["latitude_right", "longitude_right"]).map_elements(
-            lambda row: haversine_distance(lat, lon, float(row["latitude_right"]), float(row["longitude_right"])) ,
-            return_dtype=pl.Float32,
-        ).alias("distance")
-    ).filter(pl.col("distance") <= float(radius_km))
-
-    if types:
-        wanted = {t.strip().lower() for t in types}
-        df = df.filter(pl.col("type_de_depot").str.to_lowercase().is_in(list(wanted)))
+    df = radius_search(
+        stores, snap.derived_or_none("geo_stores"), float(lat), float(lon), float(radius_km),
+        "latitude_right", "longitude_right",
+    )
+
+    mask = _store_types_mask(types)
+    if mask is not None:
+        df = df.filter(mask)
+    return _select_nearby_store_cols(df)
+
+
+def get_nearest_stores(lat: float, lon: float, n: int = 10, types: list[str] | None = None):
+    """Retourne les ``n`` magasins les plus proches du point (sans rayon), triés par distance."""
+    snap = current_snapshot()
+    stores = snap.stores
+    if stores.is_empty():
+        return None
+    df = nearest_search(
+        stores, snap.derived_or_none("geo_stores"), float(lat), float(lon), int(n),
+        _store_types_mask(types), "latitude_right", "longitude_right",
+    )
+    return _select_nearby_store_cols(df)
+
 
+def _select_nearby_store_cols(df: pl.DataFrame) -> pl.DataFrame:
     if "adresse_1" not in df.columns and "adresse1" in df.columns:
         df = df.with_columns(pl.col("adresse1").alias("adresse_1"))
     if "adresse_2" not in df.columns and "adresse2" in df.columns:
@@ -323,9 +275,90 @@ def get_nearby_stores(lat: float, lon: float, radius_km: float, types: list[str]
     return df.select(existing)
 
 
+def _coded_points(df: pl.DataFrame, code_col: str, lat_col: str, lon_col: str, codes: list[str] | None) -> tuple[pl.DataFrame, list[str]]:
+    """Points ``id, latitude, longitude`` pour les codes demandés (tous si ``codes`` est None).
+
+    L'ordre des codes demandés est conservé ; les codes inconnus ou sans
+    coordonnées sont renvoyés à part.
+    """
+    empty = pl.DataFrame(schema={"id": pl.Utf8, "latitude": pl.Float64, "longitude": pl.Float64})
+    if df.is_empty() or any(c not in df.columns for c in (code_col, lat_col, lon_col)):
+        return empty, [str(c) for c in (codes or [])]
+    points = (
+        df.select(
+            pl.col(code_col).cast(pl.Utf8).str.strip_chars().alias("id"),
+            pl.col(lat_col).cast(pl.Float64, strict=False).alias("latitude"),
+            pl.col(lon_col).cast(pl.Float64, strict=False).alias("longitude"),
+        )
+        .filter(
+            pl.col("id").is_not_null()
+            & pl.col("latitude").is_between(-90.0, 90.0)
+            & pl.col("longitude").is_between(-180.0, 180.0)
+        )
+        .unique(subset="id", keep="first", maintain_order=True)
+    )
+    if codes is None:
+        return points, []
+    wanted = pl.DataFrame({"id": [str(c).strip() for c in codes]}, schema={"id": pl.Utf8}).unique(maintain_order=True)
+    found = wanted.join(points, on="id", how="left", maintain_order="left")
+    missing = found.filter(pl.col("latitude").is_null())["id"].to_list()
+    return found.filter(pl.col("latitude").is_not_null()), missing
+
+
+def get_store_points(codes: list[str] | None) -> tuple[pl.DataFrame, list[str]]:
+    """Coordonnées des magasins (``code_magasin``) et liste des codes non résolus."""
+    return _coded_points(current_snapshot().stores, "code_magasin", "latitude_right", "longitude_right", codes)
+
+
+def get_pudo_points(codes: list[str] | None) -> tuple[pl.DataFrame, list[str]]:
+    """Coordonnées des points relais (``code_point_relais``) et liste des codes non résolus."""
+    return _coded_points(current_snapshot().pudos, "code_point_relais", "latitude", "longitude", codes)
+
+
+def coordinate_points(items: list) -> tuple[pl.DataFrame, list]:
+    """Points fournis directement : ``{"id"?, "lat", "lon"}`` ou ``[lat, lon]``.
+
+    Sans ``id``, la position dans la liste sert d'identifiant. Les entrées
+    invalides sont renvoyées à part.
+    """
+    ids, lats, lons, invalid = [], [], [], []
+    for pos, item in enumerate(items or []):
+        try:
+            if isinstance(item, dict):
+                lat = float(item.get("lat", item.get("latitude")))
+                lon = float(item.get("lon", item.get("longitude")))
+                ident = item.get("id")
+            else:
+                lat, lon = float(item[0]), float(item[1])
+                ident = None
+        except Exception:
+            invalid.append(item)
+            continue
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+            invalid.append(item)
+            continue
+        ids.append(str(ident) if ident is not None else str(pos))
+        lats.append(lat)
+        lons.append(lon)
+    df = pl.DataFrame(
+        {"id": ids, "latitude": lats, "longitude": lons},
+        schema={"id": pl.Utf8, "latitude": pl.Float64, "longitude": pl.Float64},
+    )
+    return df, invalid
+
+
+def iter_distance_matrix(origins: pl.DataFrame, destinations: pl.DataFrame, top_k: int | None = None) -> Iterator[pl.DataFrame]:
+    """Matrice des distances à vol d'oiseau (km), par blocs de lignes (voir ``pairwise_distances``).
+
+    Les blocs restent des DataFrames : la sérialisation JSON est faite par Polars.
+    """
+    yield from pairwise_distances(origins, destinations, top_k=top_k)
+
+
 def get_store_contacts(max_items: int | None = None, query: str | None = None, depot_types: list[str] | None = None) -> list[dict]:
     results: list[dict] = []
-    if 'stores' not in locals() and 'stores' not in globals():
+    stores = current_snapshot().stores
+    if stores.is_empty():
         return results
     q = (query or "").strip().lower()
     types_set = {t.strip().lower() for t in depot_types} if depot_types else None
@@ -381,7 +414,8 @@ def get_store_contacts(max_items: int | None = None, query: str | None = None, d
 
 
 def get_store_types() -> list[str]:
-    if 'stores' not in locals() and 'stores' not in globals():
+    stores = current_snapshot().stores
+    if stores.is_empty():
         return []
     try:
         vals = (
@@ -407,7 +441,8 @@ def get_ol_technicians() -> list[dict]:
     Filtre : type_de_depot ∈ {"REO", "EMBARQUE", "EXPERT"}
     """
     results: list[dict] = []
-    if "stores" not in globals() and "stores" not in locals():
+    stores = current_snapshot().stores
+    if stores.is_empty():
         return results
 
     allowed_types = {"reo", "embarque", "expert"}
@@ -485,14 +520,10 @@ def get_pudo_postal_address(code_point_relais: str) -> dict | None:
     """
     if not code_point_relais:
         return None
-    if "pudos" not in globals() and "pudos" not in locals():
-        return None
     try:
-        df = pudos
-        match = df.filter(pl.col("code_point_relais") == code_point_relais)
-        if match.height == 0:
+        row = current_snapshot().row_by_key("pudos", code_point_relais)
+        if row is None:
             return None
-        row = match.row(0, named=True)
 
         def pick(keys: list[str]):
             for k in keys:
@@ -519,20 +550,20 @@ def get_pudo_postal_address(code_point_relais: str) -> dict | None:
 def get_ol_igs() -> list[dict]:
     """Retourne la liste des codes IG utilisables pour l'OL mode dégradé.
 
-    Source : helios.parquet (via la variable globale helios / dico_helios).
+    Source : helios.parquet (via le DataStore partagé).
     """
     global _ol_igs_cache
 
-    # Si déjà calculé, on renvoie directement le cache
-    if _ol_igs_cache is not None:
-        return _ol_igs_cache
+    snap = current_snapshot()
+    version = snap.version
+
+    # Si déjà calculé pour ces données, on renvoie directement le cache
+    if _ol_igs_cache is not None and _ol_igs_cache[0] == version:
+        return _ol_igs_cache[1]
 
     results: list[dict] = []
-    if "helios" not in globals() and "helios" not in locals():
-        return results
-    try:
-        df = helios
-    except Exception:
+    df = snap.helios
+    if df.is_empty():
         return results
 
     try:
@@ -554,7 +585,7 @@ def get_ol_igs() -> list[dict]:
             results.sort(key=lambda r: str(r.get("code_ig") or "").casefold())
         except Exception:
             pass
-        _ol_igs_cache = results
+        _ol_igs_cache = (version, results)
         return results
     except Exception:
         return []
@@ -597,8 +628,9 @@ def get_ol_stores() -> list[dict]:
     Chaque entrée contient au minimum : code_magasin, type_de_depot, adresse_postale.
     """
     results: list[dict] = []
-    if "stores" not in globals() and "stores" not in locals():
-      return results
+    stores = current_snapshot().stores
+    if stores.is_empty():
+        return results
 
     allowed = {"national", "local"}
     try:
@@ -655,17 +687,8 @@ def get_ol_stores() -> list[dict]:
 
 def get_manufacturers_for(code_article: str) -> list[dict]:
     out: list[dict] = []
-    #if 'manufacturers' not in globals() or manufacturers.is_empty():
-        #return out
-    key_cols = [c for c in ["code_article"] if c in manufacturers.columns]
-    if not key_cols:
-        return out
     try:
-        norm = str(code_article).strip().upper()
-        df = manufacturers.filter(pl.any_horizontal([
-            pl.col(c) == norm
-            for c in key_cols
-        ]))
+        df = current_snapshot().match_normalized("manufacturers", "code_article", code_article)
         out = [r for r in df.iter_rows(named=True)]
     except Exception:
         out = []
@@ -673,14 +696,16 @@ def get_manufacturers_for(code_article: str) -> list[dict]:
 
 
 def get_item_by_code(code_article: str) -> dict | None:
-    if 'items' not in globals() or items.is_empty():
+    snap = current_snapshot()
+    items = snap.items
+    if items.is_empty():
         return None
     try:
-        norm = str(code_article).strip().upper()
+        norm = norm_text(code_article)
 
         if "code_article" in items.columns:
             try:
-                df = items.filter(pl.col("code_article").cast(pl.Utf8).str.strip_chars().str.to_uppercase() == norm)
+                df = snap.match_normalized("items", "code_article", norm)
                 if df.height > 0:
                     row = df.row(0, named=True)
                     row["__matched_by"] = "code_article"
@@ -688,32 +713,21 @@ def get_item_by_code(code_article: str) -> dict | None:
             except Exception:
                 pass
 
-        # 1) Tentative d'égalité stricte sur toutes les colonnes
-        for col in items.columns:
-            try:
-                if col == "code_article":
-                    continue
-                df = items.filter(
-                    pl.col(col).cast(pl.Utf8).str.strip_chars().str.to_uppercase() == norm
-                )
-                if df.height > 0:
-                    row = df.row(0, named=True)
-                    row["__matched_by"] = col
-                    return row
-            except Exception:
-                continue
+        # 1) Tentative d'égalité stricte sur toutes les autres colonnes (un seul passage)
+        try:
+            found = snap.match_any_column("items", norm, [c for c in items.columns if c != "code_article"])
+            if found is not None:
+                col, row = found
+                row["__matched_by"] = col
+                return row
+        except Exception:
+            pass
 
-        # 2) Fallback: recherche plein texte (contains) sur concat de toutes les colonnes
+        # 2) Fallback: recherche plein texte via l'index items_text
         try:
-            df = items
-            exprs = [
-                pl.col(c).cast(pl.Utf8).fill_null("").str.to_uppercase()
-                for c in df.columns
-            ]
-            hay = pl.concat_str(exprs, separator=" ").alias("__haystack")
-            df2 = df.with_columns(hay).filter(pl.col("__haystack").str.contains(norm))
-            if df2.height > 0:
-                row = df2.drop("__haystack").row(0, named=True)
+            offsets = snap.derived_index("items_text").search(norm, limit=1)
+            if offsets:
+                row = items.row(offsets[0], named=True)
                 row["__matched_by"] = "__haystack_contains__"
                 return row
         except Exception:
@@ -725,17 +739,19 @@ def get_item_by_code(code_article: str) -> dict | None:
 
 
 def get_item_by_code_strict(code_article: str) -> dict | None:
-    if 'items' not in globals() or items.is_empty():
+    snap = current_snapshot()
+    items = snap.items
+    if items.is_empty():
         return None
     try:
-        norm = str(code_article).strip().upper()
+        norm = norm_text(code_article)
         if not norm:
             return None
 
         if "code_article" not in items.columns:
             return None
 
-        df = items.filter(pl.col("code_article").cast(pl.Utf8).str.strip_chars().str.to_uppercase() == norm)
+        df = snap.match_normalized("items", "code_article", norm)
         if df.height <= 0:
             return None
         row = df.row(0, named=True)
@@ -752,17 +768,20 @@ def get_equivalents_for(code_article: str) -> list[dict]:
       - filtrer equivalents sur la colonne "code_article" == code_article fourni
       - renvoyer les lignes telles quelles (plus un champ __matched_by pour info)
     """
-    if 'equivalents' not in globals() or equivalents.is_empty():
+    snap = current_snapshot()
+    equivalents = snap.equivalents
+    items = snap.items
+    if equivalents.is_empty():
         return []
 
     try:
-        df = equivalents.filter(pl.col("code_article") == code_article)
+        df = snap.match_normalized("equivalents", "code_article", code_article)
     except Exception:
         return []
 
     # Enrichir avec le libellé de chaque code_article_correspondant depuis items
     try:
-        if 'items' in globals() and not items.is_empty() and "code_article_correspondant" in df.columns:
+        if not items.is_empty() and "code_article_correspondant" in df.columns:
             if "code_article" in items.columns and "libelle_court_article" in items.columns:
                 df_items = items.select(
                     [
@@ -799,7 +818,8 @@ def get_pudo_directory() -> list[dict]:
       - ville
       - label (code - enseigne - ville)
     """
-    if "pudos" not in globals() or pudos.is_empty():
+    pudos = current_snapshot().pudos
+    if pudos.is_empty():
         return []
 
     cols = []
@@ -975,13 +995,15 @@ def save_pr_overrides_for_store(code_magasin: str, payload: dict) -> dict:
 def get_store_details(code_magasin: str) -> dict | None:
     if not code_magasin:
         return None
-    row = dico_stores.get(code_magasin) if 'dico_stores' in globals() else None
+    snap = current_snapshot()
+    pudos = snap.pudos
+    dico_helios = snap.dico_helios
+    row = snap.dico_stores.get(code_magasin)
     if row is None:
         try:
-            match = stores.filter(pl.col("code_magasin") == code_magasin)
-            if match.height == 0:
+            row = snap.row_by_key("stores", code_magasin)
+            if row is None:
                 return None
-            row = match.row(0, named=True)
         except Exception:
             return None
 
@@ -1022,11 +1044,10 @@ def get_store_details(code_magasin: str) -> dict | None:
         norm_code_ig = str(code_ig_val).strip().upper()
         is_pudo_style = bool(re.fullmatch(r"S\d{4}", norm_code_ig))
 
-        if is_pudo_style and ("pudos" in globals() or "pudos" in locals()):
+        if is_pudo_style and not pudos.is_empty():
             try:
-                match = pudos.filter(pl.col("code_point_relais") == norm_code_ig)
-                if match.height > 0:
-                    prow = match.row(0, named=True)
+                prow = snap.row_by_key("pudos", norm_code_ig)
+                if prow is not None:
                     def _pick_pr(keys: list[str]):
                         for k in keys:
                             v = prow.get(k)
@@ -1042,7 +1063,7 @@ def get_store_details(code_magasin: str) -> dict | None:
             except Exception:
                 pass
 
-        if "adresse_ig" not in details and 'dico_helios' in globals():
+        if "adresse_ig" not in details:
             hrow = dico_helios.get(norm_code_ig)
             if hrow:
                 adr = hrow.get("adresse") or ""
@@ -1061,7 +1082,10 @@ def get_store_details(code_magasin: str) -> dict | None:
 
 def list_technician_pudo_assignments() -> list[dict]:
     rows: list[dict] = []
-    if 'stores' not in globals():
+    snap = current_snapshot()
+    stores = snap.stores
+    pudos = snap.pudos
+    if stores.is_empty():
         return rows
 
     overrides_df = _load_pr_overrides_df()
@@ -1166,72 +1190,38 @@ def list_technician_pudo_assignments() -> list[dict]:
 
 
 def search_items(query: str | None, max_rows: int = 200) -> pl.DataFrame | None:
-    if 'items' not in globals():
-        return None
+    snap = current_snapshot()
     q = (query or '').strip().lower()
     if not q:
         return pl.DataFrame()
-    df = items
     try:
-        exprs = [pl.col(c).cast(pl.Utf8).fill_null("").str.to_lowercase() for c in df.columns]
-        hay = pl.concat_str(exprs, separator=" ").alias("__haystack")
-        out = (
-            df.with_columns(hay)
-              .filter(pl.col("__haystack").str.contains(q))
-              .drop("__haystack")
-              .head(max_rows)
-        )
-        return out
+        index = snap.derived_index("items_text")
+        return take_rows(snap.items, index.search(q, limit=max_rows))
     except Exception:
         return pl.DataFrame()
 
 
 def get_items_columns() -> list[str]:
-    if 'items' not in globals():
-        return []
     try:
-        return list(items.columns)
+        return list(current_snapshot().items.columns)
     except Exception:
         return []
 
 
 def search_items_advanced(global_query: str | None, col_filters: dict[str, str] | None, max_rows: int = 300) -> pl.DataFrame | None:
-    if 'items' not in globals():
-        return None
-    df = items
+    """Recherche catalogue : requête globale (index plein texte articles + fabricants) et filtres par colonne.
 
-    # Intégrer les informations fournisseurs dans la recherche globale si disponibles
-    try:
-        if 'manufacturers' in globals() and not manufacturers.is_empty() and "code_article" in manufacturers.columns and "code_article" in df.columns:
-            mf = manufacturers
-            text_cols = [c for c in mf.columns if c != "code_article"]
-            if text_cols:
-                mf_tmp = mf.select(
-                    [
-                        pl.col("code_article"),
-                        *[pl.col(c).cast(pl.Utf8).fill_null("").str.to_lowercase().alias(c) for c in text_cols],
-                    ]
-                )
-                mf_tmp = mf_tmp.with_columns(
-                    pl.concat_str([pl.col(c) for c in text_cols], separator=" ").alias("__mf_text")
-                )
-                mf_agg = (
-                    mf_tmp
-                    .group_by("code_article")
-                    .agg(pl.col("__mf_text").str.concat(" "))
-                    .select(["code_article", pl.col("__mf_text").alias("__mf_text_suppliers")])
-                )
-                df = df.join(mf_agg, on="code_article", how="left")
-    except Exception:
-        pass
+    La requête globale est résolue par l'index ``items_text`` du snapshot (tous
+    les termes doivent apparaître, résultats classés par pertinence) ; les
+    filtres par colonne ne sont ensuite appliqués qu'aux lignes candidates.
+    """
+    snap = current_snapshot()
+    df = snap.items
     try:
-        filters = []
         gq = (global_query or '').strip().lower()
         if gq:
-            exprs = [pl.col(c).cast(pl.Utf8).fill_null("").str.to_lowercase() for c in df.columns]
-            hay = pl.concat_str(exprs, separator=" ").alias("__haystack")
-            df = df.with_columns(hay)
-            filters.append(pl.col("__haystack").str.contains(gq))
+            df = take_rows(df, snap.derived_index("items_text").search(gq))
+        filters = []
         if col_filters:
             for col, val in col_filters.items():
                 if not val:
@@ -1245,17 +1235,15 @@ def search_items_advanced(global_query: str | None, col_filters: dict[str, str]
             for f in filters[1:]:
                 combined = combined & f
             df = df.filter(combined)
-        if "__haystack" in df.columns:
-            df = df.drop("__haystack")
         return df.head(max_rows)
     except Exception:
         return pl.DataFrame()
 
 
 def stats_exit_items(item_code: str, type_exit: str | list[str] | None = None) -> pl.DataFrame:
-    if 'stats_exit' not in globals():
+    df = current_snapshot().stats_exit
+    if df.is_empty():
         return pl.DataFrame()
-    df = stats_exit
     try:
         expr = pl.col("code_article") == item_code
         if type_exit is not None:
@@ -1277,9 +1265,9 @@ def stats_exit_items(item_code: str, type_exit: str | list[str] | None = None) -
 
 
 def stats_exit_items_monthly(item_code: str, type_exit: str | list[str] | None = None) -> pl.DataFrame:
-    if 'stats_exit' not in globals():
+    df = current_snapshot().stats_exit
+    if df.is_empty():
         return pl.DataFrame()
-    df = stats_exit
     try:
         current_year = datetime.datetime.now().year
         if "mois" not in df.columns:
@@ -0,0 +1,13 @@
+"""Configuration commune des tests.
+
+L'import de ``supplychain_app`` initialise les journaux et le DataStore à partir
+des chemins de ``constants`` (``D:\\Datan``) : hors poste Windows, ces chemins
+relatifs seraient créés dans le dépôt. Les tests s'exécutent donc depuis un
+dossier temporaire (avant l'import des modules de test).
+"""
+import os
+import tempfile
+
+
+def pytest_sessionstart(session):
+    os.chdir(tempfile.mkdtemp(prefix="scapp-tests-"))
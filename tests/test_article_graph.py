@@ -0,0 +1,51 @@
+import polars as pl
+
+from supplychain_app.core.article_graph import ArticleGraph, BOM_CHILD, EQUIV
+
+NOMENCLATURES = pl.DataFrame({
+    "article": ["A", "B", "C", "D"],
+    "article_eqpt_article_fils": ["B", "C", "D", "E"],
+    "art_et_art_fils_eqpt_quantite": [1.0, 1.0, 1.0, 1.0],
+})
+EQUIVALENTS = pl.DataFrame({"code_article": ["A"], "code_article_correspondant": ["A2"]})
+
+
+def _graph() -> ArticleGraph:
+    return ArticleGraph.from_frames(NOMENCLATURES, EQUIVALENTS)
+
+
+def test_depth_limits_hops():
+    result = _graph().neighborhood("A", depth=2, kinds=(BOM_CHILD, EQUIV))
+    assert {n["id"] for n in result["nodes"]} == {"A", "B", "C", "A2"}
+
+
+def test_no_depth_returns_the_full_tree():
+    result = _graph().neighborhood("a", depth=None, kinds=(BOM_CHILD, EQUIV))
+    assert {n["id"] for n in result["nodes"]} == {"A", "B", "C", "D", "E", "A2"}
+    assert not result["truncated"]
+    assert {"from": "D", "to": "E", "type": "bom"} in result["edges"]
+
+
+def test_caps_still_apply_without_depth():
+    result = _graph().neighborhood("A", depth=None, max_nodes=3, kinds=(BOM_CHILD, EQUIV))
+    assert len(result["nodes"]) == 3
+    assert result["truncated"]
+
+
+def test_equiv_depth_keeps_only_the_root_equivalents():
+    # A -> B -> C, B ≡ X, X -> Y, A ≡ A2, A2 -> Z
+    graph = ArticleGraph.from_frames(
+        pl.DataFrame({
+            "article": ["A", "B", "X", "A2"],
+            "article_eqpt_article_fils": ["B", "C", "Y", "Z"],
+            "art_et_art_fils_eqpt_quantite": [1.0, 1.0, 1.0, 1.0],
+        }),
+        pl.DataFrame({"code_article": ["B", "A"], "code_article_correspondant": ["X", "A2"]}),
+    )
+    result = graph.neighborhood("A", depth=None, kinds=(BOM_CHILD, EQUIV), equiv_depth=1)
+    assert {n["id"] for n in result["nodes"]} == {"A", "B", "C", "A2"}
+    assert {(e["from"], e["to"]) for e in result["edges"]} == {("A", "B"), ("B", "C"), ("A", "A2")}
+
+    # Sans equiv_depth : les équivalences sont suivies depuis chaque nœud
+    result = graph.neighborhood("A", depth=None, kinds=(BOM_CHILD, EQUIV))
+    assert {n["id"] for n in result["nodes"]} == {"A", "B", "C", "X", "Y", "A2", "Z"}
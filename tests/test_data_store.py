@@ -0,0 +1,59 @@
+import threading
+import time
+from types import MappingProxyType
+
+import polars as pl
+
+from supplychain_app.data import data_store
+from supplychain_app.data.data_store import DataSnapshot, register_derived
+
+
+def _snapshot() -> DataSnapshot:
+    return DataSnapshot(
+        tables=MappingProxyType({"items": pl.DataFrame({"code_article": ["A"]})}),
+        derived=MappingProxyType({}),
+        signatures=MappingProxyType({}),
+        version="v",
+    )
+
+
+def test_bom_indexes_registered_before_first_load():
+    assert {"bom", "article_graph"} <= set(data_store._DERIVED)
+
+
+def test_lazy_index_built_once_across_threads(monkeypatch):
+    monkeypatch.setattr(data_store, "_DERIVED", dict(data_store._DERIVED))
+    calls = []
+
+    def build(tables):
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    register_derived("test_lazy", ("items",), build)
+    snap = _snapshot()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(snap.derived_index("test_lazy"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len({id(r) for r in results}) == 1
+
+
+def test_lazy_index_failure_is_cached(monkeypatch):
+    monkeypatch.setattr(data_store, "_DERIVED", dict(data_store._DERIVED))
+    calls = []
+
+    def build(tables):
+        calls.append(1)
+        raise ValueError("boom")
+
+    register_derived("test_failing", ("items",), build)
+    snap = _snapshot()
+
+    assert snap.derived_or_none("test_failing") is None
+    assert snap.derived_or_none("test_failing") is None
+    assert len(calls) == 1
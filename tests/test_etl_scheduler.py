@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+from supplychain_app.data import etl_scheduler
+from supplychain_app.data.etl_scheduler import EtlScheduler
+
+
+class _FakeEtl:
+    """update_data / reload_data factices : chaque exécution attend ``release``."""
+
+    def __init__(self, has_changes: bool = True, fail: bool = False):
+        self.calls: list[set[str] | None] = []
+        self.reloads = 0
+        self.has_changes = has_changes
+        self.fail = fail
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def update_data(self, steps=None):
+        with self._lock:
+            self.calls.append(steps)
+            n = len(self.calls)
+        self.started.set()
+        assert self.release.wait(5)
+        if self.fail:
+            raise OSError("share unavailable")
+        return {"run": n, "steps": sorted(steps) if steps is not None else None}
+
+    def summary(self):
+        return {"has_changes": self.has_changes}
+
+    def reload_data(self):
+        self.reloads += 1
+        return True
+
+
+@pytest.fixture
+def etl(monkeypatch):
+    fake = _FakeEtl()
+    monkeypatch.setattr(etl_scheduler, "update_data", fake.update_data)
+    monkeypatch.setattr(etl_scheduler, "get_last_update_summary", fake.summary)
+    monkeypatch.setattr(etl_scheduler, "reload_data", fake.reload_data)
+    return fake
+
+
+def _in_thread(fn, *args, **kwargs):
+    out: dict = {}
+
+    def run():
+        try:
+            out["result"] = fn(*args, **kwargs)
+        except Exception as e:
+            out["error"] = e
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    return t, out
+
+
+class _ObservedCondition(threading.Condition):
+    """Condition qui signale qu'un appelant s'est mis en attente."""
+
+    def __init__(self):
+        super().__init__()
+        self.waiting = threading.Event()
+
+    def wait_for(self, predicate, timeout=None):
+        self.waiting.set()
+        return super().wait_for(predicate, timeout)
+
+
+def _wait(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_concurrent_manual_runs_share_one_execution(etl):
+    scheduler = EtlScheduler()
+    scheduler._cond = _ObservedCondition()
+    first, out1 = _in_thread(scheduler.run_now, "manual")
+    assert etl.started.wait(5)
+    second, out2 = _in_thread(scheduler.run_now, "manual")
+    assert scheduler._cond.waiting.wait(5)
+    etl.release.set()
+    first.join(5)
+    second.join(5)
+
+    assert etl.calls == [None]
+    assert out1["result"] == out2["result"] == {"run": 1, "steps": None}
+
+
+def test_manual_run_during_partial_run_waits_for_a_full_run(etl):
+    scheduler = EtlScheduler()
+    scheduler.trigger("watch", steps={"stores"})
+    assert etl.started.wait(5)
+    manual, out = _in_thread(scheduler.run_now, "manual")
+    _wait(lambda: scheduler.status()["queued_steps"] == "all")
+    etl.release.set()
+    manual.join(5)
+
+    assert etl.calls == [{"stores"}, None]
+    assert out["result"] == {"run": 2, "steps": None}
+
+
+def test_triggers_during_a_run_are_coalesced(etl):
+    scheduler = EtlScheduler(interval_s=3600, jitter_s=0)
+    scheduler.start()
+    assert etl.started.wait(5)
+    scheduler.trigger("watch", steps={"stores"})
+    scheduler.trigger("watch", steps={"items"})
+    scheduler.trigger("other", steps={"stores"})
+    etl.release.set()
+    _wait(lambda: scheduler.status()["runs"] == 2)
+
+    assert etl.calls == [None, {"stores", "items"}]
+    assert scheduler.status()["last_run"]["trigger"] == "watch+other"
+
+
+def test_reload_only_when_the_etl_changed_something(etl):
+    etl.release.set()
+    scheduler = EtlScheduler()
+    etl.has_changes = False
+    scheduler.run_now("manual")
+    assert etl.reloads == 0
+    etl.has_changes = True
+    scheduler.run_now("manual")
+    assert etl.reloads == 1
+    assert scheduler.status()["last_run"]["reloaded"]
+
+
+def test_failed_run_raises_for_the_caller_and_waiters(etl):
+    etl.fail = True
+    scheduler = EtlScheduler()
+    scheduler._cond = _ObservedCondition()
+    first, out1 = _in_thread(scheduler.run_now, "manual")
+    assert etl.started.wait(5)
+    second, out2 = _in_thread(scheduler.run_now, "manual")
+    assert scheduler._cond.waiting.wait(5)
+    etl.release.set()
+    first.join(5)
+    second.join(5)
+
+    assert isinstance(out1["error"], OSError) and isinstance(out2["error"], OSError)
+    assert scheduler.status()["last_run"]["error"] == "OSError: share unavailable"
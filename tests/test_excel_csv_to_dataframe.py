@@ -0,0 +1,36 @@
+import datetime as dt
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from supplychain_app import excel_csv_to_dataframe
+
+pytest.importorskip("fastexcel")
+openpyxl = pytest.importorskip("openpyxl")
+
+
+@pytest.fixture
+def workbook(tmp_path) -> str:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws.append(["Code", "Qté", "Prix", "Poids", "Date", "N° lot", None])
+    ws.append(["A1", 3, 1.5, 0.25, dt.datetime(2024, 1, 2, 10, 30), 12, "x"])
+    ws.append([12, 4, 2.0, 1.75, dt.datetime(2024, 2, 3), "L7", None])
+    ws.append(["B2", None, 2.25, None, None, 1.5, "y"])
+    wb.save(tmp_path / "data.xlsx")
+    return str(tmp_path)
+
+
+def test_calamine_matches_openpyxl(workbook, monkeypatch):
+    fast = excel_csv_to_dataframe.read_excel(workbook, "data.xlsx", "Data")
+    monkeypatch.setattr(excel_csv_to_dataframe, "_read_excel_calamine", lambda *args: None)
+    slow = excel_csv_to_dataframe.read_excel(workbook, "data.xlsx", "Data")
+
+    assert_frame_equal(fast, slow)
+    assert fast.schema["qte"] == pl.Int64
+    assert fast.schema["poids"] == pl.Float64
+    assert fast.schema["date"] == pl.Datetime("us")
+    assert fast.get_column("prix").to_list() == ["1.5", "2", "2.25"]
+    assert fast.get_column("code").to_list() == ["A1", "12", "B2"]
@@ -0,0 +1,32 @@
+import os
+
+from supplychain_app.data.file_watcher import affected_steps
+
+
+def test_changed_input_selects_its_steps(tmp_path):
+    src = tmp_path / "src"
+    status = [
+        {"key": "stores", "inputs": [str(src / "stores.parquet")], "src_dir": None},
+        {"key": "stock_554", "inputs": [str(src / "554.xlsx"), str(tmp_path / "app" / "stores.parquet")], "src_dir": None},
+        {"key": "items", "inputs": [str(src / "items.parquet")], "src_dir": None},
+    ]
+    assert affected_steps([str(src / "stores.parquet")], status) == {"stores"}
+    assert affected_steps([str(src / "554.xlsx"), str(src / "items.parquet")], status) == {"stock_554", "items"}
+
+
+def test_file_in_a_watched_source_folder_selects_the_step(tmp_path):
+    annuaire = tmp_path / "annuaire"
+    status = [
+        {"key": "pudo_directory", "inputs": [str(annuaire / "annuaire_2024.xlsx")], "src_dir": str(annuaire)},
+        {"key": "stores", "inputs": [str(tmp_path / "stores.parquet")], "src_dir": None},
+    ]
+    # Nouveau fichier d'annuaire (pas encore une entrée connue de l'étape)
+    assert affected_steps([str(annuaire / "annuaire_2025.xlsx")], status) == {"pudo_directory"}
+
+
+def test_unrelated_or_relative_paths(tmp_path, monkeypatch):
+    status = [{"key": "stores", "inputs": [str(tmp_path / "stores.parquet")], "src_dir": None}]
+    assert affected_steps([str(tmp_path / "other.parquet")], status) == set()
+    # Les chemins sont comparés sous forme absolue
+    monkeypatch.chdir(tmp_path)
+    assert affected_steps([os.path.join(".", "stores.parquet")], status) == {"stores"}
@@ -0,0 +1,62 @@
+from math import asin, atan2, cos, degrees, radians, sin
+
+import polars as pl
+import pytest
+
+from supplychain_app.core.geo import EARTH_RADIUS_KM, bounding_box, haversine_distance, pairwise_distances
+
+ORIGINS = pl.DataFrame({
+    "id": ["paris", "lyon", "marseille", "lille", "nantes"],
+    "latitude": [48.8566, 45.7640, 43.2965, 50.6292, 47.2184],
+    "longitude": [2.3522, 4.8357, 5.3698, 3.0573, -1.5536],
+})
+DESTINATIONS = pl.DataFrame({
+    "id": ["bordeaux", "strasbourg", "toulouse"],
+    "latitude": [44.8378, 48.5734, 43.6047],
+    "longitude": [-0.5792, 7.7521, 1.4442],
+})
+
+
+def _expected(o: dict, d: dict) -> float:
+    return round(haversine_distance(o["latitude"], o["longitude"], d["latitude"], d["longitude"]), 3)
+
+
+@pytest.mark.parametrize("chunk_cells", [1, 4, 7, 1_000])
+def test_matrix_rows_follow_origin_and_destination_order(chunk_cells):
+    chunks = list(pairwise_distances(ORIGINS, DESTINATIONS, chunk_cells=chunk_cells))
+    result = pl.concat(chunks)
+
+    assert result.get_column("id").to_list() == ORIGINS.get_column("id").to_list()
+    for o, row in zip(ORIGINS.iter_rows(named=True), result.iter_rows(named=True)):
+        expected = [_expected(o, d) for d in DESTINATIONS.iter_rows(named=True)]
+        assert row["distances"] == pytest.approx(expected, abs=1e-3)
+
+
+def test_top_k_returns_nearest_destinations_sorted():
+    result = pl.concat(list(pairwise_distances(ORIGINS, DESTINATIONS, top_k=2, chunk_cells=4)))
+
+    assert result.get_column("id").to_list() == ORIGINS.get_column("id").to_list()
+    for o, row in zip(ORIGINS.iter_rows(named=True), result.iter_rows(named=True)):
+        ranked = sorted(DESTINATIONS.iter_rows(named=True), key=lambda d: _expected(o, d))[:2]
+        assert row["neighbors"] == [d["id"] for d in ranked]
+        assert row["distances"] == pytest.approx([_expected(o, d) for d in ranked], abs=1e-3)
+
+
+def test_empty_inputs_yield_nothing():
+    assert list(pairwise_distances(ORIGINS.clear(), DESTINATIONS)) == []
+    assert list(pairwise_distances(ORIGINS, DESTINATIONS.clear())) == []
+
+
+@pytest.mark.parametrize("lat", [0.0, 45.0, 48.229, 70.0])
+@pytest.mark.parametrize("radius_km", [0.5, 47.6, 800.0])
+def test_bounding_box_contains_the_whole_circle(lat, radius_km):
+    lat_min, lat_max, lon_min, lon_max = bounding_box(lat, 2.0, radius_km)
+    # Points du cercle à la distance exacte ``radius_km``, tous azimuts
+    for i in range(360):
+        b = radians(i)
+        d = radius_km / EARTH_RADIUS_KM
+        la1 = radians(lat)
+        la2 = asin(sin(la1) * cos(d) + cos(la1) * sin(d) * cos(b))
+        lo2 = 2.0 + degrees(atan2(sin(b) * sin(d) * cos(la1), cos(d) - sin(la1) * sin(la2)))
+        assert lat_min <= degrees(la2) <= lat_max
+        assert lon_min <= lo2 <= lon_max
@@ -0,0 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+
+from supplychain_app.items import Nomenclatures
+
+EDGES = [(f"P{i}", f"P{i + 1}", 2.0) for i in range(30)] + [(f"P{i}", f"S{i}", 1.0) for i in range(30)]
+
+
+def _nomenclatures() -> Nomenclatures:
+    return Nomenclatures.from_dataframe(pl.DataFrame({
+        "article": [p for p, _, _ in EDGES],
+        "article_eqpt_article_fils": [c for _, c, _ in EDGES],
+        "art_et_art_fils_eqpt_quantite": [q for _, _, q in EDGES],
+    }))
+
+
+def test_concurrent_explosions_match_serial_results():
+    codes = [f"P{i}" for i in range(30)] * 8
+    expected = {c: _nomenclatures().explode(c).quantities for c in set(codes)}
+    expected_used = {c: _nomenclatures().where_used(c).quantities for c in set(codes)}
+
+    shared = _nomenclatures()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        explosions = list(pool.map(lambda c: (c, shared.explode(c).quantities), codes))
+        used = list(pool.map(lambda c: (c, shared.where_used(c).quantities), codes))
+
+    assert all(q == expected[c] for c, q in explosions)
+    assert all(q == expected_used[c] for c, q in used)
+    assert expected["P28"] == {"P29": 2.0, "S28": 1.0, "P30": 4.0, "S29": 2.0}
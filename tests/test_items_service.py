@@ -0,0 +1,114 @@
+import polars as pl
+
+from supplychain_app.core.article_graph import ArticleGraph
+from supplychain_app.items import Nomenclatures
+from supplychain_app.services import items_service
+
+
+def _nomenclatures(edges: list[tuple[str, str, float]]) -> Nomenclatures:
+    return Nomenclatures.from_dataframe(pl.DataFrame(
+        {
+            "article": [p for p, _, _ in edges],
+            "article_eqpt_article_fils": [c for _, c, _ in edges],
+            "art_et_art_fils_eqpt_quantite": [q for _, _, q in edges],
+        },
+        schema={"article": pl.Utf8, "article_eqpt_article_fils": pl.Utf8, "art_et_art_fils_eqpt_quantite": pl.Float64},
+    ))
+
+
+def _installed(rows: dict[str, float]):
+    def _get(codes):
+        return pl.DataFrame(
+            {
+                "code_article": [c for c in codes if c in rows],
+                "quantity_active": [rows[c] for c in codes if c in rows],
+                "active_sites": [1 for c in codes if c in rows],
+            },
+            schema={"code_article": pl.Utf8, "quantity_active": pl.Float64, "active_sites": pl.UInt32},
+        )
+    return _get
+
+
+def test_installed_parents_counts_only_top_level_installed_ascendants(monkeypatch):
+    # EQPT contient SUB (x2) qui contient X ; SUB et EQPT sont tous deux au parc
+    nom = _nomenclatures([("EQPT", "SUB", 2.0), ("SUB", "X", 3.0), ("OTHER", "X", 1.0)])
+    monkeypatch.setattr(items_service, "get_nomenclatures", lambda: nom)
+    monkeypatch.setattr(items_service, "get_helios_installed_parents", _installed({"EQPT": 5.0, "SUB": 10.0, "OTHER": 4.0}))
+
+    result = items_service.get_where_used("X")
+
+    rows = {r["code_article"]: r for r in result["ascendants"]}
+    assert rows["EQPT"]["quantite"] == 6.0
+    assert rows["EQPT"]["installe_racine"] and rows["OTHER"]["installe_racine"]
+    assert not rows["SUB"]["installe_racine"]
+    assert result["installed_parents"] == 9.0
+
+
+def test_installed_parents_in_a_cycle_are_counted(monkeypatch):
+    nom = _nomenclatures([("A", "B", 1.0), ("B", "A", 1.0), ("B", "X", 1.0)])
+    monkeypatch.setattr(items_service, "get_nomenclatures", lambda: nom)
+    monkeypatch.setattr(items_service, "get_helios_installed_parents", _installed({"A": 2.0, "B": 3.0}))
+
+    result = items_service.get_where_used("X")
+
+    assert result["installed_parents"] == 5.0
+
+
+def test_network_without_depth_is_the_bom_tree_and_root_equivalents(monkeypatch):
+    # A -> B -> C, B ≡ X, X -> Y : sans depth, ni X ni Y (comme avant le paramètre)
+    graph = ArticleGraph.from_frames(
+        pl.DataFrame({
+            "article": ["A", "B", "X"],
+            "article_eqpt_article_fils": ["B", "C", "Y"],
+            "art_et_art_fils_eqpt_quantite": [1.0, 1.0, 1.0],
+        }),
+        pl.DataFrame({"code_article": ["B", "A"], "code_article_correspondant": ["X", "A2"]}),
+    )
+
+    class _Snapshot:
+        def derived_index(self, name):
+            assert name == "article_graph"
+            return graph
+
+    monkeypatch.setattr(items_service, "current_snapshot", lambda: _Snapshot())
+
+    result = items_service.get_item_network("A", None, 500, 2000)
+    assert {n["id"] for n in result["nodes"]} == {"A", "B", "C", "A2"}
+    result = items_service.get_item_network("A", 2, 500, 2000)
+    assert {n["id"] for n in result["nodes"]} == {"A", "B", "C", "X", "A2"}
+
+
+def test_installed_parents_match_codes_after_normalization(monkeypatch):
+    from supplychain_app.data import pudo_service
+
+    class _Snapshot:
+        items_parent_buildings = pl.DataFrame({
+            "code_ig": ["IG1", "IG2", "IG3"],
+            "code_article_pere": [" Équip  1 ", "equip 1", "AUTRE"],
+            "quantite_pere_actif": [2.0, 3.0, 1.0],
+        })
+
+    monkeypatch.setattr(pudo_service, "current_snapshot", lambda: _Snapshot())
+
+    result = pudo_service.get_helios_installed_parents(["équip 1"])
+    assert result.to_dicts() == [{"code_article": "EQUIP 1", "quantity_active": 5.0, "active_sites": 2}]
+
+
+def test_top_level_installed_matches_the_per_ancestor_definition():
+    import random
+
+    rng = random.Random(5)
+    for _ in range(30):
+        codes = [f"C{i}" for i in range(25)]
+        edges = {(rng.choice(codes), rng.choice(codes)) for _ in range(45)}
+        nom = _nomenclatures([(p, c, 1.0) for p, c in edges if p != c])
+        above = {c: set(nom.where_used(c).levels) for c in codes}
+        for start in codes[:5]:
+            ancestors = above[start]
+            installed = {c for c in ancestors if rng.random() < 0.4}
+            # Définition : aucun ascendant installé strictement au-dessus (hors boucle commune)
+            expected = {
+                c for c in installed
+                if not any(a in installed and c not in above[a] for a in above[c])
+            }
+            assert items_service._top_level_installed(nom.parents_dictionnary, start, installed) == expected
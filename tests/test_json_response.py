@@ -0,0 +1,48 @@
+import datetime as dt
+import json
+
+import polars as pl
+from flask import Flask
+
+from supplychain_app.core.json_response import frame_columns_json, frame_payload, frame_rows_json
+
+FRAME = pl.DataFrame({
+    "code": ["A", "B"],
+    "qte": [1.5, None],
+    "jour": [dt.date(2024, 1, 31), None],
+    "maj": [dt.datetime(2024, 1, 31, 8, 5, 9), dt.datetime(2023, 12, 1)],
+    "maj_utc": pl.Series([dt.datetime(2024, 1, 31, 9, 0)], dtype=pl.Datetime("us", "Europe/Paris")).append(
+        pl.Series([None], dtype=pl.Datetime("us", "Europe/Paris"))
+    ),
+})
+
+
+def test_rows_match_jsonify_output():
+    app = Flask(__name__)
+    with app.app_context():
+        expected = json.loads(app.json.dumps(FRAME.to_dicts()))
+    assert json.loads(frame_rows_json(FRAME)) == expected
+
+
+def test_columns_follow_column_order():
+    data = json.loads(frame_columns_json(FRAME))
+    assert list(data) == FRAME.columns
+    assert data["code"] == ["A", "B"]
+    assert data["qte"] == [1.5, None]
+    assert data["jour"] == ["Wed, 31 Jan 2024 00:00:00 GMT", None]
+
+
+def test_columnar_payload_envelope():
+    body = json.loads(frame_payload(FRAME.select("code", "qte"), {"total": 2, "rows": "ignored"}, columnar=True))
+    assert body == {
+        "total": 2,
+        "format": "columnar",
+        "columns": ["code", "qte"],
+        "data": {"code": ["A", "B"], "qte": [1.5, None]},
+    }
+
+
+def test_empty_frames():
+    assert frame_rows_json(None) == "[]"
+    assert frame_columns_json(None) == "{}"
+    assert json.loads(frame_payload(None, {}, columnar=False)) == {"rows": []}
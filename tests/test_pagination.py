@@ -0,0 +1,87 @@
+import polars as pl
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from supplychain_app.core.pagination import PageError, encode_cursor, page_request, paginate
+
+FRAME = pl.DataFrame({
+    "code": [f"C{i:02d}" for i in range(23)],
+    "ville": [None if i % 5 == 0 else f"V{i % 4}" for i in range(23)],
+})
+
+
+def _walk(data, args: dict, version: str = "v1", query=None) -> list:
+    """Toutes les pages, en suivant ``next_cursor`` jusqu'à la dernière."""
+    pages = []
+    page_args = MultiDict(args)
+    while True:
+        chunk, meta = paginate(data, page_request(page_args, version, query=query))
+        pages.append(chunk)
+        if meta["next_cursor"] is None:
+            return pages
+        page_args = MultiDict({k: v for k, v in args.items() if k != "limit"})
+        page_args["cursor"] = meta["next_cursor"]
+
+
+def test_no_pagination_without_limit_or_cursor():
+    assert page_request(MultiDict({"q": "x"}), "v1") is None
+    data, meta = paginate(FRAME, None)
+    assert data is FRAME and meta is None
+
+
+def test_cursor_round_trip_covers_every_row_once():
+    pages = _walk(FRAME, {"limit": "5", "q": "x"})
+    assert [p.height for p in pages] == [5, 5, 5, 5, 3]
+    assert pl.concat(pages).equals(FRAME)
+
+
+def test_cursor_keeps_sort_with_nulls_last():
+    pages = _walk(FRAME, {"limit": "4", "sort": "-ville,code"})
+    expected = FRAME.sort(["ville", "code"], descending=[True, False], nulls_last=True, maintain_order=True)
+    assert pl.concat(pages).equals(expected)
+
+
+def test_cursor_round_trip_on_rows():
+    pages = _walk(FRAME.to_dicts(), {"limit": "10", "sort": "ville"})
+    assert [len(p) for p in pages] == [10, 10, 3]
+    expected = FRAME.sort("ville", nulls_last=True, maintain_order=True).to_dicts()
+    assert [r for p in pages for r in p] == expected
+
+
+def test_explicit_limit_overrides_cursor_limit():
+    _, meta = paginate(FRAME, page_request(MultiDict({"limit": "5"}), "v1"))
+    page = page_request(MultiDict({"cursor": meta["next_cursor"], "limit": "7"}), "v1")
+    assert (page.offset, page.limit) == (5, 7)
+
+
+def test_cursor_from_other_version_is_expired():
+    _, meta = paginate(FRAME, page_request(MultiDict({"limit": "5"}), "v1"))
+    with pytest.raises(PageError) as err:
+        page_request(MultiDict({"cursor": meta["next_cursor"]}), "v2")
+    assert err.value.code == "cursor_expired" and err.value.status == 409
+
+
+def test_cursor_is_bound_to_its_query_and_sort():
+    page = page_request(MultiDict({"limit": "5", "q": "a"}), "v1", query={"lat": 1})
+    cursor = encode_cursor(page, 5)
+    assert page_request(MultiDict({"cursor": cursor, "q": "a"}), "v1", query={"lat": 1}).offset == 5
+    for args, query in (({"q": "b"}, {"lat": 1}), ({"q": "a"}, {"lat": 2}), ({"q": "a", "sort": "code"}, {"lat": 1})):
+        with pytest.raises(PageError) as err:
+            page_request(MultiDict({**args, "cursor": cursor}), "v1", query=query)
+        assert err.value.code == "invalid_cursor"
+
+
+@pytest.mark.parametrize("args, code", [
+    ({"cursor": "not-a-cursor"}, "invalid_cursor"),
+    ({"limit": "abc"}, "invalid_limit"),
+])
+def test_invalid_parameters(args, code):
+    with pytest.raises(PageError) as err:
+        page_request(MultiDict(args), "v1")
+    assert err.value.code == code
+
+
+def test_unknown_sort_column():
+    with pytest.raises(PageError) as err:
+        paginate(FRAME, page_request(MultiDict({"limit": "5", "sort": "nope"}), "v1"))
+    assert err.value.code == "invalid_sort"
@@ -0,0 +1,113 @@
+import os
+
+import polars as pl
+import pytest
+
+from supplychain_app.data import pudo_etl
+from supplychain_app.data.pudo_etl import _sync_parquet
+
+
+def _write(df: pl.DataFrame, path) -> None:
+    df.write_parquet(path, statistics=True, row_group_size=100)
+
+
+@pytest.fixture
+def frame() -> pl.DataFrame:
+    return pl.DataFrame({"code_article": [f"A{i:04d}" for i in range(300)], "qte": list(range(300))})
+
+
+def _touch(path) -> None:
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+
+def test_first_sync_is_a_full_copy(tmp_path, frame):
+    src, dst = tmp_path / "src.parquet", tmp_path / "dst.parquet"
+    _write(frame, src)
+
+    info = _sync_parquet(str(src), str(dst), None)
+
+    assert info["changed"] and info["mode"] == "full"
+    assert info["source_sha1"]
+    assert pl.read_parquet(dst).equals(frame)
+
+
+def test_touched_source_is_not_copied(tmp_path, frame):
+    src, dst = tmp_path / "src.parquet", tmp_path / "dst.parquet"
+    _write(frame, src)
+    previous = _sync_parquet(str(src), str(dst), None)
+    _touch(src)
+
+    info = _sync_parquet(str(src), str(dst), previous)
+
+    assert not info["changed"] and info["reason"] == "content_unchanged"
+    assert info["source_sha1"] == previous["source_sha1"]
+
+
+def test_identical_footer_with_different_content_is_copied(tmp_path, frame, monkeypatch):
+    src, dst = tmp_path / "src.parquet", tmp_path / "dst.parquet"
+    _write(frame, src)
+    previous = _sync_parquet(str(src), str(dst), None)
+    # Footer identique (collision de signature) mais contenu différent
+    monkeypatch.setattr(pudo_etl, "_parquet_layout", lambda path: previous["parquet"])
+    changed = frame.with_columns(pl.col("qte").reverse())
+    _write(changed, src)
+
+    info = _sync_parquet(str(src), str(dst), previous)
+
+    assert info["changed"] and info["mode"] == "full"
+    assert pl.read_parquet(dst).equals(changed)
+
+
+def test_footer_match_without_recorded_hash_is_copied(tmp_path, frame):
+    src, dst = tmp_path / "src.parquet", tmp_path / "dst.parquet"
+    _write(frame, src)
+    previous = _sync_parquet(str(src), str(dst), None)
+    previous.pop("source_sha1")
+
+    info = _sync_parquet(str(src), str(dst), previous)
+
+    assert info["changed"] and info["mode"] == "full"
+    assert info["source_sha1"]
+
+
+def test_changed_row_group_is_copied_in_full(tmp_path, frame):
+    src, dst = tmp_path / "src.parquet", tmp_path / "dst.parquet"
+    _write(frame, src)
+    previous = _sync_parquet(str(src), str(dst), None)
+    changed = frame.with_columns(pl.when(pl.col("qte") == 250).then(-1).otherwise(pl.col("qte")).alias("qte"))
+    _write(changed, src)
+
+    info = _sync_parquet(str(src), str(dst), previous)
+
+    assert info["changed"] and info["mode"] == "full"
+    assert info["source_sha1"] != previous["source_sha1"]
+    assert pl.read_parquet(dst).equals(changed)
+
+
+def test_row_group_with_same_signature_but_new_content_is_copied(tmp_path):
+    src, dst = tmp_path / "src.parquet", tmp_path / "dst.parquet"
+    before = pl.DataFrame({"code_article": ["A", "B", "C", "D"] * 2, "qte": [1, 2, 3, 4, 5, 7, 5, 7]})
+    after = pl.DataFrame({"code_article": ["A", "B", "C", "D"] * 2, "qte": [1, 2, 3, 9, 7, 5, 5, 7]})
+    before.write_parquet(src, statistics=True, row_group_size=4)
+    previous = _sync_parquet(str(src), str(dst), None)
+    after.write_parquet(src, statistics=True, row_group_size=4)
+    # Second row group : signature de footer inchangée, contenu permuté
+    assert pudo_etl._parquet_layout(str(src))["row_groups"][1] == previous["parquet"]["row_groups"][1]
+
+    info = _sync_parquet(str(src), str(dst), previous)
+
+    assert info["changed"] and info["mode"] == "full"
+    assert pl.read_parquet(dst).equals(after)
+
+
+def test_modified_destination_forces_full_copy(tmp_path, frame):
+    src, dst = tmp_path / "src.parquet", tmp_path / "dst.parquet"
+    _write(frame, src)
+    previous = _sync_parquet(str(src), str(dst), None)
+    _write(frame.head(10), dst)
+
+    info = _sync_parquet(str(src), str(dst), previous)
+
+    assert info["changed"] and info["mode"] == "full"
+    assert pl.read_parquet(dst).equals(frame)
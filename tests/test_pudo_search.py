@@ -0,0 +1,51 @@
+import polars as pl
+import pytest
+
+from supplychain_app.services import pudo_service
+
+
+class _Snapshot:
+    def __init__(self, pudos: pl.DataFrame):
+        self.pudos = pudos
+
+    def derived_or_none(self, name):
+        return None
+
+
+@pytest.fixture
+def pudos(monkeypatch) -> pl.DataFrame:
+    df = pl.DataFrame({
+        "code_point_relais": ["P1", "P2", "P3", "P4"],
+        "enseigne": ["a", "b", "c", "d"],
+        "adresse_1": ["", "", "", ""],
+        "code_postal": ["75001"] * 4,
+        "ville": ["Paris"] * 4,
+        "categorie_pr_chronopost": ["C9_C13", "C13", None, "C9"],
+        "nom_prestataire": ["CHRONOPOST", "CHRONOPOST", "LM2S", "CHRONOPOST"],
+        "latitude": [48.86, 48.80, 48.83, 49.50],
+        "longitude": [2.35, 2.35, 2.35, 2.35],
+    })
+    monkeypatch.setattr(pudo_service, "current_snapshot", lambda: _Snapshot(df))
+    return df
+
+
+def _codes(df: pl.DataFrame) -> list[str]:
+    return df.get_column("code_point_relais").to_list() if not df.is_empty() else []
+
+
+def test_radius_search_keeps_distance_order_without_duplicates(pudos):
+    df = pudo_service.get_available_pudo(48.86, 2.35, 20, ["Chronopost 9h00", "Chronopost 13h00"])
+    assert _codes(df) == ["P1", "P2"]
+    assert df.get_column("distance").is_sorted()
+
+
+def test_without_enseigne_both_modes_return_all_pudos(pudos):
+    assert _codes(pudo_service.get_available_pudo(48.86, 2.35, 100)) == ["P1", "P3", "P2", "P4"]
+    assert _codes(pudo_service.get_nearest_pudo(48.86, 2.35, 10)) == ["P1", "P3", "P2", "P4"]
+
+
+def test_both_modes_apply_the_same_enseigne_filter(pudos):
+    assert _codes(pudo_service.get_available_pudo(48.86, 2.35, 100, ["LM2S"])) == ["P3"]
+    assert _codes(pudo_service.get_nearest_pudo(48.86, 2.35, 10, ["LM2S"])) == ["P3"]
+    assert pudo_service.get_available_pudo(48.86, 2.35, 100, ["inconnue"]).is_empty()
+    assert pudo_service.get_nearest_pudo(48.86, 2.35, 10, ["inconnue"]).is_empty()
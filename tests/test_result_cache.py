@@ -0,0 +1,48 @@
+from flask import Flask
+
+from supplychain_app.core import result_cache
+from supplychain_app.core.result_cache import ResultCache, cache_key, cached_response
+
+
+def test_mapping_key_order_does_not_change_the_key():
+    assert cache_key("ns", {"a": 1, "b": {"y": 2, "x": 3}}, "v") == cache_key("ns", {"b": {"x": 3, "y": 2}, "a": 1}, "v")
+
+
+def test_list_order_is_kept():
+    assert cache_key("ns", {"sort": ["b", "a"]}, "v") != cache_key("ns", {"sort": ["a", "b"]}, "v")
+
+
+def test_explicit_empty_values_are_kept():
+    keys = {cache_key("ns", params, "v") for params in ({}, {"q": ""}, {"q": None}, {"q": []}, {"q": {}})}
+    assert len(keys) == 5
+
+
+def test_strings_are_not_rewritten():
+    assert cache_key("ns", {"q": " A"}, "v") != cache_key("ns", {"q": "A"}, "v")
+
+
+def test_version_and_namespace_are_part_of_the_key():
+    assert cache_key("ns", {}, "v1") != cache_key("ns", {}, "v2")
+    assert cache_key("a", {}, "v") != cache_key("b", {}, "v")
+
+
+def test_vary_value_is_part_of_the_response_key(monkeypatch):
+    monkeypatch.setattr(result_cache, "_cache", ResultCache())
+    period = ["2026-01"]
+    calls = []
+    app = Flask(__name__)
+
+    @app.get("/monthly")
+    @cached_response(vary=lambda: period[0])
+    def monthly():
+        calls.append(period[0])
+        return {"period": period[0]}
+
+    client = app.test_client()
+    assert client.get("/monthly").headers["X-Cache"] == "MISS"
+    assert client.get("/monthly").headers["X-Cache"] == "HIT"
+    period[0] = "2026-02"
+    response = client.get("/monthly")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.get_json() == {"period": "2026-02"}
+    assert calls == ["2026-01", "2026-02"]
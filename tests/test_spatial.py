@@ -0,0 +1,59 @@
+import random
+
+import polars as pl
+import pytest
+
+from supplychain_app.core.spatial import GridIndex, nearest_count, nearest_search, radius_search
+
+
+@pytest.fixture(scope="module")
+def points() -> pl.DataFrame:
+    rng = random.Random(7)
+    n = 3000
+    return pl.DataFrame({
+        "code": [f"p{i}" for i in range(n)],
+        "latitude": [rng.uniform(42, 51) if rng.random() > 0.02 else None for _ in range(n)],
+        "longitude": [rng.uniform(-4, 8) for _ in range(n)],
+        "kind": [rng.choice("abc") for _ in range(n)],
+    })
+
+
+def _queries(count: int):
+    rng = random.Random(11)
+    return [(rng.uniform(42, 51), rng.uniform(-4, 8), rng.uniform(1, 80), rng.randint(1, 40)) for _ in range(count)]
+
+
+def test_index_skips_rows_without_coordinates(points):
+    index = GridIndex.from_frame(points)
+    assert len(index) == points.filter(pl.col("latitude").is_not_null()).height
+
+
+@pytest.mark.parametrize("query", _queries(40))
+def test_indexed_search_matches_full_scan(points, query):
+    lat, lon, radius_km, k = query
+    index = GridIndex.from_frame(points)
+
+    indexed = radius_search(points, index, lat, lon, radius_km)
+    full = radius_search(points, None, lat, lon, radius_km)
+    assert indexed.get_column("code").to_list() == full.get_column("code").to_list()
+
+    for mask in (None, pl.col("kind") == "b"):
+        indexed = nearest_search(points, index, lat, lon, k, mask)
+        full = nearest_search(points, None, lat, lon, k, mask)
+        assert indexed.schema == full.schema
+        assert indexed.get_column("code").to_list() == full.get_column("code").to_list()
+
+
+def test_nearest_returns_all_points_when_k_exceeds_size(points):
+    index = GridIndex.from_frame(points)
+    assert nearest_search(points, index, 47.0, 2.0, 10_000).height == len(index)
+    assert nearest_search(points.clear(), GridIndex.from_frame(points.clear()), 47.0, 2.0, 5).is_empty()
+
+
+def test_nearest_count():
+    assert nearest_count({"mode": "radius", "n": 5}) is None
+    assert nearest_count({"mode": "nearest"}) == 10
+    assert nearest_count({"mode": "Nearest", "n": "3"}) == 3
+    assert nearest_count({"mode": "nearest", "n": 0}) == 1
+    assert nearest_count({"mode": "nearest", "n": 10_000}) == 500
+    assert nearest_count({"mode": "nearest", "n": "x"}) == 10
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from supplychain_app.core.task_graph import Task, run_task_graph, task_dependencies
+
+
+def _noop():
+    return None
+
+
+def _fail():
+    raise OSError("source unavailable")
+
+
+def test_dependencies_follow_declared_inputs_and_outputs():
+    tasks = [
+        Task("stores", _noop, inputs=("src/stores",), outputs=("stores.parquet",)),
+        Task("items", _noop, inputs=("src/items",), outputs=("items.parquet",)),
+        Task("stock", _noop, inputs=("src/554.xlsx", "stores.parquet", "items.parquet"), outputs=("stock.parquet",)),
+    ]
+    assert task_dependencies(tasks) == {"stores": set(), "items": set(), "stock": {"stores", "items"}}
+
+
+def test_cycle_is_rejected():
+    tasks = [
+        Task("a", _noop, inputs=("c.out",), outputs=("a.out",)),
+        Task("b", _noop, inputs=("a.out",), outputs=("b.out",)),
+        Task("c", _noop, inputs=("b.out",), outputs=("c.out",)),
+        Task("d", _noop, outputs=("d.out",)),
+    ]
+    with pytest.raises(ValueError, match=r"Cycle.*\['a', 'b', 'c'\]"):
+        task_dependencies(tasks)
+
+
+def test_output_produced_twice_is_rejected():
+    with pytest.raises(ValueError, match="produite par"):
+        task_dependencies([Task("a", _noop, outputs=("x",)), Task("b", _noop, outputs=("x",))])
+
+
+def test_failed_task_blocks_its_dependents_in_cascade():
+    tasks = [
+        Task("a", _fail, outputs=("a.out",)),
+        Task("b", _noop, inputs=("a.out",), outputs=("b.out",)),
+        Task("c", _noop, inputs=("b.out",), outputs=("c.out",)),
+        Task("d", lambda: 42, outputs=("d.out",)),
+    ]
+    results = run_task_graph(tasks)
+
+    assert results["a"].status == "error" and results["a"].error == "OSError: source unavailable"
+    assert results["b"].status == "blocked" and results["b"].blocked_by == ("a",)
+    assert results["c"].status == "blocked" and results["c"].blocked_by == ("b",)
+    assert results["d"].status == "ok" and results["d"].result == 42
+
+
+def test_task_starts_after_its_dependencies_and_independent_tasks_overlap():
+    order: list[str] = []
+    both_running = threading.Barrier(2, timeout=5)
+
+    def _step(key: str, barrier: bool = False):
+        def run():
+            if barrier:
+                both_running.wait()
+            order.append(key)
+        return run
+
+    tasks = [
+        Task("stock", _step("stock"), inputs=("stores.parquet", "items.parquet")),
+        Task("stores", _step("stores", barrier=True), outputs=("stores.parquet",)),
+        Task("items", _step("items", barrier=True), outputs=("items.parquet",)),
+    ]
+    results = run_task_graph(tasks, max_workers=2)
+
+    assert all(r.status == "ok" for r in results.values())
+    assert order[-1] == "stock"
@@ -0,0 +1,83 @@
+import random
+
+import polars as pl
+import pytest
+
+from supplychain_app.core.text_index import TextIndex, take_rows, tokenize
+
+
+@pytest.fixture(scope="module")
+def items() -> pl.DataFrame:
+    return pl.DataFrame({
+        "code_article": ["VIS12", "A100", "B200", "C300", "D400", "VIS1234"],
+        "libelle": [
+            "Vis inox",
+            "vis tete M12",
+            "visserie assortie M12",
+            "ecrou M12",
+            "devis carte",
+            "vis longue",
+        ],
+    })
+
+
+@pytest.fixture(scope="module")
+def index(items) -> TextIndex:
+    extra = pl.DataFrame({"code_article": ["C300"], "text": ["Bosch"]})
+    return TextIndex.from_frame(items, "code_article", extra)
+
+
+def _codes(items: pl.DataFrame, offsets: list[int]) -> list[str]:
+    return take_rows(items, offsets).get_column("code_article").to_list()
+
+
+def test_tokenize_lowercases_and_deduplicates():
+    assert tokenize("Vis M12 vis_inox") == ["vis", "m12", "inox"]
+
+
+def test_all_terms_must_match(items, index):
+    assert _codes(items, index.search("vis m12")) == ["A100", "B200"]
+    assert index.search("ecrou inox") == []
+
+
+def test_exact_token_ranks_before_prefix_and_substring(items, index):
+    # "vis" : token exact (A100, VIS1234), préfixe (B200), sous-chaîne (D400)
+    assert _codes(items, index.search("vis")) == ["VIS12", "VIS1234", "A100", "B200", "D400"]
+
+
+def test_key_bonus_puts_exact_code_first(items, index):
+    assert _codes(items, index.search("vis1234")) == ["VIS1234"]
+    # Code qui commence par la requête : bonus moindre que le code exact
+    assert _codes(items, index.search("vis12"))[:2] == ["VIS12", "VIS1234"]
+
+
+def test_short_term_matches_substrings(items, index):
+    # Sous-chaînes seulement : à égalité, ordre des lignes
+    assert _codes(items, index.search("12")) == ["VIS12", "A100", "B200", "C300", "VIS1234"]
+    assert _codes(items, index.search("m1 vis")) == ["A100", "B200"]
+
+
+def test_extra_text_is_searchable(items, index):
+    assert _codes(items, index.search("bosch")) == ["C300"]
+    assert _codes(items, index.search("osc")) == ["C300"]
+
+
+def test_limit_keeps_the_best_ranked(index):
+    full = index.search("vis")
+    assert index.search("vis", limit=2) == full[:2]
+    assert index.search("vis", limit=0) == []
+
+
+def test_matches_a_substring_scan():
+    rng = random.Random(3)
+    words = ["vis", "visserie", "devis", "ecrou", "m12", "m8", "joint", "tor", "torique", "a1", "b12"]
+    df = pl.DataFrame({
+        "code_article": [f"{i:05d}" for i in range(2000)],
+        "libelle": [" ".join(rng.choices(words, k=rng.randint(1, 4))) for _ in range(2000)],
+    })
+    index = TextIndex.from_frame(df, "code_article")
+    texts = [f"{c} {l}" for c, l in zip(df["code_article"], df["libelle"])]
+    for query in ["vis", "is", "12 m", "tor ecrou", "0012", "a", "zz"]:
+        terms = tokenize(query)
+        expected = {i for i, t in enumerate(texts) if all(term in t for term in terms)}
+        assert set(index.search(query)) == expected, query
@@ -109,6 +109,58 @@ function API(path) {
   return `${API_BASE_URL}${path}`;
 }
 
+// Réponses tabulaires : lignes {colonne: valeur}, que l'API ait répondu au format
+// lignes ("rows") ou au format colonnes (?format=columnar : "columns" + "data",
+// "data" associant à chaque colonne la liste de ses valeurs).
+function scappRows(data) {
+  if (!data) return [];
+  if (data.format === "columnar" && Array.isArray(data.columns) && data.data && typeof data.data === "object") {
+    const cols = data.columns;
+    const values = cols.map((c) => (Array.isArray(data.data[c]) ? data.data[c] : []));
+    const n = values.length ? values[0].length : 0;
+    const rows = new Array(n);
+    for (let i = 0; i < n; i++) {
+      const r = {};
+      for (let j = 0; j < cols.length; j++) {
+        r[cols[j]] = values[j][i];
+      }
+      rows[i] = r;
+    }
+    return rows;
+  }
+  return Array.isArray(data.rows) ? data.rows : [];
+}
+
+// Charge une liste paginée (limit / cursor) page par page ; onPage(lignes cumulées, réponse)
+// est appelé après chaque page. Si les données sont rechargées entre deux pages
+// (409 cursor_expired), le chargement reprend à la première page.
+async function scappFetchPages(path, { limit = 2000, key = "rows", onPage = null, fetchOptions = {} } = {}) {
+  const sep = path.includes("?") ? "&" : "?";
+  for (let attempt = 0; attempt < 2; attempt++) {
+    let rows = [];
+    let cursor = null;
+    let expired = false;
+    do {
+      const qs = cursor ? `cursor=${encodeURIComponent(cursor)}&limit=${limit}` : `limit=${limit}`;
+      const res = await fetch(API(`${path}${sep}${qs}`), fetchOptions);
+      if (res.status === 409 && cursor) {
+        expired = true;
+        break;
+      }
+      if (!res.ok) {
+        throw new Error(`HTTP ${res.status}`);
+      }
+      const data = await res.json();
+      const pageRows = key === "rows" ? scappRows(data) : (Array.isArray(data[key]) ? data[key] : []);
+      rows = rows.concat(pageRows);
+      cursor = data && data.page ? data.page.next_cursor : null;
+      if (onPage) onPage(rows, data);
+    } while (cursor);
+    if (!expired) return rows;
+  }
+  throw new Error("cursor_expired");
+}
+
 async function scappFetchAppInfo() {
   try {
     const res = await fetch(API("/app/info"), {
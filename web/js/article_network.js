@@ -109,7 +109,8 @@ document.addEventListener("DOMContentLoaded", () => {
       container.innerHTML = "";
       const network = new vis.Network(container, { nodes: visNodes, edges: visEdges }, options);
 
-      statusDiv.textContent = `${visNodes.length} nœud(s), ${visEdges.length} lien(s).`;
+      statusDiv.textContent = `${visNodes.length} nœud(s), ${visEdges.length} lien(s).`
+        + (data.truncated ? " Graphe tronqué (limite de nœuds / liens atteinte)." : "");
 
       network.on("click", (params) => {
         if (!params.nodes || !params.nodes.length) return;
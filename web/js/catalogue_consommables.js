@@ -245,7 +245,7 @@ document.addEventListener("DOMContentLoaded", () => {
     if (statusDiv) statusDiv.textContent = "Chargement de l'offre...";
     if (grid) grid.innerHTML = "";
     try {
-      const res = await fetch(API("/consommables/offer"), {
+      const res = await fetch(API("/consommables/offer?format=columnar"), {
         method: "GET",
         credentials: "include",
       });
@@ -265,7 +265,7 @@ document.addEventListener("DOMContentLoaded", () => {
         return;
       }
 
-      allRows = Array.isArray(data.rows) ? data.rows : [];
+      allRows = scappRows(data);
       columns = Array.isArray(data.columns) ? data.columns : (allRows[0] ? Object.keys(allRows[0]) : []);
 
       const file = data.file || "";
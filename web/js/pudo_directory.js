@@ -169,21 +169,27 @@ document.addEventListener("DOMContentLoaded", () => {
   async function loadDirectory() {
     if (statusDiv) statusDiv.textContent = "Chargement de l'annuaire...";
     try {
-      const res = await fetch(API("/pudo/directory"), {
-        method: "GET",
-        credentials: "include",
+      // Chargement page par page : le tableau s'affiche dès la première page
+      await scappFetchPages("/pudo/directory", {
+        limit: 2000,
+        fetchOptions: { method: "GET", credentials: "include" },
+        onPage: (rows, data) => {
+          allRows = rows;
+          columns = computeColumns(allRows);
+          const total = data && data.page ? data.page.total : rows.length;
+          if (statusDiv) {
+            statusDiv.textContent = rows.length < total ? `Chargement de l'annuaire... (${rows.length} / ${total})` : "";
+          }
+          applyFilters();
+        },
       });
-      if (!res.ok) {
-        if (statusDiv) statusDiv.textContent = "Impossible de charger l'annuaire (" + res.status + ").";
-        return;
-      }
-      const data = await res.json();
-      allRows = (data && data.rows) ? data.rows : [];
-      columns = computeColumns(allRows);
-      if (statusDiv) statusDiv.textContent = "";
-      applyFilters();
     } catch (e) {
-      if (statusDiv) statusDiv.textContent = "Erreur de communication avec l'API.";
+      const msg = String(e && e.message || "");
+      if (statusDiv) {
+        statusDiv.textContent = msg.startsWith("HTTP ")
+          ? "Impossible de charger l'annuaire (" + msg.slice(5) + ")."
+          : "Erreur de communication avec l'API.";
+      }
     }
   }
 